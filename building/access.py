@@ -0,0 +1,27 @@
+"""
+Role scoping of entrances and of the rows reached through them.
+
+Managers reach the entrances of the buildings they manage, guards the
+entrances they guard. Other roles are not limited here.
+"""
+ROLE_ENTRANCE_LOOKUPS = {
+    "manager": "building__manager",
+    "guard": "guard",
+}
+
+
+def scope_to_role(queryset, user, entrance_field: str = None):
+    """
+    Limit ``queryset`` to the entrances ``user`` is responsible for.
+    ``entrance_field`` leads from the model to the entrance,
+    e.g. ``entrance`` for apartments.
+    """
+    lookup = ROLE_ENTRANCE_LOOKUPS.get(user.role)
+
+    if lookup is None:
+        return queryset
+
+    if entrance_field:
+        lookup = f"{entrance_field}__{lookup}"
+
+    return queryset.filter(**{lookup: user})
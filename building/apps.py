@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class BuildingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "building"
+
+    def ready(self):
+        import building.checks  # noqa: F401
+        import building.signals  # noqa: F401
+        from building.audit import connect_log_update
+        from building.search import register_search_functions
+
+        connect_log_update()
+        connection_created.connect(register_search_functions)
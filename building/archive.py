@@ -0,0 +1,269 @@
+"""
+Archive of old audit log entries.
+
+``manage.py archive_audit_log`` moves entries older than the retention
+window out of the ``LogEntry`` table into gzip compressed JSON lines
+under ``AUDITLOG_ARCHIVE_DIR``, partitioned by the month (UTC) of their
+timestamp::
+
+    audit-archive/2024-05/000000001001-000000002000.jsonl.gz
+
+Every batch is written to a ``.tmp`` file first, then its rows are
+replaced by ``ArchivedLogEntryIndex`` rows naming the file and only
+then the file is renamed, so an entry is either in the table or in a
+visible partition file. ``recover_partitions()`` finishes or drops the
+``.tmp`` files left by an interrupted run.
+
+``archived_history()`` serves the history endpoints: it pages through
+``ArchivedLogEntryIndex`` like the history of the table and opens only
+the partition files holding that page.
+"""
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+
+from building.models import ArchivedLogEntryIndex, LogEntryIndex
+
+SUFFIX = ".jsonl.gz"
+TMP_SUFFIX = f"{SUFFIX}.tmp"
+
+
+def _month(timestamp: datetime) -> str:
+    return timestamp.astimezone(timezone.utc).strftime("%Y-%m")
+
+
+def _directory(directory=None):
+    return directory or settings.AUDITLOG_ARCHIVE_DIR
+
+
+def archive_record(entry, index=None) -> dict:
+    """
+    Return a log entry and the scope of its index row as a JSON object.
+    """
+    content_type = ContentType.objects.get_for_id(entry.content_type_id)
+    index = index or {}
+
+    return {
+        "id": entry.id,
+        "timestamp": entry.timestamp.astimezone(timezone.utc).isoformat(),
+        "action": entry.action,
+        "model": f"{content_type.app_label}.{content_type.model}",
+        "content_type_id": entry.content_type_id,
+        "object_pk": entry.object_pk,
+        "object_id": entry.object_id,
+        "object_repr": entry.object_repr,
+        "serialized_data": entry.serialized_data,
+        "changes": entry.changes_dict,
+        "additional_data": entry.additional_data,
+        "actor_id": entry.actor_id,
+        "remote_addr": entry.remote_addr,
+        "cid": entry.cid,
+        "building_id": index.get("building_id"),
+        "entrance_id": index.get("entrance_id"),
+    }
+
+
+def _read_lines(path):
+    with gzip.open(path, "rt", encoding="utf-8") as source:
+        for line in source:
+            yield json.loads(line)
+
+
+def _write_partition(directory, month: str, records) -> str:
+    partition = os.path.join(directory, month)
+    os.makedirs(partition, exist_ok=True)
+    name = f"{records[0]['id']:012d}-{records[-1]['id']:012d}"
+    path = os.path.join(partition, name + TMP_SUFFIX)
+
+    with open(path, "wb") as target:
+        with gzip.GzipFile(fileobj=target, mode="wb") as compressed:
+            for record in records:
+                compressed.write(json.dumps(record, separators=(",", ":")).encode())
+                compressed.write(b"\n")
+
+        target.flush()
+        os.fsync(target.fileno())
+
+    return path
+
+
+def _published_path(path: str) -> str:
+    return path[:-len(".tmp")] if path.endswith(TMP_SUFFIX) else path
+
+
+def _publish(path: str) -> None:
+    os.replace(path, _published_path(path))
+
+
+def _index_rows(directory, path: str, records) -> list:
+    partition = os.path.relpath(_published_path(path), directory)
+
+    return [
+        ArchivedLogEntryIndex(
+            log_entry_id=record["id"],
+            content_type_id=record["content_type_id"],
+            object_id=record["object_id"],
+            building_id=record["building_id"],
+            entrance_id=record["entrance_id"],
+            actor_id=record["actor_id"],
+            timestamp=datetime.fromisoformat(record["timestamp"]),
+            partition=partition,
+        )
+        for record in records
+    ]
+
+
+def recover_partitions(directory=None) -> int:
+    """
+    Publish the ``.tmp`` files whose rows were deleted and remove the
+    others. Return the number of published files.
+    """
+    directory = _directory(directory)
+    published = 0
+
+    if not os.path.isdir(directory):
+        return published
+
+    for month in sorted(os.listdir(directory)):
+        partition = os.path.join(directory, month)
+
+        if not os.path.isdir(partition):
+            continue
+
+        for name in sorted(os.listdir(partition)):
+            if not name.endswith(TMP_SUFFIX):
+                continue
+
+            path = os.path.join(partition, name)
+
+            try:
+                ids = [record["id"] for record in _read_lines(path)]
+            except (EOFError, OSError, ValueError):
+                # Only complete files are followed by the delete.
+                ids = None
+
+            if ids and not LogEntry.objects.filter(id__in=ids).exists():
+                _publish(path)
+                published += 1
+            else:
+                os.remove(path)
+
+    return published
+
+
+def archive_log_entries(before: datetime, directory=None, batch_size: int = 5000):
+    """
+    Move entries with a timestamp before ``before`` into the archive,
+    ``batch_size`` entries at a time. Yield the number of entries
+    moved by every batch.
+    """
+    directory = _directory(directory)
+    recover_partitions(directory)
+
+    queryset = LogEntry.objects.filter(timestamp__lt=before)
+    last_id = queryset.order_by("-id").values_list("id", flat=True).first()
+
+    if last_id is None:
+        return
+
+    # Walk the primary key up to the newest old entry instead of
+    # sorting the timestamp index for every batch.
+    queryset = queryset.filter(id__lte=last_id).order_by("id")
+    position = 0
+
+    while True:
+        entries = list(queryset.filter(id__gt=position)[:batch_size])
+
+        if not entries:
+            break
+
+        position = entries[-1].id
+        ids = [entry.id for entry in entries]
+        indexes = {
+            row["log_entry_id"]: row
+            for row in LogEntryIndex.objects.filter(log_entry_id__in=ids).values(
+                "log_entry_id", "building_id", "entrance_id"
+            )
+        }
+        months = {}
+
+        for entry in entries:
+            months.setdefault(_month(entry.timestamp), []).append(
+                archive_record(entry, indexes.get(entry.id))
+            )
+
+        paths = {
+            _write_partition(directory, month, records): records
+            for month, records in months.items()
+        }
+
+        with transaction.atomic():
+            ArchivedLogEntryIndex.objects.bulk_create([
+                row
+                for path, records in paths.items()
+                for row in _index_rows(directory, path, records)
+            ])
+            LogEntry.objects.filter(id__in=ids).delete()
+
+        for path in paths:
+            _publish(path)
+
+        yield len(entries)
+
+
+def archived_history(lookups: dict, limit: int, before=None, after=None,
+                     directory=None) -> list:
+    """
+    Return up to ``limit`` archived entries matching ``lookups``, newest
+    first by ``(timestamp, id)``, older than the ``before`` position and
+    not older than the ``after`` timestamp.
+
+    The page is found in ``ArchivedLogEntryIndex``, then only the
+    partition files holding it are read.
+    """
+    directory = _directory(directory)
+    queryset = ArchivedLogEntryIndex.objects.filter(**lookups)
+
+    if before is not None:
+        timestamp, log_entry_id = before
+        queryset = queryset.filter(
+            Q(timestamp__lt=timestamp)
+            | Q(timestamp=timestamp, log_entry_id__lt=log_entry_id),
+            timestamp__lte=timestamp,
+        )
+
+    if after is not None:
+        queryset = queryset.filter(timestamp__gte=after)
+
+    rows = list(
+        queryset.order_by("-timestamp", "-log_entry_id").values_list(
+            "log_entry_id", "partition"
+        )[:limit]
+    )
+    partitions = {}
+
+    for log_entry_id, partition in rows:
+        partitions.setdefault(partition, set()).add(log_entry_id)
+
+    records = {}
+
+    for partition, ids in partitions.items():
+        for record in _read_lines(os.path.join(directory, partition)):
+            if record["id"] not in ids:
+                continue
+
+            record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+            records[record["id"]] = record
+            ids.discard(record["id"])
+
+            if not ids:
+                break
+
+    return [records[log_entry_id] for log_entry_id, _ in rows if log_entry_id in records]
@@ -0,0 +1,318 @@
+"""
+Async read endpoints for the ASGI entry point.
+
+DRF views are sync only, so under ASGI every request to them holds a
+thread for its whole duration. These views cover the hot reads (list
+and retrieve of buildings, entrances and apartments) as plain async
+Django views. Authentication, permission checks, filtering and
+pagination run through the same DRF classes and ``APIView`` steps as the
+viewsets, with the token resolved by ``aauthenticate()``; queries use
+the async ORM and cached building snapshots are read with the async
+cache API. Responses, ETags and cursors match the DRF endpoints, and like
+there a body read from a replica is sent without an ETag.
+
+``?fields=``, ``?expand=`` and ``?stream=1`` are not supported here,
+use the DRF endpoints for those.
+"""
+from abc import ABCMeta, abstractmethod
+from contextlib import nullcontext
+
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.generics import GenericAPIView
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from building.access import scope_to_role
+from building.db_router import primary_reads, replica_reads_active
+from building.fast_serializers import APARTMENT_COLUMNS, serialize_apartment_rows
+from building.models import Building, Entrance, Apartment
+from building.pagination import IdCursorPagination
+from building.permissions import IsAdminOrManagerRole, AllowAnyRole
+from building.search import AddressSearchFilter
+from building.snapshots import aget_building_snapshots, snapshot_entrances
+from building.timing import active_timer, timed_phase
+from building.versions import aget_scope_version, scope_etag, user_scope
+from user.authentication import CachedTokenAuthentication
+
+
+class AsyncReadView(View, metaclass=ABCMeta):
+    """
+    Base async view answering GET (and HEAD) with JSON.
+
+    Subclasses set ``permission_classes`` and implement ``get_data()``,
+    returning the payload of a list (``pk`` is None) or a retrieve.
+    """
+    http_method_names = ["get", "head"]
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = ()
+    renderer = JSONRenderer()
+    media_type = "application/json"
+    conditional = True
+
+    get_authenticators = APIView.get_authenticators
+    get_authenticate_header = APIView.get_authenticate_header
+    get_permissions = APIView.get_permissions
+    check_permissions = APIView.check_permissions
+    permission_denied = APIView.permission_denied
+
+    async def get(self, request, *args, **kwargs):
+        timer = active_timer.get()
+
+        if timer is not None:
+            timer.is_api = True
+
+        with timed_phase("view"):
+            request = self.request = Request(
+                request, authenticators=self.get_authenticators()
+            )
+
+            try:
+                with timed_phase("auth"):
+                    await self.authenticate(request)
+
+                with timed_phase("perm"):
+                    self.check_permissions(request)
+
+                etag = await self.get_etag(request) if self.conditional else None
+
+                if etag is not None and await self.is_not_modified(
+                    request, kwargs.get("pk"), etag
+                ):
+                    return self.respond(None, status.HTTP_304_NOT_MODIFIED, etag)
+
+                with primary_reads() if self.reads_primary() else nullcontext():
+                    data = await self.get_data(request, kwargs.get("pk"))
+            except exceptions.APIException as exc:
+                return self.handle_exception(request, exc)
+
+            if not self.reads_primary() and replica_reads_active():
+                etag = None
+
+            with timed_phase("render"):
+                return self.respond(data, status.HTTP_200_OK, etag)
+
+    async def authenticate(self, request) -> None:
+        """
+        ``Request._authenticate()`` with ``aauthenticate()``, leaving
+        the request as DRF would for the permission checks.
+        """
+        for authenticator in request.authenticators:
+            try:
+                credentials = await authenticator.aauthenticate(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if credentials is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = credentials
+                return
+
+        request._not_authenticated()
+
+    def reads_primary(self) -> bool:
+        """
+        Whether ``get_data()`` reads from the primary, whose data the
+        ETag describes. Replicas may lag behind it.
+        """
+        return False
+
+    async def get_etag(self, request) -> str:
+        version = await aget_scope_version(user_scope(request.user))
+
+        return scope_etag(
+            request.user, version, self.media_type, request.get_full_path()
+        )
+
+    async def is_not_modified(self, request, pk, etag: str) -> bool:
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+
+        if etag in etags:
+            return True
+
+        # "*" only matches an object that exists for the user.
+        return etags == ["*"] and await self.exists(request, pk)
+
+    async def exists(self, request, pk) -> bool:
+        """
+        Whether the list, or the object ``pk``, has a representation.
+        """
+        return True
+
+    @abstractmethod
+    async def get_data(self, request, pk):
+        """
+        The payload of a list, when ``pk`` is None, or of a retrieve.
+        """
+
+    def respond(self, data, status_code: int, etag=None, headers=None):
+        content = b"" if data is None else self.renderer.render(data)
+        response = HttpResponse(
+            content, status=status_code, content_type=self.media_type
+        )
+
+        if etag is not None:
+            response["ETag"] = etag
+
+        for name, value in (headers or {}).items():
+            response[name] = value
+
+        return response
+
+    def handle_exception(self, request, exc):
+        headers = {}
+
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            # As APIView.handle_exception(): 401 only with a challenge.
+            auth_header = self.get_authenticate_header(request)
+
+            if auth_header:
+                headers["WWW-Authenticate"] = auth_header
+            else:
+                exc.status_code = status.HTTP_403_FORBIDDEN
+
+        return self.respond({"detail": exc.detail}, exc.status_code, headers=headers)
+
+
+class AsyncScopedReadView(AsyncReadView):
+    """
+    List and retrieve of a role-scoped queryset,
+    paginated and searchable like the viewsets.
+    """
+    pagination_class = IdCursorPagination
+    filter_backends = (AddressSearchFilter,)
+    search_building_field = "id"
+
+    paginator = GenericAPIView.paginator
+    filter_queryset = GenericAPIView.filter_queryset
+
+    @abstractmethod
+    def get_queryset(self, request):
+        """
+        The objects the user may read.
+        """
+
+    def get_rows(self, request):
+        return self.get_queryset(request).values("id")
+
+    async def exists(self, request, pk) -> bool:
+        return pk is None or await self.get_rows(request).filter(pk=pk).aexists()
+
+    @abstractmethod
+    async def serialize_rows(self, rows) -> list:
+        """
+        Payloads of the ``get_rows()`` rows, leaving out rows
+        that have none.
+        """
+
+    async def _timed_serialize_rows(self, rows) -> list:
+        with timed_phase("serialize"):
+            return await self.serialize_rows(rows)
+
+    async def get_data(self, request, pk):
+        rows = self.get_rows(request)
+
+        if pk is not None:
+            row = await rows.filter(pk=pk).afirst()
+
+            if row is None:
+                raise exceptions.NotFound()
+
+            data = await self._timed_serialize_rows([row])
+
+            if not data:
+                raise exceptions.NotFound()
+
+            return data[0]
+
+        rows = self.filter_queryset(rows)
+        page = await self.paginator.apaginate_queryset(rows, request, view=self)
+
+        if page is None:
+            return await self._timed_serialize_rows([row async for row in rows])
+
+        return self.paginator.get_paginated_data(
+            await self._timed_serialize_rows(page)
+        )
+
+
+class AsyncBuildingView(AsyncScopedReadView):
+    """
+    Async list and retrieve of buildings, from the building snapshots.
+
+    Allow only for admin and manager roles. Managers see their buildings.
+    """
+    permission_classes = (IsAdminOrManagerRole,)
+
+    def reads_primary(self) -> bool:
+        return True
+
+    def get_queryset(self, request):
+        queryset = Building.objects.all()
+
+        if request.user.role != "admin":
+            queryset = queryset.filter(manager=request.user)
+
+        return queryset
+
+    async def serialize_rows(self, rows) -> list:
+        building_ids = [row["id"] for row in rows]
+        snapshots = await aget_building_snapshots(building_ids)
+
+        return [
+            snapshots[building_id]
+            for building_id in building_ids
+            if building_id in snapshots
+        ]
+
+
+class AsyncEntranceView(AsyncScopedReadView):
+    """
+    Async list and retrieve of entrances, from the building snapshots.
+
+    Allow for any role. Managers and guards see their entrances.
+    """
+    permission_classes = (AllowAnyRole,)
+    search_building_field = "building"
+
+    def reads_primary(self) -> bool:
+        return True
+
+    def get_queryset(self, request):
+        return scope_to_role(Entrance.objects.all(), request.user)
+
+    def get_rows(self, request):
+        return self.get_queryset(request).values("id", "building_id")
+
+    async def serialize_rows(self, rows) -> list:
+        snapshots = await aget_building_snapshots(
+            {row["building_id"] for row in rows}
+        )
+
+        return snapshot_entrances(snapshots, [row["id"] for row in rows])
+
+
+class AsyncApartmentView(AsyncScopedReadView):
+    """
+    Async list and retrieve of apartments.
+
+    Allow for any role. Managers and guards see the apartments
+    of their entrances.
+    """
+    permission_classes = (AllowAnyRole,)
+    search_building_field = "entrance__building"
+
+    def get_queryset(self, request):
+        return scope_to_role(Apartment.objects.all(), request.user, "entrance")
+
+    def get_rows(self, request):
+        return self.get_queryset(request).values(*APARTMENT_COLUMNS)
+
+    async def serialize_rows(self, rows) -> list:
+        return serialize_apartment_rows(rows)
@@ -0,0 +1,363 @@
+"""
+Audit log helpers and the write-behind audit pipeline.
+
+Inside ``buffered_audit_log()`` (entered for every request by
+``AuditLogBufferMiddleware``) log entries of creates, updates and
+deletes are not inserted one by one. A ``pre_log`` receiver builds them
+instead of auditlog and they are written with a single ``bulk_create``
+when the block exits. Updates go through ``log_update()``, which
+replaces auditlog's own receiver so the stored row is read only once.
+
+Guarantees:
+
+- An entry is buffered only once the transaction that produced it
+  commits, so rolled back changes leave no entries behind.
+- Entries of one block are inserted in the order their transactions
+  committed and keep the timestamp of the change, not of the flush.
+  Entries of concurrent requests may interleave, order by ``timestamp``.
+- Entries of a request without an actor get the user the request was
+  authenticated as (DRF authenticates in the view, after auditlog's
+  own middleware would have looked).
+- Every entry is written together with its ``LogEntryIndex`` row
+  (see ``building.history``), buffered or not.
+- Entries are written after the change itself has committed. A worker
+  crashing in between loses them. With ``AUDITLOG_BACKGROUND_FLUSH``
+  they additionally wait in a bounded in-memory queue, which is drained
+  on a clean shutdown. When the queue is full the request writes its
+  entries itself, so entries are never dropped under load.
+"""
+import atexit
+import logging
+import queue
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from auditlog.cid import get_cid
+from auditlog.context import auditlog_disabled
+from auditlog.diff import model_instance_diff
+from auditlog.models import DEFAULT_OBJECT_REPR, LogEntry
+from auditlog.receivers import check_disable
+from auditlog.receivers import log_update as auditlog_log_update
+from auditlog.registry import auditlog
+from auditlog.signals import post_log, pre_log
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import close_old_connections, transaction
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from django.utils.encoding import smart_str
+
+from building.history import index_log_entries
+
+logger = logging.getLogger(__name__)
+
+_active_buffer = ContextVar("audit_log_buffer", default=None)
+
+BUFFERED_ACTIONS = (
+    LogEntry.Action.CREATE,
+    LogEntry.Action.DELETE,
+)
+
+
+def build_log_entry(instance, action, changes) -> LogEntry:
+    """
+    Return an unsaved ``LogEntry`` filled the same way as
+    ``LogEntry.objects.log_create()`` does it.
+    """
+    try:
+        object_repr = smart_str(instance)
+    except ObjectDoesNotExist:
+        object_repr = DEFAULT_OBJECT_REPR
+
+    get_additional_data = getattr(instance, "get_additional_data", None)
+
+    return LogEntry(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_pk=instance.pk,
+        object_id=instance.pk if isinstance(instance.pk, int) else None,
+        object_repr=object_repr,
+        serialized_data=LogEntry.objects._get_serialized_data_or_none(instance),
+        action=action,
+        changes=changes,
+        additional_data=get_additional_data() if callable(get_additional_data) else None,
+        cid=get_cid(),
+    )
+
+
+def write_log_entries(entries) -> list:
+    """
+    Insert unsaved log entries in one query, or hand them to the active
+    buffer, unless auditlog is disabled for the current context.
+    """
+    if auditlog_disabled.get():
+        return []
+
+    buffer = _active_buffer.get()
+
+    if buffer is not None:
+        for entry in entries:
+            buffer.set_actor(entry)
+
+        transaction.on_commit(lambda: buffer.extend(entries))
+        return entries
+
+    return _write(entries)
+
+
+def log_bulk_create(instances) -> list:
+    """
+    Write CREATE entries for objects inserted with ``bulk_create``,
+    which bypasses the auditlog signals, in one query.
+    """
+    if auditlog_disabled.get():
+        return []
+
+    return write_log_entries([
+        build_log_entry(
+            instance,
+            LogEntry.Action.CREATE,
+            model_instance_diff(None, instance)
+        )
+        for instance in instances
+    ])
+
+
+class BackgroundFlusher:
+    """
+    Daemon thread inserting buffered entries from a bounded queue.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, entries) -> None:
+        self._start()
+
+        try:
+            self.queue.put_nowait(entries)
+        except queue.Full:
+            _write(entries)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="audit-log-flusher",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while (entries := self.queue.get()) is not None:
+            try:
+                _write(entries)
+            except Exception:
+                logger.exception("Failed to write %s audit log entries", len(entries))
+            finally:
+                close_old_connections()
+
+
+_flusher = None
+
+
+def get_background_flusher() -> BackgroundFlusher:
+    global _flusher
+
+    if _flusher is None:
+        _flusher = BackgroundFlusher(
+            maxsize=getattr(settings, "AUDITLOG_FLUSH_QUEUE_SIZE", 1000)
+        )
+        atexit.register(_flusher.stop)
+
+    return _flusher
+
+
+def _write(entries) -> list:
+    with transaction.atomic(savepoint=False):
+        entries = LogEntry.objects.bulk_create(entries)
+        index_log_entries(entries)
+
+    return entries
+
+
+class AuditLogBuffer:
+
+    def __init__(self, request=None) -> None:
+        self.request = request
+        self.entries = []
+        self.closed = False
+
+    def set_actor(self, entry) -> None:
+        user = getattr(self.request, "user", None)
+
+        if (
+            entry.actor_id is None
+            and isinstance(user, get_user_model())
+            and user.is_authenticated
+        ):
+            entry.actor = user
+
+    def extend(self, entries) -> None:
+        if self.closed:
+            flush_log_entries(entries)
+        else:
+            self.entries.extend(entries)
+
+    def close(self) -> None:
+        self.closed = True
+        flush_log_entries(self.entries)
+        self.entries = []
+
+
+def flush_log_entries(entries) -> None:
+    if not entries:
+        return
+
+    if getattr(settings, "AUDITLOG_BACKGROUND_FLUSH", False):
+        get_background_flusher().submit(entries)
+    else:
+        _write(entries)
+
+
+@contextmanager
+def buffered_audit_log(request=None):
+    """
+    Collect log entries created inside the block and write them
+    with one ``bulk_create`` on exit. Nested blocks join the outer one.
+    Entries are attributed to the user of ``request``, if given.
+    """
+    if _active_buffer.get() is not None:
+        yield
+        return
+
+    buffer = AuditLogBuffer(request)
+    token = _active_buffer.set(buffer)
+
+    try:
+        yield buffer
+    finally:
+        _active_buffer.reset(token)
+        buffer.close()
+
+
+@asynccontextmanager
+async def abuffered_audit_log(request=None):
+    """
+    ``buffered_audit_log()`` for async code, writing through ``sync_to_async``.
+    """
+    if _active_buffer.get() is not None:
+        yield
+        return
+
+    buffer = AuditLogBuffer(request)
+    token = _active_buffer.set(buffer)
+
+    try:
+        yield buffer
+    finally:
+        _active_buffer.reset(token)
+        await sync_to_async(buffer.close)()
+
+
+def _buffer_entry(buffer, instance, action, changes) -> None:
+    if not changes:
+        return
+
+    entry = build_log_entry(instance, action, changes)
+    pre_save.send(
+        sender=LogEntry,
+        instance=entry,
+        raw=False,
+        using=LogEntry.objects.db,
+        update_fields=None
+    )
+    buffer.set_actor(entry)
+    transaction.on_commit(lambda: buffer.extend([entry]))
+
+
+@receiver(pre_log)
+def buffer_log_entry(sender, instance, action, **kwargs):
+    """
+    Take over the entries of creates and deletes made inside
+    ``buffered_audit_log()`` and keep auditlog from inserting them.
+    Updates are taken over by ``log_update()``.
+
+    ``pre_save`` is sent when the entry is buffered, so auditlog's
+    ``set_actor()`` still fills in the actor and remote address.
+    """
+    buffer = _active_buffer.get()
+
+    if buffer is None or action not in BUFFERED_ACTIONS:
+        return None
+
+    if action == LogEntry.Action.CREATE:
+        changes = model_instance_diff(None, instance)
+    else:
+        changes = model_instance_diff(instance, None)
+
+    _buffer_entry(buffer, instance, action, changes)
+
+    return False
+
+
+@check_disable
+def log_update(sender, instance, **kwargs):
+    """
+    auditlog's update receiver. Inside ``buffered_audit_log()`` the
+    entry is diffed against the row read here and buffered, auditlog's
+    ``pre_log`` carries no old row and would make a receiver read it
+    a second time.
+    """
+    buffer = _active_buffer.get()
+
+    if buffer is None:
+        auditlog_log_update(sender, instance, **kwargs)
+        return
+
+    if instance._state.adding:
+        return
+
+    old = sender.objects.filter(pk=instance.pk).first()
+    changes = model_instance_diff(
+        old, instance, fields_to_check=kwargs.get("update_fields")
+    )
+    _buffer_entry(buffer, instance, LogEntry.Action.UPDATE, changes)
+
+
+def connect_log_update() -> None:
+    """
+    Replace auditlog's update receiver of every registered model with
+    ``log_update()``. Called once the models are registered.
+    """
+    for model in auditlog.get_models():
+        pre_save.disconnect(
+            sender=model,
+            dispatch_uid=auditlog._dispatch_uid(pre_save, auditlog_log_update)
+        )
+        pre_save.connect(
+            log_update,
+            sender=model,
+            dispatch_uid=("buffered_log_update", model._meta.label)
+        )
+
+
+@receiver(post_log)
+def index_log_entry(sender, log_entry=None, log_created=False, **kwargs):
+    """
+    Index the entries auditlog wrote itself, outside of a buffer.
+    """
+    if log_created:
+        index_log_entries([log_entry])
@@ -0,0 +1,250 @@
+"""
+Helpers shared by the benchmark management commands.
+"""
+import asyncio
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.db import connections
+from django.test import AsyncClient, Client
+
+from building.startup import allowed_host, current_rss_kb
+
+
+class ClientTransport:
+    """
+    Sends requests in-process through Django's test client.
+    """
+
+    def __init__(self, token: str = None) -> None:
+        headers = {"HTTP_HOST": allowed_host(), "HTTP_ACCEPT": "application/json"}
+
+        if token:
+            headers["HTTP_AUTHORIZATION"] = f"Token {token}"
+
+        self.client = Client(**headers)
+
+    def get(self, path: str):
+        response = self.client.get(path)
+
+        if response.streaming:
+            body = b"".join(response.streaming_content)
+        else:
+            body = response.content
+
+        return response.status_code, body
+
+    def post(self, path: str, data: dict):
+        response = self.client.post(path, data, content_type="application/json")
+
+        return response.status_code, response.content
+
+
+class _HostAsyncClient(AsyncClient):
+    """
+    AsyncClient sending ``allowed_host()`` as the Host header
+    in place of the ``testserver`` it always sets.
+    """
+
+    def request(self, **request):
+        host = allowed_host().encode()
+        request["headers"] = [
+            (name, host if name == b"host" else value)
+            for name, value in request["headers"]
+        ]
+
+        return super().request(**request)
+
+
+class AsyncClientTransport:
+    """
+    Sends requests in-process through Django's ASGI handler.
+    """
+
+    def __init__(self, token: str) -> None:
+        self.client = _HostAsyncClient()
+        self.headers = {
+            "accept": "application/json",
+            "authorization": f"Token {token}",
+        }
+
+    async def get(self, path: str):
+        response = await self.client.get(path, headers=self.headers)
+
+        if response.streaming:
+            body = b"".join([chunk async for chunk in response.streaming_content])
+        else:
+            body = response.content
+
+        return response.status_code, body
+
+
+class HttpTransport:
+    """
+    Sends requests to a running server, e.g. ``gunicorn config.wsgi``.
+    """
+
+    def __init__(self, base_url: str, token: str = None) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"Accept": "application/json"}
+
+        if token:
+            self.headers["Authorization"] = f"Token {token}"
+
+    def get(self, path: str):
+        return self._send(Request(f"{self.base_url}{path}", headers=self.headers))
+
+    def post(self, path: str, data: dict):
+        return self._send(Request(
+            f"{self.base_url}{path}",
+            data=json.dumps(data).encode(),
+            headers={**self.headers, "Content-Type": "application/json"},
+            method="POST",
+        ))
+
+    @staticmethod
+    def _send(request):
+        try:
+            with urlopen(request) as response:
+                return response.status, response.read()
+        except HTTPError as error:
+            return error.code, error.read()
+
+
+def get_json(transport, path: str):
+    status, body = transport.get(path)
+
+    return status, json.loads(body) if body else None
+
+
+def latency_summary(latencies) -> dict:
+    """
+    Nearest-rank percentiles of latencies given in seconds, in milliseconds.
+    """
+    if not latencies:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+
+    ordered = sorted(latencies)
+
+    def percentile(rank):
+        index = min(len(ordered) - 1, max(0, round(rank / 100 * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def run_load(make_transport, path: str, requests: int, workers: int) -> dict:
+    """
+    Issue ``requests`` GETs of ``path`` spread over ``workers`` threads,
+    each with its own transport from ``make_transport()``.
+    """
+    return run_requests(
+        make_transport, lambda transport: transport.get(path), requests, workers
+    )
+
+
+def run_requests(make_transport, send, requests: int, workers: int) -> dict:
+    """
+    ``run_load()`` for any request, ``send(transport)`` returning
+    the status and body of one.
+    """
+
+    def worker(count):
+        transport = make_transport()
+        latencies = []
+        statuses = Counter()
+
+        try:
+            for _ in range(count):
+                started = time.perf_counter()
+                status, _ = send(transport)
+                latencies.append(time.perf_counter() - started)
+                statuses[status] += 1
+        finally:
+            if workers > 1:
+                connections.close_all()
+
+        return latencies, statuses
+
+    counts = _split(requests, workers)
+    rss_before = current_rss_kb()
+    started = time.perf_counter()
+
+    if workers == 1:
+        results = [worker(requests)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(worker, counts))
+
+    return _load_report(
+        requests, time.perf_counter() - started, results, rss_before
+    )
+
+
+def run_async_load(make_transport, path: str, requests: int, workers: int) -> dict:
+    """
+    ``run_load()`` with ``workers`` concurrent tasks on one event loop,
+    each with its own async transport from ``make_transport()``.
+    """
+
+    async def worker(count):
+        transport = make_transport()
+        latencies = []
+        statuses = Counter()
+
+        for _ in range(count):
+            started = time.perf_counter()
+            status, _ = await transport.get(path)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+        return latencies, statuses
+
+    async def load():
+        return await asyncio.gather(
+            *(worker(count) for count in _split(requests, workers))
+        )
+
+    rss_before = current_rss_kb()
+    started = time.perf_counter()
+    results = asyncio.run(load())
+
+    return _load_report(
+        requests, time.perf_counter() - started, results, rss_before
+    )
+
+
+def _split(requests: int, workers: int) -> list:
+    return [
+        requests // workers + (1 if i < requests % workers else 0)
+        for i in range(workers)
+    ]
+
+
+def _load_report(requests: int, elapsed: float, results, rss_before) -> dict:
+    """
+    Latency and throughput of one run, with the RSS of this process
+    after it and how much the run grew it. Runs share the process,
+    so its peak RSS would only tell about the heaviest run so far.
+    """
+    rss = current_rss_kb()
+    latencies = [latency for batch, _ in results for latency in batch]
+    statuses = sum((worker_statuses for _, worker_statuses in results), Counter())
+
+    return {
+        "requests": requests,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(requests / elapsed, 1) if elapsed else None,
+        "latency_ms": latency_summary(latencies),
+        "rss_kb": rss,
+        "rss_growth_kb": None if rss is None else rss - rss_before,
+    }
@@ -0,0 +1,27 @@
+"""
+System checks of the deployment settings the building app relies on.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = ("django.core.cache.backends.locmem.LocMemCache",)
+
+# What the workers share through the default cache.
+SHARED_STATE = ("building snapshots", "ETag scope versions", "auth token revocations")
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES["default"]["BACKEND"]
+
+    if settings.WEB_CONCURRENCY > 1 and backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f"{backend} is local to one process, but WEB_CONCURRENCY is "
+            f"{settings.WEB_CONCURRENCY}: workers would not see each other's "
+            f"invalidation of {', '.join(SHARED_STATE)}.",
+            hint="Set CACHE_BACKEND and CACHE_LOCATION to a shared cache, "
+                 "e.g. Redis or Memcached.",
+            id="building.E001",
+        )]
+
+    return []
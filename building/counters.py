@@ -0,0 +1,94 @@
+"""
+Denormalized entrance and apartment counters on Building.
+
+Single-row writes adjust the counters with ``UPDATE ... SET x = x + n``
+from the signal receivers, in the transaction of the write. Bulk writes
+bypass signals and recompute the counters of the buildings they touched
+with recompute_building_counters(), which the repair command runs too.
+So do entrance deletes, whose cascaded apartments skip their receivers.
+"""
+from operator import attrgetter
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from building.models import Building, Entrance, Apartment
+
+
+def _count(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def actual_counters() -> dict:
+    """
+    Expressions counting the related rows of the outer building.
+    """
+    entrances = Entrance.objects.filter(building=OuterRef("pk"))
+
+    return {
+        "entrance_count": _count(entrances, "building"),
+        "guarded_entrance_count": _count(
+            entrances.filter(guard__isnull=False), "building"
+        ),
+        "apartment_count": _count(
+            Apartment.objects.filter(entrance__building=OuterRef("pk")),
+            "entrance__building"
+        ),
+    }
+
+
+def adjust_building_counters(buildings, **deltas) -> None:
+    """
+    Add ``deltas`` to the counters of the ``buildings`` queryset.
+    Counters that drifted (e.g. after a raw bulk insert) stop at zero
+    rather than failing the delete, until repair_building_counters runs.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+
+    if deltas:
+        buildings.update(**{
+            field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items()
+        })
+
+
+def building_ids_of(instances, building_field: str) -> set:
+    """
+    Ids of the buildings of ``instances``, reached through the attribute
+    path ``building_field`` (e.g. ``"entrance.building_id"``).
+    """
+    building_id = attrgetter(building_field)
+
+    return {building_id(instance) for instance in instances}
+
+
+def recompute_building_counters(building_ids) -> int:
+    building_ids = {
+        building_id for building_id in building_ids if building_id is not None
+    }
+
+    if not building_ids:
+        return 0
+
+    return Building.objects.filter(id__in=building_ids).update(**actual_counters())
+
+
+def stale_building_ids(queryset) -> list:
+    """
+    Ids of the buildings in ``queryset`` whose counters are out of date.
+    """
+    counters = actual_counters()
+
+    return list(
+        queryset.alias(**{f"actual_{field}": value for field, value in counters.items()})
+        .exclude(**{field: F(f"actual_{field}") for field in counters})
+        .values_list("id", flat=True)
+    )
@@ -0,0 +1,147 @@
+"""
+Read replica routing.
+
+ReplicaRoutingMiddleware lets safe-method requests to the building and
+user APIs read from DATABASE_REPLICA_ALIASES. Everything else, including
+management commands, signals and background threads, reads from and
+writes to ``default``.
+
+A client that sent a write sticks to the primary for
+DATABASE_STICKY_PRIMARY_SECONDS, so it reads its own writes. Clients are
+told apart by their Authorization header, or by their session cookie.
+Auth tokens are always read from the primary, so new tokens work at
+once. Tokens cached by the workers are revoked through the shared cache,
+see user.authentication. Building snapshots are
+built from the primary, so a lagging replica never ends up in the cache,
+and the views reading them take their ids from the primary as well.
+Responses read from a replica carry no ETag, since ETags follow the
+primary (see ``ConditionalGetMixin``).
+Audit log entries are written to the primary and can be read from
+replicas like other models.
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import Resolver404, resolve
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY = "default"
+STICKY_KEY_PREFIX = "sticky-primary"
+REPLICA_APPS = ("building", "user")
+PRIMARY_ONLY_APPS = ("authtoken",)
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def allow_replica_reads():
+    """
+    Let reads in the current context go to replicas,
+    until reset_replica_reads() is called with the returned token.
+    """
+    return _replica_reads.set(True)
+
+
+def reset_replica_reads(token) -> None:
+    _replica_reads.reset(token)
+
+
+@contextmanager
+def replica_reads(allowed: bool = True):
+    token = _replica_reads.set(allowed)
+
+    try:
+        yield
+    finally:
+        reset_replica_reads(token)
+
+
+def primary_reads():
+    """
+    Read from the primary inside the block,
+    e.g. to fill a cache shared with requests that do.
+    """
+    return replica_reads(False)
+
+
+def replica_reads_active() -> bool:
+    """
+    Whether reads in the current context may go to a replica.
+    """
+    return bool(settings.DATABASE_REPLICA_ALIASES) and _replica_reads.get()
+
+
+def client_key(request):
+    identity = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+
+    if not identity:
+        return None
+
+    digest = hashlib.sha1(identity.encode()).hexdigest()
+
+    return f"{STICKY_KEY_PREFIX}:{digest}"
+
+
+def stick_to_primary(request) -> None:
+    key = client_key(request)
+
+    if key is not None and settings.DATABASE_STICKY_PRIMARY_SECONDS > 0:
+        cache.set(key, True, timeout=settings.DATABASE_STICKY_PRIMARY_SECONDS)
+
+
+def is_sticky(request) -> bool:
+    key = client_key(request)
+
+    return key is not None and cache.get(key, False)
+
+
+async def astick_to_primary(request) -> None:
+    key = client_key(request)
+
+    if key is not None and settings.DATABASE_STICKY_PRIMARY_SECONDS > 0:
+        await cache.aset(key, True, timeout=settings.DATABASE_STICKY_PRIMARY_SECONDS)
+
+
+async def ais_sticky(request) -> bool:
+    key = client_key(request)
+
+    return key is not None and await cache.aget(key, False)
+
+
+def routes_to_replica_apps(request) -> bool:
+    if request.method not in SAFE_METHODS:
+        return False
+
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return False
+
+    return match.app_name in REPLICA_APPS
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (
+            not replica_reads_active()
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+        ):
+            return PRIMARY
+
+        return random.choice(settings.DATABASE_REPLICA_ALIASES)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary and never migrated on their own.
+        return db not in settings.DATABASE_REPLICA_ALIASES
@@ -0,0 +1,129 @@
+"""
+Read-only serialization of buildings, entrances and apartments
+straight from ``.values()`` rows.
+
+Produces the same output as ``BuildingListSerializer``,
+``EntranceListSerializer`` and ``ApartmentSerializer`` without the
+per-row field machinery of DRF. Nested entrances and apartments
+are ordered by primary key.
+"""
+from collections import defaultdict
+from operator import itemgetter
+
+from building.models import Building, Entrance, Apartment
+
+APARTMENT_COLUMNS = ("id", "entrance_id", "number")
+ENTRANCE_COLUMNS = (
+    "id",
+    "building_id",
+    "building__address",
+    "number",
+    "guard_id",
+    "guard__first_name",
+    "guard__last_name",
+)
+BUILDING_COLUMNS = (
+    "id",
+    "address",
+    "manager_id",
+    "manager__first_name",
+    "manager__last_name",
+)
+
+_apartment_values = itemgetter(*APARTMENT_COLUMNS)
+_entrance_values = itemgetter(*ENTRANCE_COLUMNS)
+_building_values = itemgetter(*BUILDING_COLUMNS)
+
+
+def _full_name(user_id, first_name, last_name):
+    if user_id is None:
+        return None
+
+    return f"{first_name} {last_name}"
+
+
+def apartment_to_representation(row) -> dict:
+    apartment_id, entrance_id, number = _apartment_values(row)
+
+    return {"id": apartment_id, "entrance": entrance_id, "number": number}
+
+
+def entrance_to_representation(row, apartments) -> dict:
+    entrance_id, _, address, number, guard_id, first_name, last_name = (
+        _entrance_values(row)
+    )
+
+    return {
+        "id": entrance_id,
+        "building": address,
+        "number": number,
+        "guard": _full_name(guard_id, first_name, last_name),
+        "apartments": apartments,
+    }
+
+
+def building_to_representation(row, entrances) -> dict:
+    building_id, address, manager_id, first_name, last_name = _building_values(row)
+
+    return {
+        "id": building_id,
+        "address": address,
+        "manager": _full_name(manager_id, first_name, last_name),
+        "entrances": entrances,
+    }
+
+
+def _apartments_by_entrance(entrance_ids) -> dict:
+    apartments = defaultdict(list)
+    rows = Apartment.objects.filter(
+        entrance_id__in=entrance_ids
+    ).order_by("id").values(*APARTMENT_COLUMNS)
+
+    for row in rows:
+        apartments[row["entrance_id"]].append(apartment_to_representation(row))
+
+    return apartments
+
+
+def serialize_apartment_rows(rows) -> list:
+    return [apartment_to_representation(row) for row in rows]
+
+
+def serialize_entrance_rows(rows) -> list:
+    """
+    Serialize entrances from rows of ``ENTRANCE_COLUMNS``
+    with one extra query for their apartments.
+    """
+    apartments = _apartments_by_entrance([row["id"] for row in rows])
+
+    return [entrance_to_representation(row, apartments[row["id"]]) for row in rows]
+
+
+def serialize_building_rows(rows) -> list:
+    """
+    Serialize the full tree of the buildings in rows with an ``id``.
+    """
+    return serialize_buildings([row["id"] for row in rows])
+
+
+def serialize_buildings(building_ids) -> list:
+    """
+    Serialize the full tree of the given buildings in three queries,
+    ordered by building id.
+    """
+    rows = Building.objects.filter(
+        id__in=building_ids
+    ).order_by("id").values(*BUILDING_COLUMNS)
+    entrance_rows = list(
+        Entrance.objects.filter(
+            building_id__in=building_ids
+        ).order_by("id").values(*ENTRANCE_COLUMNS)
+    )
+
+    entrances = defaultdict(list)
+    serialized = serialize_entrance_rows(entrance_rows)
+
+    for row, entrance in zip(entrance_rows, serialized):
+        entrances[row["building_id"]].append(entrance)
+
+    return [building_to_representation(row, entrances[row["id"]]) for row in rows]
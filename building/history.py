@@ -0,0 +1,268 @@
+"""
+Audit history of an object and its subtree.
+
+Every ``LogEntry`` is written together with a ``LogEntryIndex`` row
+(see ``building.audit``) holding its object, the building and entrance
+it belongs to (from ``get_additional_data()`` of the model) and its
+actor. A history page is one range scan of a composite index ordered by
+``(timestamp, log_entry)`` descending, followed by a primary key lookup
+of the log entries of the page:
+
+- building: the building, its entrances and apartments
+- entrance: the entrance and its apartments
+- any other object: the object itself
+
+Pages are keyset paginated on ``(timestamp, id)``, so their cost does
+not depend on the size of the log or on how deep the client pages.
+``?since=`` and ``?until=`` (ISO 8601) limit the time range,
+``?actor=<user id>`` the author of the changes.
+
+Scopes and filters are plain lookups, so the same page can be read
+from the index of the entries moved to the archive
+(``ArchivedLogEntryIndex``, see ``building.archive``), which continue
+the history of the table.
+"""
+from datetime import datetime
+
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.response import Response
+
+from building.archive import archived_history
+from building.models import LogEntryIndex
+
+ACTIONS = {
+    LogEntry.Action.CREATE: "create",
+    LogEntry.Action.UPDATE: "update",
+    LogEntry.Action.DELETE: "delete",
+    LogEntry.Action.ACCESS: "access",
+}
+
+
+def index_log_entries(entries) -> None:
+    """
+    Insert the index rows of saved log entries in one query.
+    """
+    rows = []
+
+    for entry in entries:
+        if entry.pk is None:
+            continue
+
+        scope = entry.additional_data if isinstance(entry.additional_data, dict) else {}
+        rows.append(LogEntryIndex(
+            log_entry_id=entry.pk,
+            content_type_id=entry.content_type_id,
+            object_id=entry.object_id,
+            building_id=scope.get("building_id"),
+            entrance_id=scope.get("entrance_id"),
+            actor_id=entry.actor_id,
+            timestamp=entry.timestamp,
+        ))
+
+    LogEntryIndex.objects.bulk_create(rows)
+
+
+def object_scope(instance) -> dict:
+    return {
+        "content_type_id": ContentType.objects.get_for_model(instance).id,
+        "object_id": instance.pk,
+    }
+
+
+def building_scope(building) -> dict:
+    return {"building_id": building.pk}
+
+
+def entrance_scope(entrance) -> dict:
+    return {"entrance_id": entrance.pk}
+
+
+def _parse_timestamp(params, name: str):
+    value = params.get(name)
+
+    if not value:
+        return None
+
+    timestamp = parse_datetime(value)
+
+    if timestamp is None:
+        raise ValidationError({name: "Enter a valid ISO 8601 date and time."})
+
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+
+    return timestamp
+
+
+def history_filters(params) -> dict:
+    """
+    Return the lookups of ``?since=``, ``?until=`` and ``?actor=``.
+    """
+    since = _parse_timestamp(params, "since")
+    until = _parse_timestamp(params, "until")
+    actor = params.get("actor")
+    lookups = {}
+
+    if since is not None:
+        lookups["timestamp__gte"] = since
+
+    if until is not None:
+        lookups["timestamp__lt"] = until
+
+    if actor:
+        if not actor.isdigit():
+            raise ValidationError({"actor": "Enter a user id."})
+
+        lookups["actor_id"] = int(actor)
+
+    return lookups
+
+
+def _serialize_archived(record) -> dict:
+    return {
+        "id": record["id"],
+        "timestamp": record["timestamp"].isoformat(),
+        "action": ACTIONS.get(record["action"], record["action"]),
+        "model": record["model"],
+        "object_id": record["object_id"],
+        "object_repr": record["object_repr"],
+        "actor": record["actor_id"],
+        "changes": record["changes"],
+    }
+
+
+def serialize_history(rows) -> list:
+    entries = LogEntry.objects.in_bulk([
+        row["log_entry_id"] for row in rows if "archived" not in row
+    ])
+    data = []
+
+    for row in rows:
+        if "archived" in row:
+            data.append(_serialize_archived(row["archived"]))
+            continue
+
+        entry = entries[row["log_entry_id"]]
+        content_type = ContentType.objects.get_for_id(entry.content_type_id)
+        data.append({
+            "id": entry.id,
+            "timestamp": entry.timestamp.isoformat(),
+            "action": ACTIONS.get(entry.action, entry.action),
+            "model": f"{content_type.app_label}.{content_type.model}",
+            "object_id": entry.object_id,
+            "object_repr": entry.object_repr,
+            "actor": entry.actor_id,
+            "changes": entry.changes_dict,
+        })
+
+    return data
+
+
+def _position(row) -> tuple:
+    return row["timestamp"], row["log_entry_id"]
+
+
+class HistoryPagination(CursorPagination):
+    """
+    Keyset pagination of the entries matching history lookups,
+    newest first.
+
+    The cursor holds the ``(timestamp, log entry id)`` of the last row
+    of the page, the next page is fetched with ``WHERE (timestamp, id) <
+    cursor ... LIMIT <size>`` from the composite indexes of
+    ``LogEntryIndex``, completed with archived entries of the same range.
+    Forward only.
+    """
+    ordering = ("-timestamp", "-log_entry_id")
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_history(self, lookups: dict, request) -> list:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        queryset = LogEntryIndex.objects.filter(**lookups)
+        position = None
+
+        if self.cursor is not None:
+            position = timestamp, log_entry_id = self._parse_position(
+                self.cursor.position
+            )
+            queryset = queryset.filter(
+                Q(timestamp__lt=timestamp)
+                | Q(timestamp=timestamp, log_entry_id__lt=log_entry_id),
+                timestamp__lte=timestamp,
+            )
+
+        rows = list(
+            queryset.order_by(*self.ordering).values(
+                "log_entry_id", "timestamp"
+            )[:self.page_size + 1]
+        )
+        # Archived entries are older than the table in practice, the
+        # months newer than a full page of the table are skipped.
+        archived = archived_history(
+            lookups,
+            limit=self.page_size + 1,
+            before=position,
+            after=rows[-1]["timestamp"] if len(rows) > self.page_size else None,
+        )
+
+        if archived:
+            rows = sorted(
+                rows + [
+                    {
+                        "log_entry_id": record["id"],
+                        "timestamp": record["timestamp"],
+                        "archived": record,
+                    }
+                    for record in archived
+                ],
+                key=_position,
+                reverse=True,
+            )[:self.page_size + 1]
+
+        self.page = rows[:self.page_size]
+        self.has_next = len(rows) > self.page_size
+
+        return self.page
+
+    @staticmethod
+    def _parse_position(position):
+        try:
+            timestamp, log_entry_id = position.rsplit("|", 1)
+
+            return datetime.fromisoformat(timestamp), int(log_entry_id)
+        except (AttributeError, ValueError):
+            raise NotFound(CursorPagination.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        last = self.page[-1]
+        position = f"{last['timestamp'].isoformat()}|{last['log_entry_id']}"
+
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from building.archive import archive_log_entries
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Move audit log entries older than the retention window "
+        "into gzip compressed JSON lines files partitioned by month."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.AUDITLOG_RETENTION_DAYS,
+            help="Keep entries of this many days in the database.",
+        )
+        parser.add_argument(
+            "--before",
+            help="Archive entries before this ISO 8601 date and time instead.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--directory", default=settings.AUDITLOG_ARCHIVE_DIR)
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            before = parse_datetime(options["before"])
+
+            if before is None:
+                raise CommandError("--before must be an ISO 8601 date and time.")
+
+            if timezone.is_naive(before):
+                before = timezone.make_aware(before)
+        else:
+            before = timezone.now() - timedelta(days=options["days"])
+
+        archived = 0
+
+        for count in archive_log_entries(
+            before,
+            directory=options["directory"],
+            batch_size=options["batch_size"],
+        ):
+            archived += count
+            self.stdout.write(f"Archived {archived} entries")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} entries older than {before.isoformat()} "
+            f"to {options['directory']}."
+        ))
@@ -0,0 +1,190 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from building.benchmark import (
+    AsyncClientTransport,
+    ClientTransport,
+    HttpTransport,
+    get_json,
+    run_async_load,
+    run_load,
+)
+from building.management.commands.generate_data import synthetic_token
+
+ROLE_USERNAMES = {
+    "admin": "synthetic_admin",
+    "manager": "synthetic_manager_00000",
+    "guard": "synthetic_guard_00000",
+}
+ENDPOINTS = (
+    ("buildings", "building:building-list", "building:building-detail"),
+    ("entrances", "building:entrance-list", "building:entrance-detail"),
+    ("apartments", "building:apartment-list", "building:apartment-detail"),
+    ("staff", "user:staff-list", "user:staff-detail"),
+)
+ASYNC_ENDPOINTS = {
+    "building:building-list": "building:async-building-list",
+    "building:building-detail": "building:async-building-detail",
+    "building:entrance-list": "building:async-entrance-list",
+    "building:entrance-detail": "building:async-entrance-detail",
+    "building:apartment-list": "building:async-apartment-list",
+    "building:apartment-detail": "building:async-apartment-detail",
+    "user:staff-detail": "user:async-staff-detail",
+}
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Benchmark the API endpoints per role on data from generate_data "
+        "and print p50/p95/p99 latency, requests per second and RSS growth as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--seed", default="house-security")
+        parser.add_argument(
+            "--base-url",
+            help="Benchmark a running server instead of the in-process test client.",
+        )
+        parser.add_argument(
+            "--async-views",
+            action="store_true",
+            help="Benchmark the async read endpoints instead of the DRF ones.",
+        )
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            help="Send in-process requests through the ASGI handler, "
+                 "with --workers concurrent tasks instead of threads.",
+        )
+        parser.add_argument(
+            "--roles",
+            nargs="+",
+            choices=tuple(ROLE_USERNAMES),
+            default=tuple(ROLE_USERNAMES),
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write(
+                "DEBUG is on: queries are recorded in memory and slow every request."
+            )
+
+        asgi = options["asgi"] and not options["base_url"]
+
+        if asgi:
+            self._warn_sync_middleware()
+
+        results = []
+
+        for role in options["roles"]:
+            token = synthetic_token(options["seed"], ROLE_USERNAMES[role])
+
+            def make_transport(token=token):
+                if options["base_url"]:
+                    return HttpTransport(options["base_url"], token)
+
+                return ClientTransport(token)
+
+            def make_async_transport(token=token):
+                return AsyncClientTransport(token)
+
+            paths = self._paths(make_transport(), options["async_views"])
+
+            for name, path, kind in paths:
+                if asgi:
+                    result = run_async_load(
+                        make_async_transport,
+                        path,
+                        options["requests"],
+                        options["workers"],
+                    )
+                else:
+                    result = run_load(
+                        make_transport, path, options["requests"], options["workers"]
+                    )
+
+                if options["base_url"]:
+                    # The RSS is the one of this client, not of the server.
+                    del result["rss_kb"], result["rss_growth_kb"]
+
+                results.append({
+                    "endpoint": name,
+                    "action": kind,
+                    "role": role,
+                    "path": path,
+                    **result,
+                })
+
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "transport": options["base_url"] or (
+                    "asgi-test-client" if asgi else "test-client"
+                ),
+                "views": "async" if options["async_views"] else "drf",
+                "requests": options["requests"],
+                "workers": options["workers"],
+                "python": platform.python_version(),
+                "django": django.get_version(),
+            },
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as target:
+                target.write(output)
+        else:
+            self.stdout.write(output)
+
+    def _warn_sync_middleware(self):
+        sync_only = [
+            path
+            for path in settings.MIDDLEWARE
+            if not getattr(import_string(path), "async_capable", False)
+        ]
+
+        if sync_only:
+            self.stderr.write(
+                "Sync-only middleware runs every ASGI request through "
+                f"one thread: {', '.join(sync_only)}"
+            )
+
+    @staticmethod
+    def _paths(transport, async_views=False):
+        """
+        Yield list and retrieve paths, taking the retrieved object
+        from the first page of the list as the role sees it.
+        With ``async_views``, yield the paths of the async endpoints.
+        """
+
+        def resolve(name):
+            return ASYNC_ENDPOINTS.get(name) if async_views else name
+
+        for name, list_name, detail_name in ENDPOINTS:
+            list_path = reverse(list_name)
+
+            if resolve(list_name):
+                yield name, reverse(resolve(list_name)), "list"
+
+            status, data = get_json(transport, f"{list_path}?page_size=1")
+
+            if status != 200:
+                continue
+
+            items = data["results"] if isinstance(data, dict) else data
+
+            if items:
+                yield name, reverse(
+                    resolve(detail_name), args=[items[0]["id"]]
+                ), "retrieve"
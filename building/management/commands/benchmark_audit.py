@@ -0,0 +1,137 @@
+import json
+import platform
+import time
+import uuid
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+import django
+from auditlog.context import disable_auditlog
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from building.audit import buffered_audit_log, get_background_flusher
+from building.benchmark import latency_summary
+from building.models import Apartment, Building, Entrance
+
+MODES = (("unbuffered", False), ("buffered", True))
+NUMBER_OFFSET = 1_000_000_000
+
+
+def _flip(apartment) -> None:
+    if apartment.number >= NUMBER_OFFSET:
+        apartment.number -= NUMBER_OFFSET
+    else:
+        apartment.number += NUMBER_OFFSET
+
+    apartment.save()
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Compare the latency of audited writes with and without the audit "
+        "log buffer, one update per transaction and batches of updates in "
+        "one transaction, as JSON. The updates go to a scratch building "
+        "which is deleted afterwards, together with their log entries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writes", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        apartments = self._create_apartments(options["writes"])
+        building = apartments[0].entrance.building
+
+        batch_size = options["batch_size"]
+        batches = [
+            apartments[start:start + batch_size]
+            for start in range(0, len(apartments), batch_size)
+        ]
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "writes": len(apartments),
+                "batch_size": batch_size,
+                "background_flush": settings.AUDITLOG_BACKGROUND_FLUSH,
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+            },
+            "single": {},
+            "bulk": {},
+        }
+
+        try:
+            for mode, buffered in MODES:
+                report["single"][mode] = self._measure(
+                    [[apartment] for apartment in apartments], buffered
+                )
+                report["bulk"][mode] = self._measure(batches, buffered)
+        finally:
+            if settings.AUDITLOG_BACKGROUND_FLUSH:
+                get_background_flusher().stop()
+
+            with disable_auditlog():
+                building.delete()
+
+            LogEntry.objects.filter(
+                content_type=ContentType.objects.get_for_model(Apartment),
+                object_id__in=[apartment.id for apartment in apartments],
+            ).delete()
+
+        output = json.dumps(report, indent=2)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as target:
+                target.write(output)
+        else:
+            self.stdout.write(output)
+
+    def _create_apartments(self, count: int) -> list:
+        """
+        Create a scratch building with ``count`` apartments, without
+        log entries, so the benchmark never touches real data.
+        """
+        with disable_auditlog(), transaction.atomic():
+            building = Building.objects.create(
+                address=f"benchmark_audit {uuid.uuid4().hex}"
+            )
+            entrance = Entrance.objects.create(building=building, number=1)
+
+            return [
+                Apartment.objects.create(entrance=entrance, number=number)
+                for number in range(1, max(count, 1) + 1)
+            ]
+
+    def _measure(self, batches, buffered: bool) -> dict:
+        """
+        Time every batch of updates, in its own transaction, from the
+        first save until its log entries are written.
+        """
+        latencies = []
+        writes = 0
+        started = time.perf_counter()
+
+        for batch in batches:
+            batch_started = time.perf_counter()
+
+            with buffered_audit_log() if buffered else nullcontext():
+                with transaction.atomic():
+                    for apartment in batch:
+                        _flip(apartment)
+
+            latencies.append(time.perf_counter() - batch_started)
+            writes += len(batch)
+
+        elapsed = time.perf_counter() - started
+
+        return {
+            "transactions": len(batches),
+            "writes_per_second": round(writes / elapsed, 1) if elapsed else None,
+            "latency_ms": latency_summary(latencies),
+        }
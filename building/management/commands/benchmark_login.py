@@ -0,0 +1,113 @@
+import itertools
+import json
+import platform
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from building.benchmark import ClientTransport, HttpTransport, run_load, run_requests
+from building.management.commands.generate_data import synthetic_token
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Storm the login endpoint with the synthetic guards from generate_data "
+        "and print logins per second next to the read latency, idle and during "
+        "the storm, as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=200)
+        parser.add_argument("--login-workers", type=int, default=32)
+        parser.add_argument("--reads", type=int, default=200)
+        parser.add_argument("--read-workers", type=int, default=4)
+        parser.add_argument(
+            "--read-path",
+            default=None,
+            help="Path read by the synthetic admin, the building list by default.",
+        )
+        parser.add_argument("--seed", default="house-security")
+        parser.add_argument("--password", default="synthetic1234")
+        parser.add_argument(
+            "--base-url",
+            help="Benchmark a running server instead of the in-process test client.",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        usernames = list(
+            User.objects.filter(username__startswith="synthetic_guard_")
+            .order_by("username")
+            .values_list("username", flat=True)
+        )
+
+        if not usernames:
+            raise CommandError("No synthetic guards, run generate_data first.")
+
+        token = synthetic_token(options["seed"], "synthetic_admin")
+        login_path = reverse("user:login")
+        read_path = options["read_path"] or reverse("building:building-list")
+        credentials = itertools.cycle([
+            {"username": username, "password": options["password"]}
+            for username in usernames
+        ])
+
+        def make_transport(token=None):
+            if options["base_url"]:
+                return HttpTransport(options["base_url"], token)
+
+            return ClientTransport(token)
+
+        def read_load():
+            return run_load(
+                lambda: make_transport(token),
+                read_path,
+                options["reads"],
+                options["read_workers"],
+            )
+
+        idle = read_load()
+
+        with ThreadPoolExecutor(max_workers=1) as storm:
+            logins = storm.submit(
+                run_requests,
+                make_transport,
+                lambda transport: transport.post(login_path, next(credentials)),
+                options["logins"],
+                options["login_workers"],
+            )
+            during_storm = read_load()
+            logins = logins.result()
+
+        logins["logins_per_second"] = logins.pop("rps")
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "transport": options["base_url"] or "test-client",
+                "hasher": get_hasher().algorithm,
+                "hashing_workers": settings.LOGIN_HASHING_WORKERS,
+                "hashing_queue_size": settings.LOGIN_HASHING_QUEUE_SIZE,
+                "guards": len(usernames),
+                "read_path": read_path,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+            },
+            "logins": logins,
+            "reads_idle": idle,
+            "reads_during_storm": during_storm,
+        }
+        output = json.dumps(report, indent=2)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as target:
+                target.write(output)
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,131 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+TARGETS = {
+    "wsgi": "config.wsgi",
+    "asgi": "config.asgi",
+}
+PROFILES = ("development", "production")
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+FILE_CACHE_LOCATION = os.path.join(tempfile.gettempdir(), "benchmark-startup-cache")
+METRICS = (
+    "process_ms",
+    "import_ms",
+    "first_request_ms",
+    "rss_kb",
+    "peak_rss_kb",
+    "modules",
+)
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Start fresh worker processes per entry point and settings profile and "
+        "print cold import time, first-request latency and peak RSS as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--targets", nargs="+", choices=tuple(TARGETS), default=tuple(TARGETS)
+        )
+        parser.add_argument(
+            "--profiles", nargs="+", choices=PROFILES, default=PROFILES
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--path",
+            default="/api/buildings/",
+            help="Path of the first request.",
+        )
+        parser.add_argument("--token", help="Send the first request with this token.")
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        results = []
+
+        for target in options["targets"]:
+            for profile in options["profiles"]:
+                samples = [
+                    self._sample(TARGETS[target], profile, options)
+                    for _ in range(options["repeat"])
+                ]
+                results.append({
+                    "target": TARGETS[target],
+                    "profile": profile,
+                    "statuses": sorted({sample["status"] for sample in samples}),
+                    **{
+                        metric: {
+                            "median": statistics.median(
+                                sample[metric] for sample in samples
+                            ),
+                            "max": max(sample[metric] for sample in samples),
+                        }
+                        for metric in METRICS
+                    },
+                })
+
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "path": options["path"],
+                "repeat": options["repeat"],
+                "python": platform.python_version(),
+                "django": django.get_version(),
+            },
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as target:
+                target.write(output)
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def _sample(module: str, profile: str, options) -> dict:
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get(
+                "DJANGO_SETTINGS_MODULE", "config.settings"
+            ),
+            "SETTINGS_PROFILE": profile,
+        }
+
+        if profile == "production":
+            # Production never runs with DEBUG, which is what lets
+            # "localhost" through an empty ALLOWED_HOSTS, and needs a
+            # shared cache, which one host's workers find in files.
+            env.setdefault("ALLOWED_HOSTS", "localhost")
+            env.setdefault("CACHE_BACKEND", FILE_CACHE)
+            env.setdefault("CACHE_LOCATION", FILE_CACHE_LOCATION)
+
+        command = [sys.executable, "-m", "building.startup", module, options["path"]]
+
+        if options["token"]:
+            command.append(options["token"])
+
+        started = time.perf_counter()
+        completed = subprocess.run(
+            command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - started
+
+        if completed.returncode != 0:
+            raise CommandError(completed.stderr.strip())
+
+        sample = json.loads(completed.stdout.strip().splitlines()[-1])
+        sample["process_ms"] = round(elapsed * 1000, 3)
+
+        return sample
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from building.openapi import CompiledSchema, generate_schema
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Generate the OpenAPI schema and store it with its content hash, "
+        "to be served by /api/schema/ without introspecting the views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=settings.OPENAPI_SCHEMA_FILE,
+            help="Defaults to the OPENAPI_SCHEMA_FILE setting.",
+        )
+
+    def handle(self, *args, **options):
+        compiled = CompiledSchema(generate_schema())
+        compiled.dump(options["output"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote schema {compiled.hash[:12]} to {options['output']}."
+        ))
@@ -0,0 +1,165 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+from building.models import Building, Entrance, Apartment
+from building.signals import invalidate_buildings
+
+User = get_user_model()
+
+ADDRESS_SUFFIX = "Synthetic St"
+BATCH_SIZE = 5000
+
+
+def synthetic_token(seed: str, username: str) -> str:
+    """
+    Token key of a generated user, so benchmarks can rebuild it
+    from the seed without reading the database.
+    """
+    return hashlib.sha1(f"{seed}:{username}".encode()).hexdigest()
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Generate a deterministic dataset of buildings, entrances, apartments, "
+        "managers and guards with auth tokens, for local load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buildings", type=int, default=100)
+        parser.add_argument("--entrances-per-building", type=int, default=4)
+        parser.add_argument("--apartments-per-entrance", type=int, default=20)
+        parser.add_argument("--managers", type=int, default=10)
+        parser.add_argument("--guards", type=int, default=50)
+        parser.add_argument(
+            "--seed",
+            default="house-security",
+            help="Seed for token keys. The same seed gives the same tokens.",
+        )
+        parser.add_argument(
+            "--password",
+            default="synthetic1234",
+            help="Password of every generated user.",
+        )
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith="synthetic_").exists():
+            raise CommandError(
+                "Synthetic data already exists, generate it into a fresh database."
+            )
+
+        if options["managers"] < 1 or options["guards"] < 1:
+            raise CommandError("At least one manager and one guard are required.")
+
+        with transaction.atomic():
+            users = self._create_users(options)
+            self._create_hierarchy(users, options)
+
+        entrances = options["buildings"] * options["entrances_per_building"]
+        apartments = entrances * options["apartments_per_entrance"]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['buildings']} buildings, {entrances} entrances, "
+            f"{apartments} apartments and "
+            f"{sum(len(role_users) for role_users in users.values())} users. "
+            f"Tokens are derived from seed {options['seed']!r}."
+        ))
+
+    @staticmethod
+    def _create_users(options) -> dict:
+        password = make_password(options["password"])
+        users = [User(username="synthetic_admin", role="admin", password=password)]
+
+        for role in ("manager", "guard"):
+            users.extend(
+                User(
+                    username=f"synthetic_{role}_{i:05d}",
+                    first_name=role.capitalize(),
+                    last_name=f"{i:05d}",
+                    role=role,
+                    password=password,
+                )
+                for i in range(options[f"{role}s"])
+            )
+
+        users = User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+        Token.objects.bulk_create(
+            [
+                Token(key=synthetic_token(options["seed"], user.username), user=user)
+                for user in users
+            ],
+            batch_size=BATCH_SIZE
+        )
+
+        groups = {
+            group.name.lower(): group
+            for group in Group.objects.filter(name__in=["Admin", "Manager", "Guard"])
+        }
+        memberships = User.groups.through
+        memberships.objects.bulk_create(
+            [
+                memberships(user_id=user.id, group_id=groups[user.role].id)
+                for user in users
+                if user.role in groups
+            ],
+            batch_size=BATCH_SIZE
+        )
+
+        by_role = {"admin": [], "manager": [], "guard": []}
+
+        for user in users:
+            by_role[user.role].append(user)
+
+        return by_role
+
+    @staticmethod
+    def _create_hierarchy(users, options):
+        managers = users["manager"]
+        guards = users["guard"]
+        entrance_count = options["entrances_per_building"]
+
+        buildings = Building.objects.bulk_create(
+            [
+                Building(
+                    address=f"{i} {ADDRESS_SUFFIX}",
+                    manager=managers[i % len(managers)],
+                    entrance_count=entrance_count,
+                    guarded_entrance_count=entrance_count,
+                    apartment_count=entrance_count * options["apartments_per_entrance"],
+                )
+                for i in range(options["buildings"])
+            ],
+            batch_size=BATCH_SIZE
+        )
+        entrances = Entrance.objects.bulk_create(
+            [
+                Entrance(
+                    building=building,
+                    number=number,
+                    guard=guards[
+                        (i * options["entrances_per_building"] + number) % len(guards)
+                    ],
+                )
+                for i, building in enumerate(buildings)
+                for number in range(1, options["entrances_per_building"] + 1)
+            ],
+            batch_size=BATCH_SIZE
+        )
+
+        for start in range(0, len(entrances), BATCH_SIZE):
+            Apartment.objects.bulk_create(
+                [
+                    Apartment(entrance=entrance, number=number)
+                    for entrance in entrances[start:start + BATCH_SIZE]
+                    for number in range(1, options["apartments_per_entrance"] + 1)
+                ],
+                batch_size=BATCH_SIZE
+            )
+
+        # bulk_create skips the signals that drop cached snapshots.
+        invalidate_buildings([building.id for building in buildings])
@@ -0,0 +1,236 @@
+import csv
+import json
+import time
+from contextlib import nullcontext
+from itertools import islice
+
+from auditlog.context import disable_auditlog
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from building.audit import build_log_entry, log_bulk_create, write_log_entries
+from building.counters import recompute_building_counters
+from building.models import Building, Entrance, Apartment
+from building.signals import invalidate_buildings
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Import buildings, entrances and apartments from a CSV or JSONL file "
+        "with rows of (address, entrance, guard, apartments)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import.")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "jsonl"),
+            help="Input format. Detected from the file extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows imported per transaction.",
+        )
+        parser.add_argument(
+            "--resume-from",
+            type=int,
+            default=0,
+            help="Number of rows to skip, as reported after a failed batch.",
+        )
+        parser.add_argument(
+            "--no-auditlog",
+            action="store_true",
+            help="Do not write audit log entries during the import.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"] or (
+            "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+        )
+        batch_size = options["batch_size"]
+        skipped = imported = options["resume_from"]
+
+        self.guards = dict(
+            User.objects.filter(role="guard").values_list("username", "id")
+        )
+        auditlog_context = (
+            disable_auditlog() if options["no_auditlog"] else nullcontext()
+        )
+        started = time.monotonic()
+
+        with open(path, newline="", encoding="utf-8") as source, auditlog_context:
+            rows = islice(self._read_rows(source, input_format), imported, None)
+
+            while True:
+                try:
+                    batch = list(islice(rows, batch_size))
+
+                    if not batch:
+                        break
+
+                    with transaction.atomic():
+                        self._import_batch(batch)
+                except (ValueError, KeyError, TypeError, DatabaseError) as error:
+                    raise CommandError(
+                        f"Batch starting at row {imported + 1} failed: {error}. "
+                        f"Rows before it are imported, fix the file and rerun "
+                        f"with --resume-from {imported}."
+                    ) from error
+
+                imported += len(batch)
+                self.stdout.write(
+                    f"Imported {imported} rows "
+                    f"({self._rate(imported - skipped, started)} rows/s)"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Import finished: {imported - skipped} rows in "
+            f"{time.monotonic() - started:.1f}s "
+            f"({self._rate(imported - skipped, started)} rows/s)."
+        ))
+
+    @staticmethod
+    def _rate(rows: int, started: float) -> int:
+        return int(rows / max(time.monotonic() - started, 1e-6))
+
+    @staticmethod
+    def _read_rows(source, input_format):
+        if input_format == "jsonl":
+            records = (json.loads(line) for line in source if line.strip())
+        else:
+            records = csv.DictReader(source)
+
+        for record in records:
+            apartments = record.get("apartments") or []
+
+            if isinstance(apartments, str):
+                apartments = apartments.replace(";", " ").replace(",", " ").split()
+
+            yield {
+                "address": record["address"].strip(),
+                "entrance": int(record["entrance"]),
+                "guard": (record.get("guard") or "").strip() or None,
+                "apartments": [int(number) for number in apartments],
+            }
+
+    def _guard_id(self, username):
+        if username is None:
+            return None
+
+        if username not in self.guards:
+            raise ValueError(f"unknown guard username {username!r}")
+
+        return self.guards[username]
+
+    def _import_batch(self, rows):
+        buildings = self._upsert_buildings({row["address"] for row in rows})
+        entrances, reassigned_user_ids = self._upsert_entrances(rows, buildings)
+        self._insert_apartments(rows, buildings, entrances)
+
+        building_ids = [building.id for building in buildings.values()]
+        recompute_building_counters(building_ids)
+        invalidate_buildings(building_ids, reassigned_user_ids)
+
+    @staticmethod
+    def _upsert_buildings(addresses) -> dict:
+        buildings = {
+            building.address: building
+            for building in Building.objects.filter(address__in=addresses)
+        }
+        created = Building.objects.bulk_create(
+            [Building(address=address) for address in addresses - buildings.keys()]
+        )
+        log_bulk_create(created)
+        buildings.update((building.address, building) for building in created)
+
+        return buildings
+
+    def _upsert_entrances(self, rows, buildings) -> tuple:
+        """
+        Create the missing entrances and reassign the guards of the
+        others. Return the entrances by ``(building id, number)`` and
+        the previous and new guards of the reassigned ones.
+        """
+        guards = {
+            (buildings[row["address"]].id, row["entrance"]): self._guard_id(row["guard"])
+            for row in rows
+        }
+        entrances = {
+            (entrance.building_id, entrance.number): entrance
+            for entrance in Entrance.objects.filter(
+                building_id__in={building_id for building_id, _ in guards},
+                number__in={number for _, number in guards},
+            )
+        }
+        buildings_by_id = {building.id: building for building in buildings.values()}
+
+        changed = []
+        log_entries = []
+        reassigned_user_ids = set()
+
+        for key, guard_id in guards.items():
+            entrance = entrances.get(key)
+
+            if entrance is None or entrance.guard_id == guard_id:
+                continue
+
+            log_entries.append(build_log_entry(
+                entrance,
+                LogEntry.Action.UPDATE,
+                {"guard": [str(entrance.guard_id), str(guard_id)]}
+            ))
+            reassigned_user_ids.update((entrance.guard_id, guard_id))
+            entrance.guard_id = guard_id
+            changed.append(entrance)
+
+        Entrance.objects.bulk_update(changed, ["guard"])
+        write_log_entries(log_entries)
+
+        created = Entrance.objects.bulk_create([
+            Entrance(
+                building=buildings_by_id[building_id],
+                number=number,
+                guard_id=guard_id
+            )
+            for (building_id, number), guard_id in guards.items()
+            if (building_id, number) not in entrances
+        ])
+        log_bulk_create(created)
+        entrances.update(
+            ((entrance.building_id, entrance.number), entrance) for entrance in created
+        )
+
+        return entrances, reassigned_user_ids
+
+    @staticmethod
+    def _insert_apartments(rows, buildings, entrances):
+        wanted = {
+            (entrances[(buildings[row["address"]].id, row["entrance"])], number)
+            for row in rows
+            for number in row["apartments"]
+        }
+
+        if not wanted:
+            return
+
+        existing = set(
+            Apartment.objects.filter(
+                entrance_id__in={entrance.id for entrance, _ in wanted},
+                number__in={number for _, number in wanted},
+            ).values_list("entrance_id", "number")
+        )
+        created = Apartment.objects.bulk_create([
+            Apartment(entrance=entrance, number=number)
+            for entrance, number in sorted(
+                wanted, key=lambda item: (item[0].id, item[1])
+            )
+            if (entrance.id, number) not in existing
+        ])
+        log_bulk_create(created)
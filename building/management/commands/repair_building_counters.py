@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from building.counters import recompute_building_counters, stale_building_ids
+from building.models import Building
+from building.signals import invalidate_buildings
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Recompute the entrance and apartment counters of buildings "
+        "whose counters do not match their entrances and apartments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "building_ids",
+            nargs="*",
+            type=int,
+            help="Only check these buildings.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = Building.objects.order_by("id")
+
+        if options["building_ids"]:
+            queryset = queryset.filter(id__in=options["building_ids"])
+
+        checked = repaired = 0
+        last_id = 0
+
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id)
+                .values_list("id", flat=True)[:options["batch_size"]]
+            )
+
+            if not batch:
+                break
+
+            last_id = batch[-1]
+            checked += len(batch)
+
+            with transaction.atomic():
+                stale = stale_building_ids(Building.objects.filter(id__in=batch))
+                recompute_building_counters(stale)
+                invalidate_buildings(stale)
+
+            repaired += len(stale)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} buildings, repaired {repaired}."
+        ))
@@ -0,0 +1,184 @@
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from building.audit import abuffered_audit_log, buffered_audit_log
+from building.db_router import (
+    allow_replica_reads,
+    ais_sticky,
+    astick_to_primary,
+    is_sticky,
+    reset_replica_reads,
+    routes_to_replica_apps,
+    stick_to_primary,
+)
+from building.timing import RequestTimer, active_timer, histograms
+
+
+class HybridMiddleware:
+    """
+    Middleware running natively under WSGI and ASGI,
+    so async views are not pushed onto a thread.
+    Subclasses override ``handle()`` and ``ahandle()``,
+    both pass the request on unchanged by default.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.ahandle(request)
+
+        return self.handle(request)
+
+    def handle(self, request):
+        return self.get_response(request)
+
+    async def ahandle(self, request):
+        return await self.get_response(request)
+
+
+class AuditLogBufferMiddleware(HybridMiddleware):
+    """
+    Collect the audit log entries of a request, attributed to its
+    user, and write them in one query once it is handled.
+    """
+
+    def handle(self, request):
+        with buffered_audit_log(request):
+            return self.get_response(request)
+
+    async def ahandle(self, request):
+        async with abuffered_audit_log(request):
+            return await self.get_response(request)
+
+
+class RequestTimingMiddleware(HybridMiddleware):
+    """
+    Time DRF requests by phase, answer with a Server-Timing header
+    and record them in the histograms. Disabled with REQUEST_TIMING=0.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+
+        super().__init__(get_response)
+
+    def handle(self, request):
+        timer = RequestTimer()
+        token = active_timer.set(timer)
+
+        try:
+            with self._wrap_queries(timer):
+                response = self.get_response(request)
+        finally:
+            active_timer.reset(token)
+
+        return self._record(request, response, timer)
+
+    async def ahandle(self, request):
+        timer = RequestTimer()
+        token = active_timer.set(timer)
+
+        try:
+            with self._wrap_queries(timer):
+                response = await self.get_response(request)
+        finally:
+            active_timer.reset(token)
+
+        return self._record(request, response, timer)
+
+    @staticmethod
+    def _wrap_queries(timer):
+        stack = ExitStack()
+
+        for alias in connections:
+            stack.enter_context(
+                connections[alias].execute_wrapper(timer.execute_wrapper)
+            )
+
+        return stack
+
+    def _record(self, request, response, timer):
+        if timer.is_api:
+            total = timer.elapsed()
+            response["Server-Timing"] = timer.server_timing(total)
+            histograms.observe(
+                self._route(request),
+                request.method,
+                self._role(request),
+                total,
+                timer.phases,
+                timer.queries,
+            )
+
+        return response
+
+    @staticmethod
+    def _route(request) -> str:
+        match = getattr(request, "resolver_match", None)
+
+        return match.view_name if match else "unmatched"
+
+    @staticmethod
+    def _role(request) -> str:
+        user = getattr(request, "user", None)
+
+        if user is None or not user.is_authenticated:
+            return "anonymous"
+
+        return user.role
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """
+    Send safe-method reads of the building and user APIs to replicas,
+    unless the client wrote recently. See building/db_router.py.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICA_ALIASES:
+            raise MiddlewareNotUsed
+
+        super().__init__(get_response)
+
+    def handle(self, request):
+        token = None
+
+        if routes_to_replica_apps(request) and not is_sticky(request):
+            token = allow_replica_reads()
+
+        try:
+            return self.get_response(request)
+        finally:
+            if token is not None:
+                reset_replica_reads(token)
+
+            if request.method not in SAFE_METHODS:
+                stick_to_primary(request)
+
+    async def ahandle(self, request):
+        token = None
+
+        if routes_to_replica_apps(request) and not await ais_sticky(request):
+            token = allow_replica_reads()
+
+        try:
+            return await self.get_response(request)
+        finally:
+            if token is not None:
+                reset_replica_reads(token)
+
+            if request.method not in SAFE_METHODS:
+                await astick_to_primary(request)
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Building = apps.get_model('building', 'Building')
+    Entrance = apps.get_model('building', 'Entrance')
+    Apartment = apps.get_model('building', 'Apartment')
+    entrances = Entrance.objects.filter(building=OuterRef('pk'))
+
+    Building.objects.update(
+        entrance_count=_count(entrances, 'building'),
+        guarded_entrance_count=_count(
+            entrances.filter(guard__isnull=False), 'building'
+        ),
+        apartment_count=_count(
+            Apartment.objects.filter(entrance__building=OuterRef('pk')),
+            'entrance__building'
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('building', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='building',
+            name='apartment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='building',
+            name='entrance_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='building',
+            name='guarded_entrance_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
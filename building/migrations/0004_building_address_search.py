@@ -0,0 +1,80 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CREATE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE building_address_search USING fts5(
+        address,
+        content='building_building',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER building_address_search_insert
+    AFTER INSERT ON building_building BEGIN
+        INSERT INTO building_address_search(rowid, address)
+        VALUES (new.id, new.address);
+    END
+    """,
+    """
+    CREATE TRIGGER building_address_search_delete
+    AFTER DELETE ON building_building BEGIN
+        INSERT INTO building_address_search(building_address_search, rowid, address)
+        VALUES ('delete', old.id, old.address);
+    END
+    """,
+    """
+    CREATE TRIGGER building_address_search_update
+    AFTER UPDATE OF address ON building_building BEGIN
+        INSERT INTO building_address_search(building_address_search, rowid, address)
+        VALUES ('delete', old.id, old.address);
+        INSERT INTO building_address_search(rowid, address)
+        VALUES (new.id, new.address);
+    END
+    """,
+    """
+    INSERT INTO building_address_search(building_address_search) VALUES ('rebuild')
+    """,
+]
+
+DROP_INDEX = [
+    'DROP TRIGGER IF EXISTS building_address_search_insert',
+    'DROP TRIGGER IF EXISTS building_address_search_delete',
+    'DROP TRIGGER IF EXISTS building_address_search_update',
+    'DROP TABLE IF EXISTS building_address_search',
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # Other databases fall back to icontains, see building/search.py.
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('building', '0003_building_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuildingAddressSearch',
+            fields=[
+                ('building', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='building.building')),
+                ('address', models.TextField()),
+            ],
+            options={
+                'db_table': 'building_address_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(_run(CREATE_INDEX), _run(DROP_INDEX)),
+    ]
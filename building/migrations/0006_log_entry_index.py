@@ -0,0 +1,107 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def fill_log_entry_index(apps, schema_editor):
+    # Entries written before the index have no scope in additional_data,
+    # it is taken from the objects that still exist.
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    LogEntry = apps.get_model('auditlog', 'LogEntry')
+    Entrance = apps.get_model('building', 'Entrance')
+    Apartment = apps.get_model('building', 'Apartment')
+    LogEntryIndex = apps.get_model('building', 'LogEntryIndex')
+
+    content_types = dict(
+        ContentType.objects.filter(app_label='building').values_list('model', 'id')
+    )
+    last_id = 0
+
+    while True:
+        entries = list(
+            LogEntry.objects.filter(id__gt=last_id).order_by('id').values(
+                'id', 'content_type_id', 'object_id', 'actor_id', 'timestamp'
+            )[:BATCH_SIZE]
+        )
+
+        if not entries:
+            break
+
+        last_id = entries[-1]['id']
+        object_ids = {}
+
+        for entry in entries:
+            object_ids.setdefault(entry['content_type_id'], set()).add(entry['object_id'])
+
+        scopes = {}
+
+        if 'building' in content_types:
+            scopes.update(
+                ((content_types['building'], pk), (pk, None))
+                for pk in object_ids.get(content_types['building'], ())
+            )
+
+        if 'entrance' in content_types:
+            scopes.update(
+                ((content_types['entrance'], pk), (building_id, pk))
+                for pk, building_id in Entrance.objects.filter(
+                    pk__in=object_ids.get(content_types['entrance'], ())
+                ).values_list('pk', 'building_id')
+            )
+
+        if 'apartment' in content_types:
+            scopes.update(
+                ((content_types['apartment'], pk), (building_id, entrance_id))
+                for pk, entrance_id, building_id in Apartment.objects.filter(
+                    pk__in=object_ids.get(content_types['apartment'], ())
+                ).values_list('pk', 'entrance_id', 'entrance__building_id')
+            )
+
+        rows = []
+
+        for entry in entries:
+            building_id, entrance_id = scopes.get(
+                (entry['content_type_id'], entry['object_id']), (None, None)
+            )
+            rows.append(LogEntryIndex(
+                log_entry_id=entry['id'],
+                content_type_id=entry['content_type_id'],
+                object_id=entry['object_id'],
+                building_id=building_id,
+                entrance_id=entrance_id,
+                actor_id=entry['actor_id'],
+                timestamp=entry['timestamp'],
+            ))
+
+        LogEntryIndex.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditlog', '0015_alter_logentry_changes'),
+        ('building', '0004_building_address_search'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogEntryIndex',
+            fields=[
+                ('log_entry', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='auditlog.logentry')),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('building_id', models.BigIntegerField(blank=True, null=True)),
+                ('entrance_id', models.BigIntegerField(blank=True, null=True)),
+                ('actor_id', models.BigIntegerField(blank=True, null=True)),
+                ('timestamp', models.DateTimeField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['content_type', 'object_id', '-timestamp', '-log_entry'], name='log_index_object'), models.Index(fields=['building_id', '-timestamp', '-log_entry'], name='log_index_building'), models.Index(fields=['entrance_id', '-timestamp', '-log_entry'], name='log_index_entrance'), models.Index(fields=['actor_id', '-timestamp', '-log_entry'], name='log_index_actor')],
+            },
+        ),
+        migrations.RunPython(fill_log_entry_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('building', '0006_log_entry_index'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedLogEntryIndex',
+            fields=[
+                ('log_entry_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('building_id', models.BigIntegerField(blank=True, null=True)),
+                ('entrance_id', models.BigIntegerField(blank=True, null=True)),
+                ('actor_id', models.BigIntegerField(blank=True, null=True)),
+                ('timestamp', models.DateTimeField()),
+                ('partition', models.CharField(max_length=255)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['content_type', 'object_id', '-timestamp', '-log_entry_id'], name='archive_index_object'), models.Index(fields=['building_id', '-timestamp', '-log_entry_id'], name='archive_index_building'), models.Index(fields=['entrance_id', '-timestamp', '-log_entry_id'], name='archive_index_entrance'), models.Index(fields=['actor_id', '-timestamp', '-log_entry_id'], name='archive_index_actor')],
+            },
+        ),
+    ]
@@ -0,0 +1,285 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from building.db_router import replica_reads_active
+from building.history import (
+    HistoryPagination,
+    history_filters,
+    object_scope,
+    serialize_history,
+)
+from building.streaming import iter_keyset_chunks, stream_json_array
+from building.timing import timed_phase
+from building.versions import get_scope_version, scope_etag, user_scope
+
+BULK_CREATE_MAX_SIZE = 1000
+
+
+def require_class_attributes(cls, *names) -> None:
+    """
+    Raise ``ImproperlyConfigured`` unless the subclass ``cls`` sets
+    every attribute of ``names``.
+    """
+    if not all(getattr(cls, name) for name in names):
+        raise ImproperlyConfigured(
+            f"{cls.__name__} must set {', '.join(names[:-1])} and {names[-1]}."
+        )
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+def _split_param(value) -> set:
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+class SparseFieldsetsViewMixin:
+    """
+    ViewSet mixin reading ``?fields=`` and ``?expand=`` for list/retrieve.
+
+    The parsed values are passed to the serializer (see
+    ``SparseFieldsetsMixin``) and exposed through ``is_expanded()``
+    so ``get_queryset`` can skip prefetches of relations that are
+    not going to be serialized.
+    """
+
+    def get_sparse_fieldsets(self):
+        params = self.request.query_params
+
+        if self.action not in ("list", "retrieve"):
+            return None
+
+        if "fields" not in params and "expand" not in params:
+            return None
+
+        expand = set()
+
+        for path in _split_param(params.get("expand", "")):
+            parts = path.split(".")
+            expand.update(
+                ".".join(parts[:depth]) for depth in range(1, len(parts) + 1)
+            )
+
+        return {
+            "fields": _split_param(params.get("fields", "")) or None,
+            "expand": expand,
+        }
+
+    def is_expanded(self, path: str) -> bool:
+        sparse = self.get_sparse_fieldsets()
+
+        if sparse is None:
+            return True
+
+        fields = sparse["fields"] or ()
+
+        return path in sparse["expand"] or (
+            "." not in path and path in fields
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        sparse = self.get_sparse_fieldsets()
+
+        if sparse is not None:
+            kwargs.update(sparse)
+
+        return super().get_serializer(*args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding strong ETags to list/retrieve responses.
+
+    The ETag is derived from the version of the user's scope
+    (see ``building.versions``), the media type and the full path,
+    so ``If-None-Match`` is answered with ``304 Not Modified``
+    right after the permission checks, before any query runs.
+
+    The version is current while a replica may lag behind it, so a body
+    read from a replica is sent without an ETag. Views that build the
+    body from the primary say so in ``reads_primary()``.
+    """
+    etag = None
+
+    def reads_primary(self) -> bool:
+        """
+        Whether the body of this request is read from the primary.
+        Snapshot-backed reads count, since they fetch the ids of their
+        rows from the primary too.
+        """
+        return False
+
+    def get_etag(self, request) -> str:
+        return scope_etag(
+            request.user,
+            get_scope_version(user_scope(request.user)),
+            request.accepted_media_type,
+            request.get_full_path(),
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if request.method not in ("GET", "HEAD"):
+            return
+
+        if self.action not in ("list", "retrieve"):
+            return
+
+        self.etag = self.get_etag(request)
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+
+        if self.etag in etags:
+            raise NotModified()
+
+        if etags == ["*"]:
+            # "*" matches any current representation, and an object that
+            # does not exist or is out of scope has none: answer 404.
+            if self.action == "retrieve":
+                self.get_object()
+
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": self.etag}
+            )
+
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if (
+            self.etag
+            and response.status_code == status.HTTP_200_OK
+            and (self.reads_primary() or not replica_reads_active())
+        ):
+            response["ETag"] = self.etag
+
+        return response
+
+
+class StreamingListMixin:
+    """
+    ViewSet mixin streaming the whole, unpaginated list as one JSON array
+    when ``?stream=1`` is given.
+
+    The ``stream_columns`` of the filtered queryset are fetched in keyset
+    chunks of ``stream_chunk_size`` and each chunk of rows is serialized
+    by ``stream_serializer``, so memory use does not grow with the number
+    of rows. Both must be set by the viewset.
+    """
+    stream_chunk_size = 500
+    stream_columns = ()
+    stream_serializer = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        require_class_attributes(cls, "stream_columns", "stream_serializer")
+
+    def is_streaming(self) -> bool:
+        return (
+            self.action == "list"
+            and self.request.query_params.get("stream") in ("1", "true")
+        )
+
+    def stream_list(self):
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *self.stream_columns
+        )
+        chunks = iter_keyset_chunks(queryset, self.stream_chunk_size)
+
+        return StreamingHttpResponse(
+            stream_json_array(self.stream_serializer(rows) for rows in chunks),
+            content_type="application/json"
+        )
+
+
+class BulkCreateMixin:
+    """
+    ViewSet mixin adding ``POST <list url>/bulk/``.
+
+    Accepts a list of objects, validates them with set-based queries
+    and creates them in one transaction. Responds with the created
+    objects or with a list of per-item errors when any item is invalid.
+    """
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=BULK_CREATE_MAX_SIZE,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ReassignMixin:
+    """
+    ViewSet mixin adding ``POST <list url>/reassign/``.
+
+    Moves many objects of ``get_queryset()`` to another manager or guard
+    at once with the serializer of the ``reassign`` action, a
+    ``ReassignSerializer``. Responds with the ids of the moved objects.
+    """
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    @action(detail=False, methods=["post"])
+    def reassign(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        instances = serializer.reassign(self.get_queryset())
+
+        return Response({"updated": [instance.id for instance in instances]})
+
+
+class HistoryMixin:
+    """
+    ViewSet mixin adding ``GET <detail url>/history/``, the audit log
+    of the object, newest first (see ``building.history``).
+
+    ``get_history_scope()`` returns the lookups of the entries of the
+    object, override it to include its subtree.
+    """
+
+    def get_history_scope(self, instance) -> dict:
+        return object_scope(instance)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("since", OpenApiTypes.DATETIME),
+            OpenApiParameter("until", OpenApiTypes.DATETIME),
+            OpenApiParameter("actor", OpenApiTypes.INT),
+            OpenApiParameter("page_size", OpenApiTypes.INT),
+            OpenApiParameter("cursor", OpenApiTypes.STR),
+        ],
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(detail=True, methods=["get"])
+    def history(self, request, *args, **kwargs):
+        lookups = {
+            **self.get_history_scope(self.get_object()),
+            **history_filters(request.query_params),
+        }
+        paginator = HistoryPagination()
+        rows = paginator.paginate_history(lookups, request)
+
+        with timed_phase("serialize"):
+            data = serialize_history(rows)
+
+        return paginator.get_paginated_response(data)
@@ -1,10 +1,15 @@
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 
+from auditlog.models import LogEntry
 from auditlog.registry import auditlog
 
 User = get_user_model()
 
+COUNTER_FIELDS = ("entrance_count", "apartment_count", "guarded_entrance_count")
+
 
 class Building(models.Model):
     address = models.CharField(max_length=255, unique=True)
@@ -15,12 +20,50 @@ class Building(models.Model):
         blank=True,
         related_name="buildings",
     )
+    entrance_count = models.PositiveIntegerField(default=0, editable=False)
+    apartment_count = models.PositiveIntegerField(default=0, editable=False)
+    guarded_entrance_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return self.address
 
+    def get_additional_data(self) -> dict:
+        # Stored on every log entry, see building.history.
+        return {"building_id": self.pk}
+
+    def save(self, *args, **kwargs):
+        # Counters are only changed by UPDATE statements from building.counters,
+        # never written back from a possibly stale instance.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS
+            ]
+
+        super().save(*args, **kwargs)
+
+
+auditlog.register(Building, exclude_fields=list(COUNTER_FIELDS))
 
-auditlog.register(Building)
+
+class BuildingAddressSearch(models.Model):
+    """
+    FTS5 trigram index over Building.address, maintained by triggers.
+    Only exists on SQLite, see building.search.
+    """
+    building = models.OneToOneField(
+        Building,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        related_name="+",
+    )
+    address = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = "building_address_search"
 
 
 class Entrance(models.Model):
@@ -49,6 +92,9 @@ class Entrance(models.Model):
     def __str__(self) -> str:
         return f"Building: {self.building.address}, Number: {self.number}"
 
+    def get_additional_data(self) -> dict:
+        return {"building_id": self.building_id, "entrance_id": self.pk}
+
 
 auditlog.register(Entrance)
 
@@ -72,5 +118,102 @@ class Apartment(models.Model):
     def __str__(self) -> str:
         return f"Entrance: {self.entrance.number}, Number: {self.number}"
 
+    def get_additional_data(self) -> dict:
+        # The entrance is already loaded by __str__ for the object repr.
+        try:
+            building_id = self.entrance.building_id
+        except ObjectDoesNotExist:
+            building_id = None
+
+        return {"building_id": building_id, "entrance_id": self.entrance_id}
+
 
 auditlog.register(Apartment)
+
+
+class LogEntryIndex(models.Model):
+    """
+    Index of the audit log by object, building, entrance and actor,
+    written alongside every ``LogEntry``, see building.history.
+
+    Entries of a building, its entrances and apartments share the
+    ``building_id``, entries of an entrance and its apartments the
+    ``entrance_id``, so the history of a subtree is one index range.
+    Ids are not foreign keys: the history outlives the objects.
+    """
+    log_entry = models.OneToOneField(
+        LogEntry,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+    )
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    object_id = models.BigIntegerField(null=True, blank=True)
+    building_id = models.BigIntegerField(null=True, blank=True)
+    entrance_id = models.BigIntegerField(null=True, blank=True)
+    actor_id = models.BigIntegerField(null=True, blank=True)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["content_type", "object_id", "-timestamp", "-log_entry"],
+                name="log_index_object",
+            ),
+            models.Index(
+                fields=["building_id", "-timestamp", "-log_entry"],
+                name="log_index_building",
+            ),
+            models.Index(
+                fields=["entrance_id", "-timestamp", "-log_entry"],
+                name="log_index_entrance",
+            ),
+            models.Index(
+                fields=["actor_id", "-timestamp", "-log_entry"],
+                name="log_index_actor",
+            ),
+        ]
+
+
+class ArchivedLogEntryIndex(models.Model):
+    """
+    ``LogEntryIndex`` of the entries moved to the archive, pointing to
+    the partition file that holds each of them (relative to
+    ``AUDITLOG_ARCHIVE_DIR``), see building.archive.
+    """
+    log_entry_id = models.BigIntegerField(primary_key=True)
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    object_id = models.BigIntegerField(null=True, blank=True)
+    building_id = models.BigIntegerField(null=True, blank=True)
+    entrance_id = models.BigIntegerField(null=True, blank=True)
+    actor_id = models.BigIntegerField(null=True, blank=True)
+    timestamp = models.DateTimeField()
+    partition = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["content_type", "object_id", "-timestamp", "-log_entry_id"],
+                name="archive_index_object",
+            ),
+            models.Index(
+                fields=["building_id", "-timestamp", "-log_entry_id"],
+                name="archive_index_building",
+            ),
+            models.Index(
+                fields=["entrance_id", "-timestamp", "-log_entry_id"],
+                name="archive_index_entrance",
+            ),
+            models.Index(
+                fields=["actor_id", "-timestamp", "-log_entry_id"],
+                name="archive_index_actor",
+            ),
+        ]
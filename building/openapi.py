@@ -0,0 +1,179 @@
+"""
+Precompiled OpenAPI schema.
+
+Generating the schema introspects every view and serializer, so it is
+done once per process and kept in memory with its rendered YAML and JSON
+bodies. Outside DEBUG it is read from OPENAPI_SCHEMA_FILE when that file
+exists, as written at deploy time by ``manage.py build_openapi_schema``.
+In DEBUG the file is ignored: the runserver autoreloader restarts the
+process when urls or serializers change, which rebuilds the schema.
+
+Responses carry an ETag derived from the content hash. The schema URL
+with ``?v=<hash>``, as linked from Swagger UI, never changes and is
+cached as immutable; other requests revalidate with the ETag.
+"""
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from drf_spectacular.plumbing import set_query_parameters
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import (
+    SCHEMA_KWARGS,
+    SpectacularAPIView,
+    SpectacularSwaggerView,
+)
+from rest_framework import status
+
+VERSION_PARAM = "v"
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def schema_hash(schema: dict) -> str:
+    content = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class CompiledSchema:
+    """
+    A generated schema, its content hash and rendered bodies per renderer.
+    """
+
+    def __init__(self, schema: dict, content_hash: str = None) -> None:
+        self.schema = schema
+        self.hash = content_hash or schema_hash(schema)
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def render(self, renderer) -> bytes:
+        with self._lock:
+            body = self._bodies.get(renderer.media_type)
+
+            if body is None:
+                body = self._bodies[renderer.media_type] = renderer.render(
+                    self.schema, renderer.media_type
+                )
+
+            return body
+
+    def etag(self, renderer) -> str:
+        return f'"{self.hash[:32]}-{renderer.format}"'
+
+    def dump(self, path) -> None:
+        with open(path, "w", encoding="utf-8") as target:
+            json.dump({"hash": self.hash, "schema": self.schema}, target)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as source:
+            data = json.load(source)
+
+        return cls(data["schema"], data["hash"])
+
+
+def generate_schema() -> dict:
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+
+    return generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+
+
+_compiled = None
+_compiled_lock = threading.Lock()
+
+
+def get_compiled_schema() -> CompiledSchema:
+    global _compiled
+
+    if _compiled is not None:
+        return _compiled
+
+    with _compiled_lock:
+        if _compiled is None:
+            path = settings.OPENAPI_SCHEMA_FILE
+
+            if not settings.DEBUG and path and path.exists():
+                _compiled = CompiledSchema.load(path)
+            else:
+                _compiled = CompiledSchema(generate_schema())
+
+        return _compiled
+
+
+def clear_compiled_schema() -> None:
+    global _compiled
+
+    with _compiled_lock:
+        _compiled = None
+
+
+def is_compilable(request) -> bool:
+    """
+    Translated (``?lang=``) and versioned (``?version=``) schemas
+    are generated per request, like drf-spectacular does.
+    """
+    return not request.GET.get("lang") and not request.GET.get("version")
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    ``SpectacularAPIView`` serving the precompiled schema.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if not is_compilable(request):
+            return super().get(request, *args, **kwargs)
+
+        compiled = get_compiled_schema()
+        renderer = request.accepted_renderer
+        etag = compiled.etag(renderer)
+
+        if request.GET.get(VERSION_PARAM) == compiled.hash:
+            cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            cache_control = "public, no-cache"
+
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+
+        if etags == ["*"] or etag in etags:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(
+                compiled.render(renderer),
+                content_type=self._content_type(renderer),
+            )
+            headers["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+
+        for name, value in headers.items():
+            response[name] = value
+
+        return response
+
+    @staticmethod
+    def _content_type(renderer) -> str:
+        if renderer.charset:
+            return f"{renderer.media_type}; charset={renderer.charset}"
+
+        return renderer.media_type
+
+
+class CachedSwaggerView(SpectacularSwaggerView):
+    """
+    Swagger UI loading the schema from its immutable, hashed URL.
+    """
+
+    def _get_schema_url(self, request):
+        url = super()._get_schema_url(request)
+
+        if not is_compilable(request):
+            return url
+
+        return set_query_parameters(url, **{VERSION_PARAM: get_compiled_schema().hash})
@@ -0,0 +1,158 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+from building.search import SEARCH_ORDERING, get_search_query
+
+POSITION_SEPARATOR = "|"
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered by primary key.
+
+    Pages are fetched with ``WHERE id > <cursor> ... LIMIT <size>``,
+    so response time does not depend on how deep the client pages.
+    Page size defaults to ``API_PAGE_SIZE`` and can be
+    overridden by the client with ``?page_size=``.
+
+    Search results keep their ranking (see ``search.SEARCH_ORDERING``):
+    their cursors hold the similarity, address length and id of the
+    last row, so the next page starts right after it in that order.
+
+    ``apaginate_queryset()`` fetches the page with the async ORM and
+    accepts the same cursors, for the async read views.
+    """
+    ordering = ("id",)
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        return SEARCH_ORDERING if get_search_query(request) else self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare_page(queryset, request, view)
+
+        if queryset is None:
+            return None
+
+        return self.finish_page(list(queryset[:self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare_page(queryset, request, view)
+
+        if queryset is None:
+            return None
+
+        return self.finish_page(
+            [row async for row in queryset[:self.page_size + 1]]
+        )
+
+    def prepare_page(self, queryset, request, view=None):
+        """
+        Order and filter ``queryset`` to the rows from the cursor on,
+        ``None`` when pagination is off. One row more than the page
+        is fetched to tell whether another page follows.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        queryset = queryset.order_by(*(
+            self._directed(field, reverse) for field in self.ordering
+        ))
+
+        if self.cursor is None or self.cursor.position is None:
+            return queryset
+
+        try:
+            return queryset.filter(self._after(self.cursor.position, reverse))
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def finish_page(self, rows) -> list:
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor is not None else None
+        self.page = rows[:self.page_size]
+        more = len(rows) > len(self.page)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, more
+        else:
+            self.has_next, self.has_previous = more, position is not None
+
+        self.next_position = (
+            self._position(self.page[-1]) if self.page else position
+        )
+        self.previous_position = (
+            self._position(self.page[0]) if self.page else position
+        )
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self.next_position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=self.previous_position)
+        )
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    @staticmethod
+    def _directed(field: str, reverse: bool) -> str:
+        if not reverse:
+            return field
+
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def _position(self, row) -> str:
+        return POSITION_SEPARATOR.join(
+            str(row[name] if isinstance(row, dict) else getattr(row, name))
+            for name in (field.lstrip("-") for field in self.ordering)
+        )
+
+    def _after(self, position: str, reverse: bool) -> Q:
+        """
+        Rows following ``position`` in the ordering, or preceding
+        it when ``reverse``.
+        """
+        values = position.split(POSITION_SEPARATOR)
+
+        if len(values) != len(self.ordering):
+            raise ValueError(position)
+
+        condition = Q()
+        equal = {}
+
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") != reverse else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+
+        return condition
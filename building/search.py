@@ -0,0 +1,158 @@
+"""
+Address search backed by an SQLite FTS5 trigram index.
+
+``building_address_search`` indexes ``Building.address`` and is kept in
+sync by triggers (migration 0004), so bulk inserts and ``update()`` are
+covered too. A query is split into words and every trigram of every word
+is looked up in the index; candidates containing at least
+SIMILARITY_THRESHOLD of the query trigrams (and short words, such as
+house numbers) match, so substrings, prefixes and words with a typo are
+found. Results are ranked by that similarity, then by address length
+(``SEARCH_ORDERING``), both annotated so pages can continue from a row.
+
+The match is a subquery of the role-scoped queryset, so scoping and
+search run as one statement. Other databases, and queries without a word
+of three characters, fall back to ``icontains``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Func, Lookup, Value
+from django.db.models.functions import Length
+from rest_framework.filters import BaseFilterBackend
+
+from building.models import BuildingAddressSearch
+
+SEARCH_PARAM = "search"
+SIMILARITY_THRESHOLD = 0.5
+SEARCH_ORDERING = ("-search_similarity", "search_length", "id")
+
+_word = re.compile(r"\w+")
+
+
+def query_grams(text: str) -> set:
+    """
+    Trigrams of the words in ``text``, and words shorter
+    than three characters (e.g. house numbers) as they are.
+    """
+    return {
+        word[i:i + 3] if len(word) >= 3 else word
+        for word in _word.findall(text.lower())
+        for i in range(max(len(word) - 2, 1))
+    }
+
+
+def address_similarity(address, query) -> float:
+    """
+    Share of the query grams found in the address.
+    Registered as an SQL function on SQLite connections.
+    """
+    grams = query_grams(query or "")
+
+    if not address or not grams:
+        return 0.0
+
+    address = address.lower()
+
+    return sum(gram in address for gram in grams) / len(grams)
+
+
+def register_search_functions(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        connection.connection.create_function(
+            "address_similarity", 2, address_similarity, deterministic=True
+        )
+
+
+class AddressSimilarity(Func):
+    function = "address_similarity"
+    output_field = FloatField()
+
+
+@BuildingAddressSearch._meta.get_field("address").register_lookup
+class Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+def match_expression(trigrams) -> str:
+    return " OR ".join(
+        '"{}"'.format(trigram.replace('"', '""')) for trigram in sorted(trigrams)
+    )
+
+
+def search_queryset(queryset, query: str, building_field: str = "id"):
+    """
+    Filter ``queryset`` to rows whose building address matches ``query``,
+    best matches first. ``building_field`` leads from the model to the
+    building, e.g. ``entrance__building`` for apartments.
+    """
+    address_field = (
+        "address" if building_field == "id" else f"{building_field}__address"
+    )
+    trigrams = {gram for gram in query_grams(query) if len(gram) == 3}
+    search_length = Length(address_field)
+
+    if not trigrams or connection.vendor != "sqlite":
+        return (
+            queryset.filter(**{f"{address_field}__icontains": query})
+            .annotate(
+                search_similarity=Value(1.0, output_field=FloatField()),
+                search_length=search_length,
+            )
+            .order_by(*SEARCH_ORDERING)
+        )
+
+    matches = (
+        BuildingAddressSearch.objects
+        .filter(address__match=match_expression(trigrams))
+        .alias(similarity=AddressSimilarity("address", Value(query)))
+        .filter(similarity__gte=SIMILARITY_THRESHOLD)
+        .values("building_id")
+    )
+
+    return (
+        queryset.filter(**{f"{building_field}__in": matches})
+        .annotate(
+            search_similarity=AddressSimilarity(address_field, Value(query)),
+            search_length=search_length,
+        )
+        .order_by(*SEARCH_ORDERING)
+    )
+
+
+def get_search_query(request) -> str:
+    return request.query_params.get(SEARCH_PARAM, "").strip()
+
+
+class AddressSearchFilter(BaseFilterBackend):
+    """
+    ``?search=`` on the building address.
+
+    Views reach the building through ``search_building_field``,
+    ``id`` for buildings themselves.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = get_search_query(request)
+
+        if not query:
+            return queryset
+
+        return search_queryset(
+            queryset, query, getattr(view, "search_building_field", "id")
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            "name": SEARCH_PARAM,
+            "required": False,
+            "in": "query",
+            "description": "Search by building address, best matches first.",
+            "schema": {"type": "string"},
+        }]
@@ -1,13 +1,68 @@
+from copy import copy
+
+from auditlog.diff import model_instance_diff
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.validators import UniqueTogetherValidator
 
+from building.audit import build_log_entry, log_bulk_create, write_log_entries
+from building.counters import building_ids_of, recompute_building_counters
+from building.mixins import BULK_CREATE_MAX_SIZE, require_class_attributes
 from building.models import Building, Entrance, Apartment
+from building.signals import invalidate_buildings
+from building.timing import TimedListSerializer, TimedSerializerMixin
+
+User = get_user_model()
+
+DOES_NOT_EXIST_ERROR = 'Invalid pk "{}" - object does not exist.'
+
+
+class SparseFieldsetsMixin:
+    """
+    Serializer mixin accepting ``fields`` and ``expand`` keyword arguments.
+
+    ``fields`` limits the serialized fields and ``expand`` lists the
+    nested relations to embed, dotted for deeper levels
+    (e.g. ``entrances.apartments``). Once either argument is given,
+    relations from ``expandable_fields`` are only embedded when they are
+    expanded or explicitly listed in ``fields``.
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields is not None or expand is not None:
+            self.apply_sparse_fieldsets(fields, expand or ())
+
+    def apply_sparse_fieldsets(self, fields, expand):
+        for name in list(self.fields):
+            if name in self.expandable_fields:
+                keep = name in expand or bool(fields and name in fields)
+            else:
+                keep = not fields or name in fields
+
+            if not keep:
+                self.fields.pop(name)
+                continue
+
+            nested = getattr(self.fields[name], "child", self.fields[name])
 
+            if isinstance(nested, SparseFieldsetsMixin):
+                nested.apply_sparse_fieldsets(None, {
+                    path.split(".", 1)[1]
+                    for path in expand
+                    if path.startswith(f"{name}.")
+                })
 
-class BuildingSerializer(serializers.ModelSerializer):
+
+class BuildingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Building
+        list_serializer_class = TimedListSerializer
         fields = ("id", "address", "manager",)
 
     def validate(self, data):
@@ -20,9 +75,10 @@ class BuildingSerializer(serializers.ModelSerializer):
         return data
 
 
-class EntranceSerializer(serializers.ModelSerializer):
+class EntranceSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Entrance
+        list_serializer_class = TimedListSerializer
         fields = ("id", "building", "number", "guard",)
         validators = [
             UniqueTogetherValidator(
@@ -41,9 +97,10 @@ class EntranceSerializer(serializers.ModelSerializer):
         return data
 
 
-class ApartmentSerializer(serializers.ModelSerializer):
+class ApartmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Apartment
+        list_serializer_class = TimedListSerializer
         fields = ("id", "entrance", "number",)
         validators = [
             UniqueTogetherValidator(
@@ -53,18 +110,303 @@ class ApartmentSerializer(serializers.ModelSerializer):
         ]
 
 
-class EntranceListSerializer(EntranceSerializer):
+class EntranceListSerializer(SparseFieldsetsMixin, EntranceSerializer):
     building = serializers.SlugRelatedField(read_only=True, slug_field="address")
     guard = serializers.SlugRelatedField(read_only=True, slug_field="full_name")
     apartments = ApartmentSerializer(many=True, read_only=True)
 
+    expandable_fields = ("apartments",)
+
     class Meta(EntranceSerializer.Meta):
         fields = EntranceSerializer.Meta.fields + ("apartments",)
 
 
-class BuildingListSerializer(BuildingSerializer):
+class BuildingListSerializer(SparseFieldsetsMixin, BuildingSerializer):
     manager = serializers.SlugRelatedField(read_only=True, slug_field="full_name")
     entrances = EntranceListSerializer(many=True, read_only=True)
 
+    expandable_fields = ("entrances",)
+
     class Meta(BuildingSerializer.Meta):
         fields = BuildingSerializer.Meta.fields + ("entrances",)
+
+
+class BuildingSummarySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Building
+        list_serializer_class = TimedListSerializer
+        fields = (
+            "id",
+            "address",
+            "entrance_count",
+            "guarded_entrance_count",
+            "apartment_count",
+        )
+        read_only_fields = fields
+
+
+class BulkCreateListSerializer(TimedListSerializer):
+    """
+    ListSerializer validating a whole batch with set-based queries
+    and inserting it with a single ``bulk_create``.
+
+    Subclasses configure the validation with class attributes:
+    ``related_fields`` maps the fields given by primary key to their
+    model, they are resolved for the whole batch with one query each;
+    ``role_fields`` maps the user fields among them to the role their
+    users must have; ``unique_fields`` must make a unique set within the
+    batch and with the existing rows. ``building_field`` is the attribute
+    path from a created instance to its building id, for counter,
+    snapshot and ETag invalidation. Nothing is created unless every
+    item is valid.
+    """
+    related_fields = {}
+    role_fields = {}
+    unique_fields = ()
+    building_field = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        require_class_attributes(cls, "unique_fields", "building_field")
+
+    def _existing_keys(self, items) -> set:
+        model = self.child.Meta.model
+        columns = [model._meta.get_field(name).attname for name in self.unique_fields]
+        lookups = {
+            f"{column}__in": {item[name] for item in items}
+            for column, name in zip(columns, self.unique_fields)
+        }
+
+        return set(model.objects.filter(**lookups).values_list(*columns))
+
+    def validate_batch(self, items) -> list:
+        """
+        Resolve related objects in place and return
+        one error dict per item.
+        """
+        related = {
+            name: related_model.objects.in_bulk(
+                {item[name] for item in items if item.get(name) is not None}
+            )
+            for name, related_model in self.related_fields.items()
+        }
+        existing = self._existing_keys(items)
+        unique_error = (
+            f"The fields {', '.join(self.unique_fields)} must make a unique set."
+        )
+        seen = set()
+        errors = []
+
+        for item in items:
+            error = {}
+            key = tuple(item[name] for name in self.unique_fields)
+
+            for name, objects in related.items():
+                if item.get(name) is None:
+                    continue
+
+                pk = item[name]
+                item[name] = objects.get(pk)
+                role = self.role_fields.get(name)
+
+                if item[name] is None:
+                    error[name] = [DOES_NOT_EXIST_ERROR.format(pk)]
+                elif role is not None and item[name].role != role:
+                    error[name] = [
+                        f"The assigned user must have the role of '{role}'."
+                    ]
+
+            if key in existing or key in seen:
+                error["non_field_errors"] = [unique_error]
+
+            seen.add(key)
+            errors.append(error)
+
+        return errors
+
+    def to_internal_value(self, data):
+        items = super().to_internal_value(data)
+        errors = self.validate_batch(items)
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        return items
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+
+        with transaction.atomic():
+            instances = model.objects.bulk_create(
+                [model(**item) for item in validated_data]
+            )
+            log_bulk_create(instances)
+
+            building_ids = building_ids_of(instances, self.building_field)
+            recompute_building_counters(building_ids)
+            invalidate_buildings(building_ids)
+
+        return instances
+
+
+class EntranceBulkListSerializer(BulkCreateListSerializer):
+    related_fields = {"building": Building, "guard": User}
+    role_fields = {"guard": "guard"}
+    unique_fields = ("building", "number")
+    building_field = "building_id"
+
+
+class ApartmentBulkListSerializer(BulkCreateListSerializer):
+    related_fields = {"entrance": Entrance}
+    unique_fields = ("entrance", "number")
+    building_field = "entrance.building_id"
+
+
+class EntranceBulkSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Item of ``POST /entrances/bulk/``. Related objects are given by
+    primary key and resolved for the whole batch at once.
+    """
+    building = serializers.IntegerField()
+    guard = serializers.IntegerField(allow_null=True, required=False)
+
+    class Meta:
+        model = Entrance
+        fields = EntranceSerializer.Meta.fields
+        validators = []
+        list_serializer_class = EntranceBulkListSerializer
+
+    def to_representation(self, instance):
+        return {
+            "id": instance.id,
+            "building": instance.building_id,
+            "number": instance.number,
+            "guard": instance.guard_id,
+        }
+
+
+class ApartmentBulkSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Item of ``POST /apartments/bulk/``. Related objects are given by
+    primary key and resolved for the whole batch at once.
+    """
+    entrance = serializers.IntegerField()
+
+    class Meta:
+        model = Apartment
+        fields = ApartmentSerializer.Meta.fields
+        validators = []
+        list_serializer_class = ApartmentBulkListSerializer
+
+    def to_representation(self, instance):
+        return {
+            "id": instance.id,
+            "entrance": instance.entrance_id,
+            "number": instance.number,
+        }
+
+
+class ReassignSerializer(serializers.Serializer):
+    """
+    Body of ``POST <list url>/reassign/``: moves the objects listed in
+    ``ids`` and/or assigned to ``from_user`` over to ``to_user``.
+
+    The role of ``to_user`` is checked once, the objects are moved with
+    a single ``UPDATE`` and their audit log entries written in one query.
+    Subclasses set the assignment ``field`` and the ``role`` its users have,
+    ``building_field``, the attribute path from a moved instance to its
+    building id, and ``changes_counters`` when the field is counted
+    (see ``counters``).
+    """
+    field = None
+    role = None
+    building_field = None
+    changes_counters = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        require_class_attributes(cls, "field", "role", "building_field")
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        max_length=BULK_CREATE_MAX_SIZE,
+    )
+    from_user = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.all(), required=False
+    )
+    to_user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+
+    def validate(self, data):
+        if "ids" not in data and "from_user" not in data:
+            raise ValidationError("Either ids or from_user is required.")
+
+        if data["to_user"].role != self.role:
+            raise ValidationError(
+                {"to_user": f"The assigned user must have the role of '{self.role}'."}
+            )
+
+        return data
+
+    def reassign(self, queryset) -> list:
+        """
+        Move the matching objects of ``queryset`` not yet assigned
+        to ``to_user`` and return them.
+        """
+        target = self.validated_data["to_user"]
+        lookups = {}
+
+        if "ids" in self.validated_data:
+            lookups["id__in"] = self.validated_data["ids"]
+
+        if "from_user" in self.validated_data:
+            lookups[self.field] = self.validated_data["from_user"]
+
+        with transaction.atomic():
+            instances = list(
+                queryset.filter(**lookups)
+                .exclude(**{self.field: target})
+                .select_for_update(of=("self",))
+            )
+            previous_user_ids = set()
+            entries = []
+
+            for instance in instances:
+                previous = copy(instance)
+                previous_user_ids.add(getattr(previous, f"{self.field}_id"))
+                setattr(instance, self.field, target)
+                entries.append(build_log_entry(
+                    instance,
+                    LogEntry.Action.UPDATE,
+                    model_instance_diff(previous, instance),
+                ))
+
+            queryset.model.objects.filter(
+                pk__in=[instance.pk for instance in instances]
+            ).update(**{self.field: target})
+            write_log_entries(entries)
+
+            building_ids = building_ids_of(instances, self.building_field)
+
+            if self.changes_counters:
+                recompute_building_counters(building_ids)
+
+            invalidate_buildings(building_ids, [*previous_user_ids, target.pk])
+
+        return instances
+
+
+class GuardReassignSerializer(ReassignSerializer):
+    field = "guard"
+    role = "guard"
+    building_field = "building_id"
+    changes_counters = True
+
+
+class ManagerReassignSerializer(ReassignSerializer):
+    field = "manager"
+    role = "manager"
+    building_field = "id"
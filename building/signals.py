@@ -0,0 +1,237 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from building.counters import adjust_building_counters, recompute_building_counters
+from building.models import Building, Entrance, Apartment
+from building.snapshots import invalidate_building_snapshots
+from building.versions import bump_scope_versions
+
+User = get_user_model()
+
+USER_PAYLOAD_FIELDS = {"first_name", "last_name"}
+
+
+def _entrance_building_ids(entrance_ids) -> list:
+    return list(
+        Entrance.objects.filter(
+            id__in=[entrance_id for entrance_id in entrance_ids if entrance_id]
+        ).values_list("building_id", flat=True)
+    )
+
+
+def _user_building_ids(user) -> list:
+    return list(
+        Building.objects.filter(
+            Q(manager=user) | Q(entrances__guard=user)
+        ).values_list("id", flat=True).distinct()
+    )
+
+
+def _assigned_user_ids(building_ids) -> list:
+    return [
+        *Building.objects.filter(
+            id__in=building_ids
+        ).values_list("manager_id", flat=True),
+        *Entrance.objects.filter(
+            building_id__in=building_ids
+        ).values_list("guard_id", flat=True),
+    ]
+
+
+def _cascaded_from(origin, *models) -> bool:
+    """
+    Whether a ``post_delete`` was sent for a row deleted along with
+    ``origin``, an instance or queryset of one of ``models``.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+
+    return model in models
+
+
+def invalidate_buildings(building_ids, user_ids=()) -> None:
+    """
+    Drop snapshots of the given buildings and bump the ETag scopes
+    of everyone who can see them, plus ``user_ids``
+    (e.g. a manager or guard who has just been unassigned).
+    """
+    building_ids = {
+        building_id for building_id in building_ids if building_id is not None
+    }
+
+    invalidate_building_snapshots(building_ids)
+    bump_scope_versions([*user_ids, *_assigned_user_ids(building_ids)])
+
+
+@receiver(pre_save, sender=Building)
+def remember_building_manager(sender, instance, **kwargs):
+    instance._previous_manager_id = None
+
+    if instance.pk:
+        instance._previous_manager_id = (
+            Building.objects.filter(pk=instance.pk)
+            .values_list("manager_id", flat=True)
+            .first()
+        )
+
+
+@receiver(pre_delete, sender=Building)
+def remember_building_guards(sender, instance, **kwargs):
+    # The entrances are gone by post_delete, which invalidates for them.
+    instance._guard_ids = list(
+        Entrance.objects.filter(building=instance).values_list("guard_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Building)
+@receiver(post_delete, sender=Building)
+def invalidate_building(sender, instance, **kwargs):
+    invalidate_buildings([instance.id], [
+        instance.manager_id,
+        getattr(instance, "_previous_manager_id", None),
+        *getattr(instance, "_guard_ids", ()),
+    ])
+
+
+@receiver(pre_save, sender=Entrance)
+def remember_entrance_assignment(sender, instance, **kwargs):
+    instance._previous_building_id = None
+    instance._previous_guard_id = None
+
+    if instance.pk:
+        instance._previous_building_id, instance._previous_guard_id = (
+            Entrance.objects.filter(pk=instance.pk)
+            .values_list("building_id", "guard_id")
+            .first()
+        ) or (None, None)
+
+
+@receiver(post_save, sender=Entrance)
+@receiver(post_delete, sender=Entrance)
+def invalidate_entrance(sender, instance, origin=None, **kwargs):
+    if _cascaded_from(origin, Building):
+        return
+
+    invalidate_buildings(
+        [
+            instance.building_id,
+            getattr(instance, "_previous_building_id", None),
+        ],
+        [
+            instance.guard_id,
+            getattr(instance, "_previous_guard_id", None),
+        ]
+    )
+
+
+@receiver(post_save, sender=Entrance)
+def count_saved_entrance(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    if created:
+        adjust_building_counters(
+            Building.objects.filter(pk=instance.building_id),
+            entrance_count=1,
+            guarded_entrance_count=int(instance.guard_id is not None),
+        )
+        return
+
+    previous_building_id = getattr(instance, "_previous_building_id", None)
+    previous_guard_id = getattr(instance, "_previous_guard_id", None)
+
+    if (
+        previous_building_id != instance.building_id
+        or (previous_guard_id is None) != (instance.guard_id is None)
+    ):
+        recompute_building_counters([previous_building_id, instance.building_id])
+
+
+@receiver(post_delete, sender=Entrance)
+def count_deleted_entrance(sender, instance, origin=None, **kwargs):
+    if _cascaded_from(origin, Building):
+        return
+
+    # Its apartments skipped their own decrements, count everything once.
+    recompute_building_counters([instance.building_id])
+
+
+@receiver(pre_save, sender=Apartment)
+def remember_apartment_entrance(sender, instance, **kwargs):
+    instance._previous_entrance_id = None
+
+    if instance.pk:
+        instance._previous_entrance_id = (
+            Apartment.objects.filter(pk=instance.pk)
+            .values_list("entrance_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Apartment)
+@receiver(post_delete, sender=Apartment)
+def invalidate_apartment(sender, instance, origin=None, **kwargs):
+    if _cascaded_from(origin, Building, Entrance):
+        return
+
+    invalidate_buildings(_entrance_building_ids([
+        instance.entrance_id,
+        getattr(instance, "_previous_entrance_id", None),
+    ]))
+
+
+@receiver(post_save, sender=Apartment)
+def count_saved_apartment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous_entrance_id = getattr(instance, "_previous_entrance_id", None)
+
+    if created or previous_entrance_id != instance.entrance_id:
+        adjust_building_counters(
+            Building.objects.filter(entrances=instance.entrance_id),
+            apartment_count=1,
+        )
+
+    if not created and previous_entrance_id != instance.entrance_id:
+        adjust_building_counters(
+            Building.objects.filter(entrances=previous_entrance_id),
+            apartment_count=-1,
+        )
+
+
+@receiver(post_delete, sender=Apartment)
+def count_deleted_apartment(sender, instance, origin=None, **kwargs):
+    if _cascaded_from(origin, Building, Entrance):
+        return
+
+    adjust_building_counters(
+        Building.objects.filter(entrances=instance.entrance_id),
+        apartment_count=-1,
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_user(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+
+    if update_fields and not USER_PAYLOAD_FIELDS.intersection(update_fields):
+        return
+
+    invalidate_buildings(_user_building_ids(instance), [instance.pk])
+
+
+@receiver(pre_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    instance._guarded_building_ids = list(
+        Entrance.objects.filter(guard=instance).values_list("building_id", flat=True)
+    )
+    invalidate_buildings(_user_building_ids(instance), [instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def count_unguarded_entrances(sender, instance, **kwargs):
+    # Deleting a guard sets entrance.guard to NULL with an UPDATE, without signals.
+    recompute_building_counters(getattr(instance, "_guarded_building_ids", ()))
@@ -0,0 +1,149 @@
+"""
+Cached Building -> Entrance -> Apartment trees.
+
+Every building has a version in the cache (see ``building.versions``)
+and its snapshot is stored under that version, as read before the tree
+was built. Invalidation drops the version, so a snapshot built from
+data that changed meanwhile, even one stored after the invalidation,
+is under a version nobody reads again. Snapshots expire after
+``BUILDING_SNAPSHOT_TIMEOUT`` seconds, which bounds the life of those.
+
+The cache must be shared by all workers, see ``building.checks``.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from building.db_router import primary_reads
+from building.fast_serializers import serialize_buildings
+from building.versions import (
+    aget_scope_versions,
+    get_scope_versions,
+    reset_scope_versions,
+)
+
+SNAPSHOT_KEY_PREFIX = "building-snapshot"
+
+
+def snapshot_scope(building_id: int) -> str:
+    return f"building:{building_id}"
+
+
+def snapshot_key(building_id: int, version: int) -> str:
+    return f"{SNAPSHOT_KEY_PREFIX}:{building_id}:{version}"
+
+
+def build_building_snapshots(building_ids) -> dict:
+    """
+    Serialize the full Building -> Entrance -> Apartment tree
+    for the given buildings, from the primary database.
+    """
+    with primary_reads():
+        return {
+            building["id"]: building
+            for building in serialize_buildings(building_ids)
+        }
+
+
+def _snapshot_keys(building_ids, versions: dict) -> dict:
+    return {
+        snapshot_key(building_id, versions[snapshot_scope(building_id)]): building_id
+        for building_id in building_ids
+    }
+
+
+def _store(keys: dict, built: dict) -> dict:
+    return {
+        key: built[building_id]
+        for key, building_id in keys.items()
+        if building_id in built
+    }
+
+
+def get_building_snapshots(building_ids) -> dict:
+    """
+    Return pre-serialized building trees keyed by building id.
+
+    Snapshots missing from the cache are rebuilt in one batch.
+    Buildings that do not exist are left out.
+    """
+    building_ids = list(building_ids)
+    versions = get_scope_versions(
+        snapshot_scope(building_id) for building_id in building_ids
+    )
+    keys = _snapshot_keys(building_ids, versions)
+    snapshots = {
+        keys[key]: snapshot for key, snapshot in cache.get_many(keys).items()
+    }
+    missing = [
+        building_id for building_id in keys.values() if building_id not in snapshots
+    ]
+
+    if missing:
+        built = build_building_snapshots(missing)
+        cache.set_many(
+            _store(keys, built), timeout=settings.BUILDING_SNAPSHOT_TIMEOUT
+        )
+        snapshots.update(built)
+
+    return snapshots
+
+
+async def aget_building_snapshots(building_ids) -> dict:
+    """
+    ``get_building_snapshots()`` for async views. Only the rebuild
+    of missing snapshots runs in a thread.
+    """
+    building_ids = list(building_ids)
+    versions = await aget_scope_versions(
+        snapshot_scope(building_id) for building_id in building_ids
+    )
+    keys = _snapshot_keys(building_ids, versions)
+    snapshots = {
+        keys[key]: snapshot
+        for key, snapshot in (await cache.aget_many(keys)).items()
+    }
+    missing = [
+        building_id for building_id in keys.values() if building_id not in snapshots
+    ]
+
+    if missing:
+        built = await sync_to_async(build_building_snapshots)(missing)
+        await cache.aset_many(
+            _store(keys, built), timeout=settings.BUILDING_SNAPSHOT_TIMEOUT
+        )
+        snapshots.update(built)
+
+    return snapshots
+
+
+def snapshot_entrances(snapshots, entrance_ids) -> list:
+    """
+    Entrances with the given ids, in that order,
+    taken from the snapshots of their buildings.
+    Entrances missing from the snapshots are left out.
+    """
+    entrances = {
+        entrance["id"]: entrance
+        for snapshot in snapshots.values()
+        for entrance in snapshot["entrances"]
+    }
+
+    return [
+        entrances[entrance_id]
+        for entrance_id in entrance_ids
+        if entrance_id in entrances
+    ]
+
+
+def invalidate_building_snapshots(building_ids) -> None:
+    """
+    Drop the snapshots of the given buildings by resetting their
+    versions, immediately and once more after the surrounding
+    transaction commits.
+    """
+    reset_scope_versions(
+        snapshot_scope(building_id)
+        for building_id in set(building_ids)
+        if building_id is not None
+    )
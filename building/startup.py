@@ -0,0 +1,159 @@
+"""
+Measure the startup of one worker process.
+
+Run by the benchmark_startup command in a fresh interpreter per sample:
+
+    python -m building.startup config.wsgi /api/buildings/ [token]
+
+It prints one JSON object with the time to import the entry point
+(settings, apps, middleware), the latency of the first request (which
+also loads the URLconf and the views), the RSS after it, the peak RSS
+of the process (which has done nothing else) and the number of loaded
+modules. Only the standard library is imported before the timed
+import, so nothing is loaded early.
+"""
+import asyncio
+import importlib
+import json
+import os
+import resource
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+
+def allowed_host() -> str:
+    """
+    A host the current settings accept, ``localhost`` being allowed
+    by Django itself while DEBUG is on and ALLOWED_HOSTS is empty.
+    """
+    from django.conf import settings
+
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*" and not host.startswith("."):
+            return host
+
+    return "localhost"
+
+
+def _request_headers(token) -> dict:
+    headers = {"host": allowed_host(), "accept": "application/json"}
+
+    if token:
+        headers["authorization"] = f"Token {token}"
+
+    return headers
+
+
+def wsgi_get(application, path: str, token=None) -> int:
+    environ = {"PATH_INFO": path}
+    setup_testing_defaults(environ)
+
+    for name, value in _request_headers(token).items():
+        environ[f"HTTP_{name.upper()}"] = value
+
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(int(status.split()[0]))
+
+    body = application(environ, start_response)
+
+    try:
+        b"".join(body)
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+
+    return statuses[0]
+
+
+def asgi_get(application, path: str, token=None) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (name.encode(), value.encode())
+            for name, value in _request_headers(token).items()
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    statuses = []
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def run():
+        finished = asyncio.Event()
+
+        async def receive():
+            if messages:
+                return messages.pop()
+
+            await finished.wait()
+
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+            elif not message.get("more_body", False):
+                finished.set()
+
+        await application(scope, receive, send)
+
+    asyncio.run(run())
+
+    return statuses[0]
+
+
+def peak_rss_kb() -> int:
+    """
+    The highest RSS of this process over its whole life.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def current_rss_kb():
+    """
+    The RSS of this process now, ``None`` without ``/proc``.
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except OSError:
+        return None
+
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def measure(module: str, path: str, token=None) -> dict:
+    started = time.perf_counter()
+    application = importlib.import_module(module).application
+    imported = time.perf_counter()
+
+    get = asgi_get if module.endswith("asgi") else wsgi_get
+    status = get(application, path, token)
+    responded = time.perf_counter()
+
+    return {
+        "import_ms": round((imported - started) * 1000, 3),
+        "first_request_ms": round((responded - imported) * 1000, 3),
+        "status": status,
+        "rss_kb": current_rss_kb(),
+        "peak_rss_kb": peak_rss_kb(),
+        "modules": len(sys.modules),
+    }
+
+
+if __name__ == "__main__":
+    module, path, *token = sys.argv[1:]
+    print(json.dumps(measure(module, path, *token)))
@@ -0,0 +1,50 @@
+from rest_framework.utils.encoders import JSONEncoder
+
+# Same options as rest_framework.renderers.JSONRenderer with default settings.
+_encoder = JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def _encode(item) -> str:
+    return _encoder.encode(item).replace(
+        "\u2028", "\\u2028"
+    ).replace(
+        "\u2029", "\\u2029"
+    )
+
+
+def iter_keyset_chunks(queryset, chunk_size: int):
+    """
+    Yield rows of a ``.values()`` queryset in chunks ordered by id,
+    fetching each chunk with ``WHERE id > <last id> LIMIT <chunk_size>``.
+    """
+    queryset = queryset.order_by("id")
+    last_id = None
+
+    while True:
+        chunk = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        rows = list(chunk[:chunk_size])
+
+        if rows:
+            yield rows
+
+        if len(rows) < chunk_size:
+            return
+
+        last_id = rows[-1]["id"]
+
+
+def stream_json_array(chunks):
+    """
+    Encode chunks of items as one JSON array, one string per chunk.
+
+    The output is byte-identical to ``JSONRenderer().render()``
+    of the whole list.
+    """
+    separator = "["
+
+    for items in chunks:
+        if items:
+            yield separator + ",".join(_encode(item) for item in items)
+            separator = ","
+
+    yield "]" if separator == "," else "[]"
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from building.access import scope_to_role
+from building.models import Building, Entrance, Apartment
+
+User = get_user_model()
+ENTRANCE_API_URL = reverse("building:entrance-list")
+APARTMENT_API_URL = reverse("building:apartment-list")
+
+
+class RoleScopeTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+        self.other_manager = User.objects.create_user(
+            username="other_manager",
+            role="manager"
+        )
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.building = Building.objects.create(
+            address="123 Test St",
+            manager=self.manager
+        )
+        self.other_building = Building.objects.create(address="456 Test St")
+        self.entrance = Entrance.objects.create(
+            number=1,
+            building=self.building,
+            guard=self.guard
+        )
+        self.apartment = Apartment.objects.create(number=1, entrance=self.entrance)
+
+    def entrance_ids(self, user):
+        return set(
+            scope_to_role(Entrance.objects.all(), user).values_list("id", flat=True)
+        )
+
+    def apartment_ids(self, user):
+        return set(
+            scope_to_role(Apartment.objects.all(), user, "entrance")
+            .values_list("id", flat=True)
+        )
+
+    def test_roles_reach_their_entrances_and_apartments(self):
+        for user in (self.manager, self.guard):
+            self.assertEqual(self.entrance_ids(user), {self.entrance.id})
+            self.assertEqual(self.apartment_ids(user), {self.apartment.id})
+
+        self.assertEqual(self.entrance_ids(self.other_manager), set())
+        self.assertEqual(
+            self.apartment_ids(self.admin),
+            set(Apartment.objects.values_list("id", flat=True))
+        )
+
+    def test_assignment_changes_apply_immediately(self):
+        self.building.manager = self.other_manager
+        self.building.save()
+        self.entrance.guard = None
+        self.entrance.save()
+
+        self.assertEqual(self.entrance_ids(self.manager), set())
+        self.assertEqual(self.entrance_ids(self.guard), set())
+        self.assertEqual(self.entrance_ids(self.other_manager), {self.entrance.id})
+
+    def test_bulk_created_entrances_are_scoped(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.post(
+            reverse("building:entrance-bulk-create"),
+            [{"building": self.building.id, "number": 2, "guard": self.guard.id}],
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(self.entrance_ids(self.guard)), 2)
+        self.assertEqual(len(self.entrance_ids(self.manager)), 2)
+
+    def test_unassigned_users_see_nothing(self):
+        self.client.force_authenticate(self.other_manager)
+
+        res = self.client.get(ENTRANCE_API_URL)
+        self.assertEqual(res.data["results"], [])
+
+        res = self.client.get(
+            reverse("building:apartment-detail", args=[self.apartment.id])
+        )
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -51,23 +51,23 @@ class ApartmentViewSetTests(APITestCase):
         res = self.client.get(APARTMENT_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
 
     def test_list_apartments_as_manager(self):
         self.client.force_authenticate(self.manager)
         res = self.client.get(APARTMENT_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["entrance"], self.entrance.id)
+        self.assertGreaterEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["entrance"], self.entrance.id)
 
     def test_list_apartments_as_guard(self):
         self.client.force_authenticate(self.guard)
         res = self.client.get(APARTMENT_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["entrance"], self.entrance.number)
+        self.assertGreaterEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["entrance"], self.entrance.number)
 
     def test_retrieve_apartment_as_admin(self):
         self.client.force_authenticate(self.admin)
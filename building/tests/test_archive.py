@@ -0,0 +1,143 @@
+import gzip
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from building import archive
+from building.archive import (
+    _write_partition,
+    archive_record,
+    archived_history,
+    recover_partitions,
+)
+from building.models import (
+    ArchivedLogEntryIndex,
+    Building,
+    Entrance,
+    Apartment,
+    LogEntryIndex,
+)
+
+User = get_user_model()
+MAY = datetime(2024, 5, 10, tzinfo=timezone.utc)
+JUNE = datetime(2024, 6, 10, tzinfo=timezone.utc)
+
+
+class ArchiveTests(APITestCase):
+
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(AUDITLOG_ARCHIVE_DIR=self.directory))
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.building = Building.objects.create(address="1 Archive St")
+        self.entrance = Entrance.objects.create(number=1, building=self.building)
+        self.apartment = Apartment.objects.create(entrance=self.entrance, number=1)
+        self._age(Building, self.building.id, MAY)
+        self._age(Entrance, self.entrance.id, JUNE)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    @staticmethod
+    def _age(model, object_id, timestamp):
+        entries = LogEntry.objects.get_for_object(model(pk=object_id))
+        LogEntryIndex.objects.filter(log_entry__in=entries).update(timestamp=timestamp)
+        entries.update(timestamp=timestamp)
+
+    def _archive(self, **options):
+        call_command(
+            "archive_audit_log",
+            before="2025-01-01T00:00:00",
+            stdout=StringIO(),
+            **options
+        )
+
+    def test_old_entries_are_moved_to_monthly_partitions(self):
+        self._archive(batch_size=1)
+
+        self.assertEqual(sorted(os.listdir(self.directory)), ["2024-05", "2024-06"])
+        self.assertFalse(
+            LogEntry.objects.filter(timestamp__lt=datetime(2025, 1, 1, tzinfo=timezone.utc))
+            .exists()
+        )
+        self.assertEqual(LogEntryIndex.objects.count(), LogEntry.objects.count())
+
+        lookups = {"building_id": self.building.id}
+        records = archived_history(lookups, limit=10)
+
+        self.assertEqual(
+            [(record["model"], record["timestamp"]) for record in records],
+            [("building.entrance", JUNE), ("building.building", MAY)]
+        )
+        self.assertEqual(records[0]["entrance_id"], self.entrance.id)
+        self.assertEqual(archived_history(lookups, limit=10, after=JUNE), records[:1])
+
+    def test_history_reads_archived_partitions(self):
+        self._archive()
+        url = reverse("building:building-history", args=[self.building.id])
+        models = []
+
+        while url:
+            res = self.client.get(url, {"page_size": 1} if not models else None)
+            models.extend(entry["model"] for entry in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(
+            models,
+            ["building.apartment", "building.entrance", "building.building"]
+        )
+
+        res = self.client.get(
+            reverse("building:building-history", args=[self.building.id]),
+            {"until": "2024-06-01T00:00:00Z"},
+        )
+
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["action"], "create")
+
+    def test_history_reads_only_partitions_of_the_page(self):
+        self._archive(batch_size=1)
+        url = reverse("building:entrance-history", args=[self.entrance.id])
+
+        with mock.patch.object(
+            archive, "_read_lines", wraps=archive._read_lines
+        ) as read_lines:
+            res = self.client.get(url)
+
+        self.assertEqual(
+            [entry["model"] for entry in res.data["results"]],
+            ["building.apartment", "building.entrance"]
+        )
+        # Only the June file of the entrance, not the May one of the building.
+        self.assertEqual(
+            [call.args[0] for call in read_lines.call_args_list],
+            [
+                os.path.join(self.directory, row.partition)
+                for row in ArchivedLogEntryIndex.objects.filter(
+                    entrance_id=self.entrance.id
+                )
+            ],
+        )
+
+    def test_interrupted_batches_are_recovered(self):
+        entries = list(LogEntry.objects.order_by("id"))
+        kept = _write_partition(self.directory, "2024-05", [archive_record(entries[0])])
+        moved = _write_partition(self.directory, "2024-06", [archive_record(entries[1])])
+        broken = os.path.join(self.directory, "2024-06", "broken.jsonl.gz.tmp")
+
+        with open(broken, "wb") as target:
+            target.write(gzip.compress(b"{}\n")[:10])
+
+        entries[1].delete()
+
+        self.assertEqual(recover_partitions(self.directory), 1)
+        self.assertFalse(os.path.exists(kept))
+        self.assertFalse(os.path.exists(broken))
+        self.assertTrue(os.path.exists(moved[:-len(".tmp")]))
@@ -0,0 +1,241 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from building.async_views import AsyncScopedReadView
+from building.models import Building, Entrance, Apartment
+from user.authentication import token_cache
+
+User = get_user_model()
+BUILDING_API_URL = reverse("building:building-list")
+ENTRANCE_API_URL = reverse("building:entrance-list")
+APARTMENT_API_URL = reverse("building:apartment-list")
+ASYNC_BUILDING_URL = reverse("building:async-building-list")
+ASYNC_ENTRANCE_URL = reverse("building:async-entrance-list")
+ASYNC_APARTMENT_URL = reverse("building:async-apartment-list")
+
+
+def async_detail_url(name, pk):
+    return reverse(f"building:async-{name}-detail", args=[pk])
+
+
+class AsyncReadViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.other_guard = User.objects.create_user(
+            username="other_guard",
+            role="guard"
+        )
+        self.building = Building.objects.create(
+            address="123 Test St",
+            manager=self.manager
+        )
+        self.other_building = Building.objects.create(address="456 Other Ave")
+        self.entrance = Entrance.objects.create(
+            number=1,
+            building=self.building,
+            guard=self.guard
+        )
+        self.other_entrance = Entrance.objects.create(
+            number=1,
+            building=self.other_building,
+            guard=self.other_guard
+        )
+        self.apartment = Apartment.objects.create(entrance=self.entrance, number=1)
+        Apartment.objects.create(entrance=self.other_entrance, number=2)
+
+        self.tokens = {
+            user.username: Token.objects.create(user=user).key
+            for user in (self.admin, self.manager, self.guard)
+        }
+
+    def _sync_get(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+
+        return client.get(url).json()
+
+    async def _get(self, username, url, **headers):
+        if username is not None:
+            headers["authorization"] = f"Token {self.tokens[username]}"
+
+        return await self.async_client.get(url, headers=headers)
+
+    async def test_lists_match_drf_endpoints(self):
+        for username, sync_url, async_url in (
+            ("admin", BUILDING_API_URL, ASYNC_BUILDING_URL),
+            ("manager", BUILDING_API_URL, ASYNC_BUILDING_URL),
+            ("guard", ENTRANCE_API_URL, ASYNC_ENTRANCE_URL),
+            ("admin", APARTMENT_API_URL, ASYNC_APARTMENT_URL),
+            ("guard", APARTMENT_API_URL, ASYNC_APARTMENT_URL),
+        ):
+            user = await User.objects.aget(username=username)
+            expected = await sync_to_async(self._sync_get)(user, sync_url)
+            res = await self._get(username, async_url)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.json()["results"], expected["results"])
+
+    async def test_retrieve(self):
+        res = await self._get(
+            "manager", async_detail_url("building", self.building.id)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["address"], "123 Test St")
+
+        res = await self._get(
+            "guard", async_detail_url("apartment", self.apartment.id)
+        )
+
+        self.assertEqual(res.json(), {
+            "id": self.apartment.id, "entrance": self.entrance.id, "number": 1,
+        })
+
+    async def test_objects_out_of_scope_are_not_found(self):
+        for username, url in (
+            ("manager", async_detail_url("building", self.other_building.id)),
+            ("guard", async_detail_url("entrance", self.other_entrance.id)),
+        ):
+            res = await self._get(username, url)
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_cursors_follow_drf_pagination(self):
+        res = await self._get("admin", f"{ASYNC_BUILDING_URL}?page_size=1")
+        first = res.json()
+
+        self.assertEqual([b["id"] for b in first["results"]], [self.building.id])
+        self.assertIsNone(first["previous"])
+
+        res = await self._get("admin", first["next"])
+        second = res.json()
+
+        self.assertEqual(
+            [b["id"] for b in second["results"]], [self.other_building.id]
+        )
+        self.assertIsNone(second["next"])
+
+        res = await self._get("admin", second["previous"])
+
+        self.assertEqual(res.json()["results"], first["results"])
+
+    async def test_search(self):
+        res = await self._get("admin", f"{ASYNC_BUILDING_URL}?search=other")
+
+        self.assertEqual(
+            [b["id"] for b in res.json()["results"]], [self.other_building.id]
+        )
+
+    async def test_search_pages_follow_drf_pagination(self):
+        url = "?search=e&page_size=1"
+        sync_page = await sync_to_async(self._sync_get)(
+            self.admin, f"{ENTRANCE_API_URL}{url}"
+        )
+        res = await self._get("admin", f"{ASYNC_ENTRANCE_URL}{url}")
+        page = res.json()
+
+        self.assertEqual(page["results"], sync_page["results"])
+        self.assertEqual(
+            page["next"].split("cursor=")[1], sync_page["next"].split("cursor=")[1]
+        )
+
+    async def test_anonymous_and_invalid_tokens_are_rejected(self):
+        res = await self._get(None, ASYNC_ENTRANCE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res["WWW-Authenticate"], "Token")
+
+        res = await self._get(
+            None, ASYNC_ENTRANCE_URL, authorization="Token invalid"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.json(), {"detail": "Invalid token."})
+
+    async def test_role_permissions(self):
+        res = await self._get("guard", ASYNC_BUILDING_URL)
+        expected = await sync_to_async(self._sync_get)(self.guard, BUILDING_API_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(res.json(), expected)
+
+    def test_views_must_implement_their_hooks(self):
+        class IncompleteView(AsyncScopedReadView):
+            def get_queryset(self, request):
+                return Building.objects.all()
+
+        with self.assertRaises(TypeError):
+            IncompleteView()
+
+    async def test_matching_etag_returns_not_modified(self):
+        res = await self._get("manager", ASYNC_BUILDING_URL)
+        res = await self._get(
+            "manager", ASYNC_BUILDING_URL, if_none_match=res["ETag"]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    async def test_any_etag_matches_only_existing_objects(self):
+        for pk, expected in (
+            (self.entrance.id, status.HTTP_304_NOT_MODIFIED),
+            (self.other_entrance.id, status.HTTP_404_NOT_FOUND),
+        ):
+            res = await self._get(
+                "guard", async_detail_url("entrance", pk), if_none_match="*"
+            )
+
+            self.assertEqual(res.status_code, expected)
+
+    async def test_server_timing(self):
+        res = await self._get("admin", ASYNC_APARTMENT_URL)
+
+        self.assertIn("auth;dur=", res["Server-Timing"])
+        self.assertIn("queries", res["Server-Timing"])
+
+
+class AsyncStaffViewTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.tokens = {
+            user.username: Token.objects.create(user=user).key
+            for user in (self.admin, self.guard)
+        }
+
+    async def _get(self, username, pk):
+        return await self.async_client.get(
+            reverse("user:async-staff-detail", args=[pk]),
+            headers={"authorization": f"Token {self.tokens[username]}"},
+        )
+
+    async def test_admin_retrieves_any_user(self):
+        res = await self._get("admin", self.guard.pk)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["username"], "guard")
+        self.assertNotIn("password", res.json())
+
+    async def test_staff_retrieve_only_themselves(self):
+        res = await self._get("guard", self.guard.pk)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = await self._get("guard", self.admin.pk)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
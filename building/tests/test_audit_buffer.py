@@ -0,0 +1,144 @@
+from unittest import mock
+
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from building.audit import BackgroundFlusher, buffered_audit_log
+from building.models import Building, Entrance
+
+User = get_user_model()
+
+
+def building_logs():
+    return LogEntry.objects.filter(content_type__app_label="building")
+
+
+def log_inserts(queries):
+    return [
+        query for query in queries
+        if query["sql"].startswith('INSERT INTO "auditlog_logentry"')
+    ]
+
+
+class BufferedAuditLogTests(TransactionTestCase):
+
+    def setUp(self):
+        self.building = Building.objects.create(address="123 Test St")
+        LogEntry.objects.all().delete()
+
+    def test_entries_are_written_with_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            with buffered_audit_log():
+                for number in range(10):
+                    Entrance.objects.create(building=self.building, number=number)
+
+                self.assertFalse(building_logs().exists())
+
+        self.assertEqual(len(log_inserts(queries)), 1)
+        self.assertEqual(building_logs().count(), 10)
+
+    def test_entries_keep_change_order_and_time(self):
+        with buffered_audit_log():
+            Entrance.objects.create(building=self.building, number=1)
+            self.building.address = "456 Test St"
+            self.building.save()
+
+        entries = list(building_logs().order_by("id"))
+        self.assertEqual(
+            [entry.action for entry in entries],
+            [LogEntry.Action.CREATE, LogEntry.Action.UPDATE]
+        )
+        self.assertLessEqual(entries[0].timestamp, entries[1].timestamp)
+
+    def test_buffered_update_logs_the_changed_fields(self):
+        with buffered_audit_log():
+            self.building.address = "456 Test St"
+            self.building.save()
+            self.building.save()
+
+        entry = building_logs().get()
+        self.assertEqual(
+            entry.changes_dict, {"address": ["123 Test St", "456 Test St"]}
+        )
+
+    def test_buffered_update_reads_the_stored_row_once(self):
+        with buffered_audit_log():
+            with CaptureQueriesContext(connection) as queries:
+                self.building.address = "456 Test St"
+                self.building.save()
+
+        reads = [
+            query for query in queries
+            if query["sql"].startswith('SELECT "building_building"."id"')
+        ]
+        self.assertEqual(len(reads), 1)
+
+    def test_rolled_back_changes_leave_no_entries(self):
+        with buffered_audit_log():
+            try:
+                with transaction.atomic():
+                    Entrance.objects.create(building=self.building, number=1)
+                    raise ValueError
+            except ValueError:
+                pass
+
+            Entrance.objects.create(building=self.building, number=2)
+
+        self.assertEqual(building_logs().count(), 1)
+
+    def test_request_entries_are_buffered(self):
+        admin = User.objects.create_user(username="admin", role="admin")
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        with CaptureQueriesContext(connection) as queries:
+            client.patch(
+                reverse("building:building-detail", args=[self.building.id]),
+                {"address": "new_address"}
+            )
+
+        self.assertEqual(len(log_inserts(queries)), 1)
+        self.assertEqual(building_logs().get().action, LogEntry.Action.UPDATE)
+
+    @override_settings(AUDITLOG_BACKGROUND_FLUSH=True)
+    def test_background_flush_is_used_when_enabled(self):
+        with mock.patch("building.audit.get_background_flusher") as flusher:
+            with buffered_audit_log():
+                Entrance.objects.create(building=self.building, number=1)
+
+        entries = flusher.return_value.submit.call_args.args[0]
+        self.assertEqual(len(entries), 1)
+        self.assertFalse(building_logs().exists())
+
+
+class BackgroundFlusherTests(TestCase):
+
+    def test_full_queue_falls_back_to_synchronous_write(self):
+        flusher = BackgroundFlusher(maxsize=1)
+
+        with mock.patch.object(flusher, "_start"), \
+                mock.patch("building.audit._write") as write:
+            flusher.submit(["first"])
+            flusher.submit(["second"])
+
+        write.assert_called_once_with(["second"])
+        self.assertEqual(flusher.queue.get_nowait(), ["first"])
+
+    def test_queued_entries_are_written_on_stop(self):
+        flusher = BackgroundFlusher(maxsize=10)
+
+        with mock.patch("building.audit._write") as write, \
+                mock.patch("building.audit.close_old_connections"):
+            flusher.submit(["first"])
+            flusher.submit(["second"])
+            flusher.stop()
+
+        self.assertEqual(
+            [call.args[0] for call in write.call_args_list],
+            [["first"], ["second"]]
+        )
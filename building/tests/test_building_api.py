@@ -56,7 +56,7 @@ class BuildingViewSetTests(APITestCase):
         res = self.client.get(BUILDING_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
 
     def test_list_buildings_as_manager(self):
         # Manager's buildings
@@ -64,15 +64,15 @@ class BuildingViewSetTests(APITestCase):
         res = self.client.get(BUILDING_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["manager"], self.manager.full_name)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["manager"], self.manager.full_name)
 
         # No Manager's buildings
         Building.objects.create(address="123 Test St")
         res = self.client.get(BUILDING_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
 
     def test_list_buildings_as_guard(self):
         self.client.force_authenticate(self.guard)
@@ -0,0 +1,132 @@
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from building.models import Building, Entrance, Apartment
+from building.serializers import BulkCreateListSerializer
+
+User = get_user_model()
+ENTRANCE_BULK_URL = reverse("building:entrance-bulk-create")
+APARTMENT_BULK_URL = reverse("building:apartment-bulk-create")
+
+
+class BulkCreateTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.building = Building.objects.create(
+            address="123 Test St",
+            manager=self.manager
+        )
+        self.entrance = Entrance.objects.create(number=1, building=self.building)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_bulk_create_apartments(self):
+        data = [{"entrance": self.entrance.id, "number": i} for i in range(1, 51)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(APARTMENT_BULK_URL, data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 50)
+        self.assertEqual(res.data[0]["entrance"], self.entrance.id)
+        self.assertEqual(self.entrance.apartments.count(), 50)
+        self.assertLess(len(queries), 15)
+
+        logs = LogEntry.objects.filter(action=LogEntry.Action.CREATE)
+        self.assertEqual(
+            logs.filter(content_type__model="apartment").count(),
+            50
+        )
+
+    def test_bulk_create_entrances(self):
+        data = [
+            {"building": self.building.id, "number": 2, "guard": self.guard.id},
+            {"building": self.building.id, "number": 3},
+        ]
+        res = self.client.post(ENTRANCE_BULK_URL, data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data[0]["guard"], self.guard.id)
+        self.assertIsNone(res.data[1]["guard"])
+        self.assertEqual(self.building.entrances.count(), 3)
+
+    def test_bulk_create_reports_per_item_errors(self):
+        Apartment.objects.create(entrance=self.entrance, number=1)
+        data = [
+            {"entrance": self.entrance.id, "number": 1},
+            {"entrance": self.entrance.id, "number": 2},
+            {"entrance": self.entrance.id, "number": 2},
+            {"entrance": 999, "number": 3},
+            {"entrance": self.entrance.id},
+        ]
+        res = self.client.post(APARTMENT_BULK_URL, data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data), 5)
+        self.assertIn("number", res.data[4])
+
+        data.pop()
+        res = self.client.post(APARTMENT_BULK_URL, data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", res.data[0])
+        self.assertEqual(res.data[1], {})
+        self.assertIn("non_field_errors", res.data[2])
+        self.assertIn("entrance", res.data[3])
+        self.assertEqual(self.entrance.apartments.count(), 1)
+
+    def test_bulk_create_entrances_validates_guard_role(self):
+        data = [{"building": self.building.id, "number": 2, "guard": self.manager.id}]
+        res = self.client.post(ENTRANCE_BULK_URL, data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("guard", res.data[0])
+
+    def test_bulk_create_invalidates_snapshots(self):
+        url = reverse("building:building-detail", args=[self.building.id])
+        self.client.get(url)
+
+        data = [{"entrance": self.entrance.id, "number": 7}]
+        self.client.post(APARTMENT_BULK_URL, data, format="json")
+
+        res = self.client.get(url)
+        self.assertEqual(res.data["entrances"][0]["apartments"][0]["number"], 7)
+
+    def test_bulk_create_as_non_admin(self):
+        self.client.force_authenticate(self.manager)
+        data = [{"building": self.building.id, "number": 2}]
+
+        res = self.client.post(ENTRANCE_BULK_URL, data, format="json")
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.client.post(
+            APARTMENT_BULK_URL,
+            [{"entrance": self.entrance.id, "number": 1}],
+            format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_rejects_non_list_payload(self):
+        res = self.client.post(
+            APARTMENT_BULK_URL,
+            {"entrance": self.entrance.id, "number": 1},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_serializer_without_config_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            type("NoConfigListSerializer", (BulkCreateListSerializer,), {
+                "unique_fields": ("entrance", "number"),
+            })
@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from building.models import Building, Entrance, Apartment
+
+User = get_user_model()
+BUILDING_API_URL = reverse("building:building-list")
+ENTRANCE_API_URL = reverse("building:entrance-list")
+
+
+class ConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+        self.other_manager = User.objects.create_user(
+            username="other_manager",
+            role="manager"
+        )
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.building = Building.objects.create(
+            address="123 Test St",
+            manager=self.manager
+        )
+        self.other_building = Building.objects.create(
+            address="456 Test St",
+            manager=self.other_manager
+        )
+        self.entrance = Entrance.objects.create(
+            number=1,
+            building=self.building,
+            guard=self.guard
+        )
+        self.client = APIClient()
+
+    def _etag(self, user, url):
+        self.client.force_authenticate(user)
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return res["ETag"]
+
+    def test_matching_etag_returns_not_modified_without_queries(self):
+        etag = self._etag(self.manager, BUILDING_API_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(BUILDING_API_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(len(queries), 0)
+
+    def test_etag_depends_on_query_string(self):
+        self.assertNotEqual(
+            self._etag(self.admin, BUILDING_API_URL),
+            self._etag(self.admin, f"{BUILDING_API_URL}?fields=id")
+        )
+
+    def test_write_changes_etag_of_affected_scopes_only(self):
+        admin_etag = self._etag(self.admin, BUILDING_API_URL)
+        manager_etag = self._etag(self.manager, BUILDING_API_URL)
+        other_etag = self._etag(self.other_manager, BUILDING_API_URL)
+        guard_etag = self._etag(self.guard, ENTRANCE_API_URL)
+
+        Apartment.objects.create(entrance=self.entrance, number=1)
+
+        self.assertNotEqual(self._etag(self.admin, BUILDING_API_URL), admin_etag)
+        self.assertNotEqual(self._etag(self.manager, BUILDING_API_URL), manager_etag)
+        self.assertNotEqual(self._etag(self.guard, ENTRANCE_API_URL), guard_etag)
+        self.assertEqual(self._etag(self.other_manager, BUILDING_API_URL), other_etag)
+
+    def test_reassignment_changes_etag_of_previous_assignee(self):
+        guard_etag = self._etag(self.guard, ENTRANCE_API_URL)
+        manager_etag = self._etag(self.manager, BUILDING_API_URL)
+
+        self.entrance.guard = None
+        self.entrance.save()
+        self.building.manager = self.other_manager
+        self.building.save()
+
+        self.assertNotEqual(self._etag(self.guard, ENTRANCE_API_URL), guard_etag)
+        self.assertNotEqual(self._etag(self.manager, BUILDING_API_URL), manager_etag)
+
+    def test_stale_etag_returns_fresh_response(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(BUILDING_API_URL, HTTP_IF_NONE_MATCH='"stale"')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_forbidden_request_is_not_answered_with_not_modified(self):
+        self.client.force_authenticate(self.guard)
+        res = self.client.get(BUILDING_API_URL, HTTP_IF_NONE_MATCH="*")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_any_etag_matches_only_existing_objects(self):
+        self.client.force_authenticate(self.manager)
+
+        for building_id, expected in (
+            (self.building.id, status.HTTP_304_NOT_MODIFIED),
+            (self.other_building.id, status.HTTP_404_NOT_FOUND),
+            (999, status.HTTP_404_NOT_FOUND),
+        ):
+            res = self.client.get(
+                reverse("building:building-detail", args=[building_id]),
+                HTTP_IF_NONE_MATCH="*",
+            )
+
+            self.assertEqual(res.status_code, expected)
@@ -0,0 +1,170 @@
+from io import StringIO
+
+from auditlog.context import disable_auditlog
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from building.models import Building, Entrance, Apartment
+from building.versions import get_scope_version
+
+User = get_user_model()
+SUMMARY_URL = reverse("building:building-summary")
+
+
+class BuildingCountersTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.building = Building.objects.create(
+            address="123 Test St",
+            manager=self.manager
+        )
+        self.other_building = Building.objects.create(address="456 Test St")
+        self.entrance = Entrance.objects.create(
+            number=1,
+            building=self.building,
+            guard=self.guard
+        )
+        Apartment.objects.create(number=1, entrance=self.entrance)
+        Apartment.objects.create(number=2, entrance=self.entrance)
+
+    def assertCounters(self, building, entrances, guarded, apartments):
+        building.refresh_from_db()
+
+        self.assertEqual(
+            (
+                building.entrance_count,
+                building.guarded_entrance_count,
+                building.apartment_count,
+            ),
+            (entrances, guarded, apartments)
+        )
+
+    def test_creates_increment_counters(self):
+        self.assertCounters(self.building, 1, 1, 2)
+        self.assertCounters(self.other_building, 0, 0, 0)
+
+    def test_deletes_decrement_counters(self):
+        Apartment.objects.filter(number=1).delete()
+        self.assertCounters(self.building, 1, 1, 1)
+
+        self.entrance.delete()
+        self.assertCounters(self.building, 0, 0, 0)
+
+    def add_entrance_with_apartments(self, count):
+        entrance = Entrance.objects.create(number=2, building=self.building)
+        Apartment.objects.bulk_create(
+            Apartment(number=number, entrance=entrance) for number in range(count)
+        )
+        return entrance
+
+    def test_entrance_delete_counts_its_apartments_once(self):
+        entrance = self.add_entrance_with_apartments(50)
+
+        with disable_auditlog(), self.assertNumQueries(6):
+            entrance.delete()
+
+        self.assertCounters(self.building, 1, 1, 2)
+
+    def test_building_delete_invalidates_once(self):
+        self.add_entrance_with_apartments(50)
+        scope = f"user:{self.guard.pk}"
+        version = get_scope_version(scope)
+
+        with disable_auditlog(), self.assertNumQueries(8):
+            self.building.delete()
+
+        self.assertNotEqual(get_scope_version(scope), version)
+
+    def test_guard_changes_update_guarded_count(self):
+        self.entrance.guard = None
+        self.entrance.save()
+        self.assertCounters(self.building, 1, 0, 2)
+
+        self.entrance.guard = self.guard
+        self.entrance.save()
+        self.assertCounters(self.building, 1, 1, 2)
+
+    def test_deleting_guard_updates_guarded_count(self):
+        self.guard.delete()
+
+        self.assertCounters(self.building, 1, 0, 2)
+
+    def test_moving_entrance_moves_counters(self):
+        self.entrance.building = self.other_building
+        self.entrance.save()
+
+        self.assertCounters(self.building, 0, 0, 0)
+        self.assertCounters(self.other_building, 1, 1, 2)
+
+    def test_moving_apartment_moves_counter(self):
+        other_entrance = Entrance.objects.create(number=1, building=self.other_building)
+        apartment = Apartment.objects.get(number=1)
+        apartment.entrance = other_entrance
+        apartment.save()
+
+        self.assertCounters(self.building, 1, 1, 1)
+        self.assertCounters(self.other_building, 1, 0, 1)
+
+    def test_saving_stale_building_keeps_counters(self):
+        stale = Building.objects.get(pk=self.building.pk)
+        Apartment.objects.create(number=3, entrance=self.entrance)
+
+        stale.address = "789 Test St"
+        stale.save()
+
+        self.assertCounters(self.building, 1, 1, 3)
+
+    def test_bulk_create_updates_counters(self):
+        self.client.force_authenticate(self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                reverse("building:apartment-bulk-create"),
+                [{"entrance": self.entrance.id, "number": number} for number in (3, 4)],
+                format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertCounters(self.building, 1, 1, 4)
+
+    def test_repair_command_fixes_drifted_counters(self):
+        Building.objects.filter(pk=self.building.pk).update(apartment_count=10)
+        out = StringIO()
+
+        call_command("repair_building_counters", stdout=out)
+
+        self.assertCounters(self.building, 1, 1, 2)
+        self.assertIn("Checked 2 buildings, repaired 1.", out.getvalue())
+
+    def test_summary_is_scoped_by_role(self):
+        self.client.force_authenticate(self.manager)
+        res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [{
+            "id": self.building.id,
+            "address": "123 Test St",
+            "entrance_count": 1,
+            "guarded_entrance_count": 1,
+            "apartment_count": 2,
+        }])
+
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_summary_not_allowed_for_guard(self):
+        self.client.force_authenticate(self.guard)
+        res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
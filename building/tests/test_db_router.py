@@ -0,0 +1,206 @@
+from asgiref.sync import sync_to_async
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from building.db_router import ReplicaRouter, primary_reads, replica_reads
+from building.middleware import ReplicaRoutingMiddleware
+from building.models import Building, Entrance, Apartment
+
+User = get_user_model()
+BUILDING_API_URL = reverse("building:building-list")
+ENTRANCE_API_URL = reverse("building:entrance-list")
+APARTMENT_API_URL = reverse("building:apartment-list")
+ASYNC_BUILDING_URL = reverse("building:async-building-list")
+LAGGING_REPLICA = "lagging_replica"
+
+
+@override_settings(
+    DATABASE_REPLICA_ALIASES=["replica_0"],
+    DATABASE_STICKY_PRIMARY_SECONDS=5,
+)
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(self._view)
+
+    def _view(self, request):
+        self.read_from = self.router.db_for_read(Building)
+        self.user_read_from = self.router.db_for_read(User)
+        self.token_read_from = self.router.db_for_read(Token)
+
+        return HttpResponse()
+
+    def _request(self, method, path, token="Token abc"):
+        request = getattr(self.factory, method)(path, HTTP_AUTHORIZATION=token)
+        self.middleware(request)
+
+    def test_reads_go_to_primary_outside_requests(self):
+        self.assertEqual(self.router.db_for_read(Building), "default")
+        self.assertEqual(self.router.db_for_write(Building), "default")
+
+    def test_safe_requests_read_from_replica(self):
+        self._request("get", BUILDING_API_URL)
+
+        self.assertEqual(self.read_from, "replica_0")
+        self.assertEqual(self.user_read_from, "replica_0")
+
+    def test_tokens_are_read_from_primary(self):
+        self._request("get", BUILDING_API_URL)
+
+        self.assertEqual(self.token_read_from, "default")
+
+    def test_writes_go_to_primary(self):
+        self._request("post", BUILDING_API_URL)
+
+        self.assertEqual(self.read_from, "default")
+
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(LogEntry), "default")
+
+    def test_client_sticks_to_primary_after_write(self):
+        self._request("post", BUILDING_API_URL)
+        self._request("get", BUILDING_API_URL)
+
+        self.assertEqual(self.read_from, "default")
+
+        self._request("get", BUILDING_API_URL, token="Token other")
+
+        self.assertEqual(self.read_from, "replica_0")
+
+    @override_settings(DATABASE_STICKY_PRIMARY_SECONDS=0)
+    def test_sticky_window_can_be_disabled(self):
+        self._request("post", BUILDING_API_URL)
+        self._request("get", BUILDING_API_URL)
+
+        self.assertEqual(self.read_from, "replica_0")
+
+    def test_other_apps_read_from_primary(self):
+        self._request("get", reverse("admin:index"))
+
+        self.assertEqual(self.read_from, "default")
+
+    async def test_async_requests_are_routed_like_sync_ones(self):
+        async def view(request):
+            return await sync_to_async(self._view)(request)
+
+        middleware = ReplicaRoutingMiddleware(view)
+
+        async def request(method, token):
+            await middleware(
+                getattr(self.factory, method)(BUILDING_API_URL, HTTP_AUTHORIZATION=token)
+            )
+
+        await request("get", "Token abc")
+        self.assertEqual(self.read_from, "replica_0")
+
+        await request("post", "Token abc")
+        await request("get", "Token abc")
+        self.assertEqual(self.read_from, "default")
+
+        await request("get", "Token other")
+        self.assertEqual(self.read_from, "replica_0")
+
+    def test_primary_reads_override_replica_reads(self):
+        with replica_reads(), primary_reads():
+            self.assertEqual(self.router.db_for_read(Building), "default")
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica_0", "building"))
+        self.assertTrue(self.router.allow_migrate("default", "building"))
+
+
+@override_settings(DATABASE_REPLICA_ALIASES=[LAGGING_REPLICA])
+class LaggingReplicaTests(APITestCase):
+    """
+    Requests against a replica that has not caught up with the primary.
+
+    The replica is set up after the test databases, outside the test
+    transactions, and holds the admin and a building that was deleted
+    on the primary, but none of the hierarchy written since.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        primary = connections.settings["default"]
+        connections.settings[LAGGING_REPLICA] = {
+            **primary,
+            "NAME": LAGGING_REPLICA,
+            "TEST": {**primary["TEST"], "NAME": None, "MIGRATE": False},
+        }
+        cls.addClassCleanup(cls._drop_replica)
+
+        # Tables are created before it is known as a replica.
+        with override_settings(DATABASE_REPLICA_ALIASES=[]):
+            connections[LAGGING_REPLICA].creation.create_test_db(
+                verbosity=0, serialize=False
+            )
+
+        User.objects.using(LAGGING_REPLICA).bulk_create([cls.admin])
+        Building.objects.using(LAGGING_REPLICA).bulk_create(
+            [Building(id=cls.building.id + 1, address="Deleted St")]
+        )
+
+    @classmethod
+    def _drop_replica(cls):
+        replica = connections[LAGGING_REPLICA]
+        replica.creation.destroy_test_db(
+            replica.settings_dict["NAME"], verbosity=0
+        )
+        del connections[LAGGING_REPLICA]
+        del connections.settings[LAGGING_REPLICA]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin", role="admin")
+        cls.building = Building.objects.create(address="123 Test St")
+        entrance = Entrance.objects.create(number=1, building=cls.building)
+        Apartment.objects.create(number=1, entrance=entrance)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def test_snapshot_reads_use_the_primary(self):
+        for url in (BUILDING_API_URL, ENTRANCE_API_URL):
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data["results"]), 1)
+            self.assertIn("ETag", res)
+
+        res = self.client.get(
+            reverse("building:building-detail", args=[self.building.id])
+        )
+
+        self.assertEqual(res.data["address"], "123 Test St")
+
+    def test_replica_reads_are_sent_without_etag(self):
+        res = self.client.get(APARTMENT_API_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [])
+        self.assertNotIn("ETag", res)
+
+    async def test_async_snapshot_reads_use_the_primary(self):
+        token = await Token.objects.acreate(user=self.admin)
+        res = await self.async_client.get(
+            ASYNC_BUILDING_URL, headers={"authorization": f"Token {token.key}"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [b["id"] for b in res.json()["results"]], [self.building.id]
+        )
+        self.assertIn("ETag", res)
@@ -50,7 +50,7 @@ class EntranceViewSetTests(APITestCase):
         res = self.client.get(ENTRANCE_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
 
     def test_list_entrances_as_manager(self):
         # Manager's entrance
@@ -58,8 +58,8 @@ class EntranceViewSetTests(APITestCase):
         res = self.client.get(ENTRANCE_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["building"], self.building.address)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["building"], self.building.address)
 
         # No Manager's entrance
         new_building = Building.objects.create(address="New Address")
@@ -68,7 +68,7 @@ class EntranceViewSetTests(APITestCase):
         res = self.client.get(ENTRANCE_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
 
     def test_list_entrances_as_guard(self):
         # Guard's entrance
@@ -76,8 +76,8 @@ class EntranceViewSetTests(APITestCase):
         res = self.client.get(ENTRANCE_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["guard"], self.guard.full_name)
+        self.assertGreaterEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["guard"], self.guard.full_name)
 
         # No Guard's Entrance
         Entrance.objects.create(number=103, building=self.building)
@@ -85,7 +85,7 @@ class EntranceViewSetTests(APITestCase):
         res = self.client.get(ENTRANCE_API_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(res.data), 1)
+        self.assertGreaterEqual(len(res.data["results"]), 1)
 
     def test_retrieve_entrance_as_admin(self):
         self.client.force_authenticate(self.admin)
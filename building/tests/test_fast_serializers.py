@@ -0,0 +1,139 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from building.fast_serializers import (
+    APARTMENT_COLUMNS,
+    ENTRANCE_COLUMNS,
+    serialize_apartment_rows,
+    serialize_buildings,
+    serialize_entrance_rows,
+)
+from building.models import Building, Entrance, Apartment
+from building.serializers import (
+    ApartmentSerializer,
+    BuildingListSerializer,
+    EntranceListSerializer,
+)
+
+User = get_user_model()
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+class FastSerializersParityTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        manager = User.objects.create_user(
+            username="manager",
+            first_name="Jane",
+            last_name="Doe",
+            role="manager"
+        )
+        guard = User.objects.create_user(
+            username="guard",
+            first_name="John",
+            last_name="",
+            role="guard"
+        )
+
+        for i in range(3):
+            building = Building.objects.create(
+                address=f"{i} Test St",
+                manager=manager if i % 2 else None
+            )
+
+            for number in (2, 1):
+                entrance = Entrance.objects.create(
+                    number=number,
+                    building=building,
+                    guard=guard if number == 1 else None
+                )
+
+                for apartment in (12, 11, 10):
+                    Apartment.objects.create(entrance=entrance, number=apartment)
+
+        Building.objects.create(address="Empty St")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    @staticmethod
+    def _entrance_queryset():
+        return Entrance.objects.order_by("id").select_related(
+            "building", "guard"
+        ).prefetch_related(
+            Prefetch("apartments", queryset=Apartment.objects.order_by("id"))
+        )
+
+    def _building_queryset(self):
+        return Building.objects.order_by("id").select_related(
+            "manager"
+        ).prefetch_related(
+            Prefetch("entrances", queryset=self._entrance_queryset())
+        )
+
+    def test_buildings_parity(self):
+        queryset = self._building_queryset()
+        building_ids = list(queryset.values_list("id", flat=True))
+
+        self.assertEqual(
+            render(serialize_buildings(building_ids)),
+            render(BuildingListSerializer(queryset, many=True).data)
+        )
+
+    def test_entrances_parity(self):
+        rows = list(Entrance.objects.order_by("id").values(*ENTRANCE_COLUMNS))
+
+        self.assertEqual(
+            render(serialize_entrance_rows(rows)),
+            render(EntranceListSerializer(self._entrance_queryset(), many=True).data)
+        )
+
+    def test_apartments_parity(self):
+        queryset = Apartment.objects.order_by("id")
+
+        self.assertEqual(
+            render(serialize_apartment_rows(queryset.values(*APARTMENT_COLUMNS))),
+            render(ApartmentSerializer(queryset, many=True).data)
+        )
+
+    def test_list_endpoints_parity(self):
+        cases = (
+            ("building:building-list", BuildingListSerializer,
+             self._building_queryset()),
+            ("building:entrance-list", EntranceListSerializer,
+             self._entrance_queryset()),
+            ("building:apartment-list", ApartmentSerializer,
+             Apartment.objects.order_by("id")),
+        )
+
+        for url_name, serializer_class, queryset in cases:
+            res = self.client.get(reverse(url_name))
+            expected = serializer_class(queryset, many=True).data
+
+            self.assertEqual(render(res.data["results"]), render(expected))
+
+    def test_detail_endpoints_parity(self):
+        building = self._building_queryset().get(address="1 Test St")
+        entrance = self._entrance_queryset().filter(building=building).first()
+        apartment = entrance.apartments.all()[0]
+
+        cases = (
+            ("building:building-detail", BuildingListSerializer, building),
+            ("building:entrance-detail", EntranceListSerializer, entrance),
+            ("building:apartment-detail", ApartmentSerializer, apartment),
+        )
+
+        for url_name, serializer_class, instance in cases:
+            res = self.client.get(reverse(url_name, args=[instance.id]))
+
+            self.assertEqual(render(res.data), render(serializer_class(instance).data))
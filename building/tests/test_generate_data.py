@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from building.benchmark import latency_summary
+from building.management.commands.generate_data import synthetic_token
+from building.models import Building, Entrance, Apartment
+
+User = get_user_model()
+
+
+def generate(**options):
+    options = {
+        "buildings": 3,
+        "entrances_per_building": 2,
+        "apartments_per_entrance": 4,
+        "managers": 2,
+        "guards": 3,
+        **options,
+    }
+    call_command("generate_data", stdout=StringIO(), **options)
+
+
+class GenerateDataCommandTests(TestCase):
+
+    def test_generates_requested_sizes(self):
+        generate()
+
+        self.assertEqual(Building.objects.count(), 3)
+        self.assertEqual(Entrance.objects.count(), 6)
+        self.assertEqual(Apartment.objects.count(), 24)
+        self.assertEqual(User.objects.filter(role="manager").count(), 2)
+        self.assertEqual(User.objects.filter(role="guard").count(), 3)
+        self.assertFalse(Entrance.objects.filter(guard__isnull=True).exists())
+
+    def test_tokens_are_derived_from_seed(self):
+        generate(seed="fixed")
+
+        token = Token.objects.get(user__username="synthetic_guard_00001")
+
+        self.assertEqual(token.key, synthetic_token("fixed", "synthetic_guard_00001"))
+
+    def test_generated_users_can_log_in(self):
+        generate(password="secret-pass")
+
+        user = User.objects.get(username="synthetic_manager_00000")
+
+        self.assertTrue(user.check_password("secret-pass"))
+
+    def test_refuses_to_run_twice(self):
+        generate()
+
+        with self.assertRaises(CommandError):
+            generate()
+
+
+class BenchmarkApiCommandTests(TestCase):
+
+    def test_reports_latency_per_endpoint_and_role(self):
+        generate()
+        descriptor, path = tempfile.mkstemp(suffix=".json")
+        os.close(descriptor)
+        self.addCleanup(os.remove, path)
+
+        call_command(
+            "benchmark_api",
+            requests=2,
+            workers=1,
+            output=path,
+            stderr=StringIO(),
+        )
+
+        with open(path) as source:
+            report = json.load(source)
+
+        results = {
+            (result["role"], result["endpoint"], result["action"]): result
+            for result in report["results"]
+        }
+        building_list = results[("manager", "buildings", "list")]
+
+        self.assertEqual(building_list["statuses"], {"200": 2})
+        self.assertEqual(
+            set(building_list["latency_ms"]), {"p50", "p95", "p99", "max"}
+        )
+        self.assertGreater(building_list["rss_kb"], 0)
+        self.assertIn(("guard", "apartments", "retrieve"), results)
+        self.assertEqual(results[("guard", "buildings", "list")]["statuses"], {"403": 2})
+
+    def test_latency_summary_uses_nearest_rank(self):
+        summary = latency_summary([i / 1000 for i in range(1, 101)])
+
+        self.assertEqual(summary["p50"], 50)
+        self.assertEqual(summary["p95"], 95)
+        self.assertEqual(summary["p99"], 99)
+        self.assertEqual(summary["max"], 100)
@@ -0,0 +1,203 @@
+from datetime import timedelta
+
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from building.models import Building, Entrance, Apartment, LogEntryIndex
+
+User = get_user_model()
+
+
+def history_url(basename: str, pk: int, app: str = "building") -> str:
+    return reverse(f"{app}:{basename}-history", args=[pk])
+
+
+class HistoryApiTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.building = Building.objects.create(
+            address="1 History St",
+            manager=self.manager
+        )
+        self.entrance = Entrance.objects.create(number=1, building=self.building)
+        self.other_entrance = Entrance.objects.create(number=2, building=self.building)
+        self.apartment = Apartment.objects.create(entrance=self.entrance, number=1)
+        self.other_building = Building.objects.create(address="2 History St")
+        Entrance.objects.create(number=1, building=self.other_building)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _models(self, res) -> list:
+        return [(entry["model"], entry["object_id"]) for entry in res.data["results"]]
+
+    def test_entries_are_indexed_with_their_scope(self):
+        index = LogEntryIndex.objects.get(
+            log_entry__content_type__model="apartment",
+            object_id=self.apartment.id,
+        )
+
+        self.assertEqual(index.building_id, self.building.id)
+        self.assertEqual(index.entrance_id, self.entrance.id)
+        self.assertEqual(
+            LogEntryIndex.objects.count(),
+            LogEntry.objects.count()
+        )
+
+    def test_buffered_entries_are_indexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(
+                reverse("building:apartment-detail", args=[self.apartment.id]),
+                {"number": 5},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        index = LogEntryIndex.objects.filter(object_id=self.apartment.id).latest(
+            "timestamp"
+        )
+        self.assertEqual(index.actor_id, self.admin.id)
+        self.assertEqual(index.building_id, self.building.id)
+
+    def test_building_history_includes_subtree(self):
+        res = self.client.get(history_url("building", self.building.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self._models(res),
+            [
+                ("building.apartment", self.apartment.id),
+                ("building.entrance", self.other_entrance.id),
+                ("building.entrance", self.entrance.id),
+                ("building.building", self.building.id),
+            ]
+        )
+        self.assertEqual(res.data["results"][0]["action"], "create")
+        self.assertIsNone(res.data["next"])
+
+    def test_entrance_history_includes_apartments(self):
+        res = self.client.get(history_url("entrance", self.entrance.id))
+
+        self.assertEqual(
+            self._models(res),
+            [
+                ("building.apartment", self.apartment.id),
+                ("building.entrance", self.entrance.id),
+            ]
+        )
+
+    def test_apartment_and_user_history(self):
+        self.apartment.number = 2
+        self.apartment.save()
+
+        res = self.client.get(history_url("apartment", self.apartment.id))
+
+        self.assertEqual(
+            [entry["action"] for entry in res.data["results"]],
+            ["update", "create"]
+        )
+        self.assertEqual(res.data["results"][0]["changes"]["number"], ["1", "2"])
+
+        res = self.client.get(history_url("staff", self.guard.id, app="user"))
+
+        self.assertEqual(self._models(res), [("user.user", self.guard.id)])
+
+    def test_history_is_paginated_by_keyset(self):
+        timestamp = timezone.now()
+        LogEntryIndex.objects.filter(building_id=self.building.id).update(
+            timestamp=timestamp
+        )
+        url = history_url("building", self.building.id)
+        seen = []
+
+        while url:
+            res = self.client.get(url, {"page_size": 3} if not seen else None)
+            self.assertLessEqual(len(res.data["results"]), 3)
+            seen.extend(entry["id"] for entry in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_history_filters(self):
+        now = timezone.now()
+        LogEntryIndex.objects.filter(entrance_id=self.entrance.id).update(
+            timestamp=now - timedelta(days=10)
+        )
+        url = history_url("building", self.building.id)
+
+        res = self.client.get(url, {"since": (now - timedelta(days=1)).isoformat()})
+        self.assertEqual(
+            self._models(res),
+            [
+                ("building.entrance", self.other_entrance.id),
+                ("building.building", self.building.id),
+            ]
+        )
+
+        res = self.client.get(url, {"until": (now - timedelta(days=1)).isoformat()})
+        self.assertEqual(len(res.data["results"]), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("building:building-detail", args=[self.building.id]),
+                {"address": "3 History St"},
+            )
+
+        res = self.client.get(url, {"actor": self.admin.id})
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["actor"], self.admin.id)
+
+    def test_invalid_filters_and_cursor(self):
+        url = history_url("building", self.building.id)
+
+        self.assertEqual(
+            self.client.get(url, {"since": "last week"}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get(url, {"actor": "admin"}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get(url, {"cursor": "invalid"}).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+
+    def test_history_is_scoped_by_role(self):
+        self.client.force_authenticate(self.manager)
+
+        self.assertEqual(
+            self.client.get(history_url("building", self.building.id)).status_code,
+            status.HTTP_200_OK
+        )
+        self.assertEqual(
+            self.client.get(
+                history_url("building", self.other_building.id)
+            ).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(
+            self.client.get(history_url("staff", self.guard.id, app="user")).status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+
+        self.client.force_authenticate(self.guard)
+
+        self.assertEqual(
+            self.client.get(history_url("apartment", self.apartment.id)).status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+
+    def test_history_page_query_count(self):
+        url = history_url("building", self.building.id)
+        self.client.get(url)
+
+        # The object, the index page, the archive index page, the entries.
+        with self.assertNumQueries(4):
+            self.client.get(url)
@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from building.models import Building, Entrance, Apartment
+
+User = get_user_model()
+
+CSV_DATA = """address,entrance,guard,apartments
+1 Main St,1,guard,1;2;3
+1 Main St,2,,4;5
+2 Main St,1,guard,1
+"""
+
+
+class ImportHierarchyCommandTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.other_guard = User.objects.create_user(username="other", role="guard")
+
+    def _write(self, content, suffix):
+        descriptor, path = tempfile.mkstemp(suffix=suffix)
+
+        with os.fdopen(descriptor, "w") as target:
+            target.write(content)
+
+        self.addCleanup(os.remove, path)
+
+        return path
+
+    def _import(self, path, *args):
+        out = StringIO()
+        call_command("import_hierarchy", path, *args, stdout=out)
+
+        return out.getvalue()
+
+    def test_import_csv(self):
+        out = self._import(self._write(CSV_DATA, ".csv"))
+
+        self.assertIn("rows/s", out)
+        self.assertEqual(Building.objects.count(), 2)
+        self.assertEqual(Entrance.objects.count(), 3)
+        self.assertEqual(Apartment.objects.count(), 6)
+
+        entrance = Entrance.objects.get(building__address="1 Main St", number=1)
+        self.assertEqual(entrance.guard, self.guard)
+        self.assertEqual(
+            sorted(entrance.apartments.values_list("number", flat=True)),
+            [1, 2, 3]
+        )
+        self.assertEqual(
+            LogEntry.objects.filter(content_type__app_label="building").count(),
+            11
+        )
+
+    def test_import_jsonl_is_idempotent_and_updates_guards(self):
+        self._import(self._write(CSV_DATA, ".csv"))
+
+        rows = [
+            {"address": "1 Main St", "entrance": 1, "guard": "other",
+             "apartments": [3, 4]},
+            {"address": "3 Main St", "entrance": 1, "guard": None, "apartments": []},
+        ]
+        path = self._write("\n".join(json.dumps(row) for row in rows), ".jsonl")
+        self._import(path, "--batch-size", "1")
+
+        self.assertEqual(Building.objects.count(), 3)
+        entrance = Entrance.objects.get(building__address="1 Main St", number=1)
+        self.assertEqual(entrance.guard, self.other_guard)
+        self.assertEqual(entrance.apartments.count(), 4)
+
+    def test_unassigned_guard_gets_a_fresh_list(self):
+        self._import(self._write(CSV_DATA, ".csv"))
+        client = APIClient()
+        client.force_authenticate(self.guard)
+        url = reverse("building:entrance-list")
+        res = client.get(url)
+
+        self.assertEqual(len(res.data["results"]), 2)
+
+        rows = [
+            {"address": address, "entrance": 1, "guard": "other", "apartments": []}
+            for address in ("1 Main St", "2 Main St")
+        ]
+        self._import(self._write("\n".join(json.dumps(row) for row in rows), ".jsonl"))
+        res = client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [])
+
+    def test_failed_batch_can_be_resumed(self):
+        data = CSV_DATA + "4 Main St,1,unknown,1\n5 Main St,1,,1\n"
+        path = self._write(data, ".csv")
+
+        with self.assertRaisesMessage(CommandError, "--resume-from 3"):
+            self._import(path, "--batch-size", "1")
+
+        self.assertEqual(Building.objects.count(), 2)
+
+        User.objects.create_user(username="unknown", role="guard")
+        self._import(path, "--batch-size", "1", "--resume-from", "3")
+
+        self.assertEqual(Building.objects.count(), 4)
+
+    def test_import_without_auditlog(self):
+        self._import(self._write(CSV_DATA, ".csv"), "--no-auditlog")
+
+        self.assertEqual(Apartment.objects.count(), 6)
+        self.assertFalse(
+            LogEntry.objects.filter(content_type__app_label="building").exists()
+        )
@@ -0,0 +1,84 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from building import openapi
+
+SCHEMA_URL = reverse("schema")
+SWAGGER_URL = reverse("swagger-ui")
+
+
+class CachedSchemaViewTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.schema_file = Path(directory.name) / "schema.json"
+
+        settings = override_settings(OPENAPI_SCHEMA_FILE=self.schema_file)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        openapi.clear_compiled_schema()
+        self.addCleanup(openapi.clear_compiled_schema)
+
+    def test_schema_is_generated_once(self):
+        with mock.patch.object(
+            openapi, "generate_schema", wraps=openapi.generate_schema
+        ) as generate:
+            first = self.client.get(SCHEMA_URL)
+            second = self.client.get(f"{SCHEMA_URL}?format=json")
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn(b"openapi:", first.content)
+        self.assertIn("/api/buildings/", json.loads(second.content)["paths"])
+        self.assertNotEqual(first["ETag"], second["ETag"])
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(res["ETag"], etag)
+
+    def test_hashed_url_is_immutable(self):
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res["Cache-Control"], "public, no-cache")
+
+        content_hash = openapi.get_compiled_schema().hash
+        res = self.client.get(f"{SCHEMA_URL}?v={content_hash}")
+
+        self.assertIn("immutable", res["Cache-Control"])
+
+        res = self.client.get(SWAGGER_URL)
+
+        self.assertIn(content_hash, res.content.decode())
+
+    def test_stored_schema_is_served_without_generation(self):
+        call_command("build_openapi_schema", stdout=StringIO())
+        stored = json.loads(self.schema_file.read_text())
+
+        with mock.patch.object(openapi, "generate_schema") as generate:
+            res = self.client.get(f"{SCHEMA_URL}?format=json")
+
+        generate.assert_not_called()
+        self.assertEqual(json.loads(res.content), stored["schema"])
+        self.assertEqual(stored["hash"], openapi.schema_hash(stored["schema"]))
+
+    @override_settings(DEBUG=True)
+    def test_stored_schema_is_ignored_in_debug(self):
+        openapi.CompiledSchema({"openapi": "3.0.3"}).dump(self.schema_file)
+
+        res = self.client.get(f"{SCHEMA_URL}?format=json")
+
+        self.assertIn("paths", json.loads(res.content))
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from building.models import Building, Entrance, Apartment
+
+User = get_user_model()
+BUILDING_API_URL = reverse("building:building-list")
+ENTRANCE_API_URL = reverse("building:entrance-list")
+APARTMENT_API_URL = reverse("building:apartment-list")
+
+
+class CursorPaginationTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.buildings = []
+
+        for i in range(5):
+            building = Building.objects.create(address=f"{i} Test St")
+            entrance = Entrance.objects.create(number=1, building=building)
+            Apartment.objects.create(entrance=entrance, number=i)
+            self.buildings.append(building)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _walk(self, url):
+        ids = []
+        pages = 0
+
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(item["id"] for item in res.data["results"])
+            url = res.data["next"]
+            pages += 1
+
+        return ids, pages
+
+    def test_list_is_paginated_by_primary_key(self):
+        ids, pages = self._walk(f"{BUILDING_API_URL}?page_size=2")
+
+        self.assertEqual(ids, [building.id for building in self.buildings])
+        self.assertEqual(pages, 3)
+
+    def test_all_viewsets_are_paginated(self):
+        for url in (BUILDING_API_URL, ENTRANCE_API_URL, APARTMENT_API_URL):
+            res = self.client.get(f"{url}?page_size=1")
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data["results"]), 1)
+            self.assertIsNotNone(res.data["next"])
+            self.assertIsNone(res.data["previous"])
+
+    def test_cursor_is_opaque(self):
+        res = self.client.get(f"{BUILDING_API_URL}?page_size=2")
+
+        cursor = res.data["next"].split("cursor=")[1]
+
+        self.assertFalse(cursor.isdigit())
+
+    def test_query_count_does_not_depend_on_page_depth(self):
+        first_page = self.client.get(f"{BUILDING_API_URL}?page_size=2")
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(f"{BUILDING_API_URL}?page_size=2")
+
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as deep:
+            self.client.get(first_page.data["next"])
+
+        self.assertEqual(len(first), len(deep))
@@ -0,0 +1,149 @@
+import difflib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from building.models import Building, Entrance, Apartment
+from user.authentication import token_cache
+
+User = get_user_model()
+
+SIZES = (1, 10, 100)
+ROLES = ("admin", "manager", "guard")
+LIST_ROUTES = (
+    ("building:building-list", ""),
+    ("building:building-list", "?expand=entrances.apartments"),
+    ("building:building-list", "?stream=1"),
+    ("building:entrance-list", ""),
+    ("building:entrance-list", "?expand=apartments"),
+    ("building:apartment-list", ""),
+    ("building:apartment-list", "?stream=1"),
+    ("user:staff-list", ""),
+)
+DETAIL_ROUTES = (
+    ("building:building-detail", Building, ""),
+    ("building:building-detail", Building, "?expand=entrances.apartments"),
+    ("building:entrance-detail", Entrance, ""),
+    ("building:entrance-detail", Entrance, "?expand=apartments"),
+    ("building:apartment-detail", Apartment, ""),
+    ("user:staff-detail", User, ""),
+)
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every list and retrieve route must run the same number of queries
+    for every role no matter how much data there is.
+    """
+
+    def setUp(self):
+        self.users = {
+            role: User.objects.create_user(
+                username=role,
+                first_name=role,
+                last_name="test",
+                role=role
+            )
+            for role in ROLES
+        }
+        self.client = APIClient()
+
+    def _seed(self, size):
+        Building.objects.all().delete()
+        User.objects.exclude(pk__in=[user.pk for user in self.users.values()]).delete()
+
+        User.objects.bulk_create(
+            [User(username=f"user_{size}_{i}", role="guard") for i in range(size)]
+        )
+        buildings = Building.objects.bulk_create([
+            Building(address=f"{i} Test St", manager=self.users["manager"])
+            for i in range(size)
+        ])
+        entrances = Entrance.objects.bulk_create([
+            Entrance(building=building, number=number, guard=self.users["guard"])
+            for building in buildings
+            for number in (1, 2)
+        ])
+        Apartment.objects.bulk_create([
+            Apartment(entrance=entrance, number=number)
+            for entrance in entrances
+            for number in (1, 2)
+        ])
+
+    def _urls(self, role):
+        user = self.users[role]
+
+        for url_name, query in LIST_ROUTES:
+            yield f"{url_name}{query}", reverse(url_name) + query
+
+        objects = {
+            Building: Building.objects.order_by("id").first(),
+            Entrance: Entrance.objects.order_by("id").first(),
+            Apartment: Apartment.objects.order_by("id").first(),
+            User: user,
+        }
+
+        for url_name, model, query in DETAIL_ROUTES:
+            url = reverse(url_name, args=[objects[model].pk]) + query
+            yield f"{url_name}{query}", url
+
+    def _measure(self):
+        results = {}
+
+        for role in ROLES:
+            self.client.force_authenticate(self.users[role])
+
+            for name, url in self._urls(role):
+                cache.clear()
+                token_cache.clear()
+
+                with CaptureQueriesContext(connection) as queries:
+                    res = self.client.get(url)
+
+                    if res.streaming:
+                        b"".join(res.streaming_content)
+
+                results[(name, role)] = (
+                    res.status_code,
+                    [query["sql"] for query in queries],
+                )
+
+        return results
+
+    def test_query_count_does_not_grow_with_data(self):
+        measurements = {}
+
+        for size in SIZES:
+            self._seed(size)
+            measurements[size] = self._measure()
+
+        failures = []
+        baseline = measurements[SIZES[0]]
+
+        for key, (status_code, expected) in baseline.items():
+            for size in SIZES[1:]:
+                _, actual = measurements[size][key]
+
+                if len(actual) == len(expected):
+                    continue
+
+                diff = "\n".join(difflib.unified_diff(
+                    expected,
+                    actual,
+                    fromfile=f"N={SIZES[0]}",
+                    tofile=f"N={size}",
+                    lineterm=""
+                ))
+                failures.append(
+                    f"GET {key[0]} as {key[1]} (HTTP {status_code}): "
+                    f"{len(expected)} queries for N={SIZES[0]}, "
+                    f"{len(actual)} for N={size}\n{diff}"
+                )
+
+        if failures:
+            self.fail("\n\n".join(failures))
@@ -0,0 +1,159 @@
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from building.access import scope_to_role
+from building.models import Building, Entrance
+from building.serializers import ReassignSerializer
+from building.versions import get_scope_version
+
+User = get_user_model()
+ENTRANCE_REASSIGN_URL = reverse("building:entrance-reassign")
+BUILDING_REASSIGN_URL = reverse("building:building-reassign")
+
+
+class ReassignTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+        self.other_manager = User.objects.create_user(
+            username="other_manager", role="manager"
+        )
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.other_guard = User.objects.create_user(
+            username="other_guard", role="guard"
+        )
+        self.building = Building.objects.create(
+            address="123 Test St", manager=self.manager
+        )
+        self.other_building = Building.objects.create(
+            address="456 Test St", manager=self.other_manager
+        )
+        self.entrances = [
+            Entrance.objects.create(
+                building=self.building, number=number, guard=self.guard
+            )
+            for number in range(1, 41)
+        ]
+        self.unguarded = Entrance.objects.create(building=self.building, number=41)
+        self.other_entrance = Entrance.objects.create(
+            building=self.other_building, number=1, guard=self.guard
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    @staticmethod
+    def entrances_of(user):
+        return scope_to_role(Entrance.objects.all(), user)
+
+    def test_reassign_guard(self):
+        scope = f"user:{self.guard.pk}"
+        version = get_scope_version(scope)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(
+                    ENTRANCE_REASSIGN_URL,
+                    {"from_user": self.guard.id, "to_user": self.other_guard.id},
+                    format="json",
+                )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["updated"]), 41)
+        self.assertLess(len(queries), 20)
+        self.assertFalse(Entrance.objects.filter(guard=self.guard).exists())
+        self.assertFalse(self.entrances_of(self.guard).exists())
+        self.assertEqual(self.entrances_of(self.other_guard).count(), 41)
+        self.assertNotEqual(get_scope_version(scope), version)
+
+        entry = LogEntry.objects.get_for_object(self.other_entrance).first()
+        self.assertEqual(entry.action, LogEntry.Action.UPDATE)
+        self.assertEqual(entry.actor, self.admin)
+        self.assertEqual(
+            entry.changes_dict["guard"],
+            [str(self.guard.id), str(self.other_guard.id)],
+        )
+
+    def test_reassign_by_ids_updates_counters(self):
+        ids = [self.entrances[0].id, self.unguarded.id]
+        res = self.client.post(
+            ENTRANCE_REASSIGN_URL,
+            {"ids": ids, "to_user": self.other_guard.id},
+            format="json",
+        )
+        self.building.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(res.data["updated"], ids)
+        self.assertEqual(self.building.guarded_entrance_count, 41)
+        self.assertEqual(Entrance.objects.filter(guard=self.other_guard).count(), 2)
+
+        res = self.client.post(
+            ENTRANCE_REASSIGN_URL,
+            {"ids": ids, "to_user": self.other_guard.id},
+            format="json",
+        )
+
+        self.assertEqual(res.data["updated"], [])
+
+    def test_rejects_invalid_target(self):
+        for data in (
+            {"to_user": self.other_guard.id},
+            {"ids": [self.unguarded.id], "to_user": self.manager.id},
+            {"ids": [self.unguarded.id], "to_user": 999},
+        ):
+            res = self.client.post(ENTRANCE_REASSIGN_URL, data, format="json")
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertIsNone(Entrance.objects.get(pk=self.unguarded.pk).guard)
+
+    def test_manager_reassigns_only_own_entrances(self):
+        self.client.force_authenticate(self.manager)
+
+        res = self.client.post(
+            ENTRANCE_REASSIGN_URL,
+            {"from_user": self.guard.id, "to_user": self.other_guard.id},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["updated"]), 40)
+        self.other_entrance.refresh_from_db()
+        self.assertEqual(self.other_entrance.guard, self.guard)
+
+        res = self.client.post(
+            BUILDING_REASSIGN_URL,
+            {"from_user": self.manager.id, "to_user": self.other_manager.id},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reassign_manager_portfolio(self):
+        res = self.client.post(
+            BUILDING_REASSIGN_URL,
+            {"from_user": self.manager.id, "to_user": self.other_manager.id},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["updated"], [self.building.id])
+        self.assertEqual(
+            Building.objects.filter(manager=self.other_manager).count(), 2
+        )
+        self.assertFalse(self.entrances_of(self.manager).exists())
+        self.assertEqual(self.entrances_of(self.other_manager).count(), 42)
+
+    def test_reassign_serializer_without_config_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            type("NoBuildingReassignSerializer", (ReassignSerializer,), {
+                "field": "guard",
+                "role": "guard",
+            })
@@ -0,0 +1,163 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from building.models import Building, Entrance, Apartment
+from building.search import address_similarity
+
+User = get_user_model()
+BUILDING_API_URL = reverse("building:building-list")
+ENTRANCE_API_URL = reverse("building:entrance-list")
+APARTMENT_API_URL = reverse("building:apartment-list")
+
+
+class AddressSearchTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.main = Building.objects.create(
+            address="12 Main Street",
+            manager=self.manager
+        )
+        self.maple = Building.objects.create(address="4 Maple Avenue")
+        self.other_main = Building.objects.create(address="99 Main Street")
+        self.entrance = Entrance.objects.create(
+            number=1,
+            building=self.main,
+            guard=self.guard
+        )
+        Entrance.objects.create(number=1, building=self.other_main, guard=self.guard)
+        self.apartment = Apartment.objects.create(number=1, entrance=self.entrance)
+
+    def _search(self, url, query):
+        res = self.client.get(url, {"search": query})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [item["id"] for item in res.data["results"]]
+
+    def test_prefix_and_substring_match(self):
+        self.client.force_authenticate(self.admin)
+
+        self.assertEqual(
+            set(self._search(BUILDING_API_URL, "mai")), {self.main.id, self.other_main.id}
+        )
+        self.assertEqual(self._search(BUILDING_API_URL, "apl"), [self.maple.id])
+
+    def test_typo_is_tolerated(self):
+        self.client.force_authenticate(self.admin)
+
+        self.assertEqual(self._search(BUILDING_API_URL, "Mapel Avenue"), [self.maple.id])
+
+    def test_results_are_ranked(self):
+        self.client.force_authenticate(self.admin)
+
+        self.assertEqual(
+            self._search(BUILDING_API_URL, "99 Main"), [self.other_main.id, self.main.id]
+        )
+
+    def test_search_follows_address_updates(self):
+        self.maple.address = "7 Oak Road"
+        self.maple.save()
+        self.client.force_authenticate(self.admin)
+
+        self.assertEqual(self._search(BUILDING_API_URL, "maple"), [])
+        self.assertEqual(self._search(BUILDING_API_URL, "oak"), [self.maple.id])
+
+    def test_bulk_created_buildings_are_indexed(self):
+        Building.objects.bulk_create([Building(address="1 Birch Lane")])
+        self.client.force_authenticate(self.admin)
+
+        self.assertEqual(len(self._search(BUILDING_API_URL, "birch")), 1)
+
+    def test_search_is_scoped_by_role_in_one_query(self):
+        self.client.force_authenticate(self.manager)
+
+        with CaptureQueriesContext(connection) as queries:
+            ids = self._search(BUILDING_API_URL, "main")
+
+        self.assertEqual(ids, [self.main.id])
+        search_queries = [
+            query["sql"] for query in queries if "MATCH" in query["sql"]
+        ]
+        self.assertEqual(len(search_queries), 1)
+        self.assertIn("manager_id", search_queries[0])
+
+    def test_entrances_and_apartments_search_by_building(self):
+        self.client.force_authenticate(self.guard)
+
+        self.assertEqual(
+            set(self._search(ENTRANCE_API_URL, "main")),
+            set(Entrance.objects.values_list("id", flat=True))
+        )
+        self.assertEqual(self._search(APARTMENT_API_URL, "12 main"), [self.apartment.id])
+        self.assertEqual(self._search(APARTMENT_API_URL, "maple"), [])
+
+    def _walk(self, url, params, link):
+        """
+        Ids of every page from ``url`` on, following ``link``,
+        and the url of the last page.
+        """
+        pages = []
+
+        while True:
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append([item["id"] for item in res.data["results"]])
+
+            if res.data[link] is None:
+                return pages, res.wsgi_request.get_full_path()
+
+            url, params = res.data[link], None
+
+    def test_search_results_span_pages_in_rank_order(self):
+        for address in (
+            "1 Main Street", "123 Main Street", "Main Street Plaza", "7 Main Road",
+            "Old Main Street Court", "5 Mainz Street",
+        ):
+            Building.objects.create(address=address)
+        self.client.force_authenticate(self.admin)
+
+        # "ma" has no trigram and falls back to icontains.
+        for query in ("main street", "ma"):
+            ranked, _ = self._walk(
+                BUILDING_API_URL, {"search": query, "page_size": 100}, "next"
+            )
+            pages, last = self._walk(
+                BUILDING_API_URL, {"search": query, "page_size": 2}, "next"
+            )
+            backwards, _ = self._walk(last, None, "previous")
+
+            self.assertGreater(len(pages), 2)
+            self.assertEqual(sum(pages, []), ranked[0])
+            self.assertEqual(sum(reversed(backwards), []), ranked[0])
+
+    def test_invalid_search_cursor_is_not_found(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(BUILDING_API_URL, {"search": "main", "page_size": 1})
+        cursor = res.data["next"].split("cursor=")[1].split("&")[0]
+
+        res = self.client.get(BUILDING_API_URL, {"cursor": cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_short_query_falls_back_to_contains(self):
+        self.client.force_authenticate(self.admin)
+
+        self.assertEqual(self._search(BUILDING_API_URL, "4 "), [self.maple.id])
+
+
+class AddressSimilarityTests(SimpleTestCase):
+
+    def test_similarity_is_share_of_query_trigrams(self):
+        self.assertEqual(address_similarity("12 Main Street", "main"), 1)
+        self.assertEqual(address_similarity("12 Main Street", "mxin"), 0)
+        self.assertEqual(address_similarity("12 Main Street", ""), 0)
@@ -0,0 +1,194 @@
+from django.contrib.auth import get_user_model
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from building.models import Building, Entrance, Apartment
+from building.serializers import BuildingListSerializer
+from building.snapshots import (
+    build_building_snapshots,
+    get_building_snapshots,
+    invalidate_building_snapshots,
+    snapshot_key,
+    snapshot_scope,
+)
+from building.versions import get_scope_versions
+
+User = get_user_model()
+BUILDING_API_URL = reverse("building:building-list")
+ENTRANCE_API_URL = reverse("building:entrance-list")
+
+
+def building_detail_url(building_id):
+    return reverse("building:building-detail", args=[building_id])
+
+
+def cached_snapshot(building_id):
+    scope = snapshot_scope(building_id)
+    version = get_scope_versions([scope])[scope]
+
+    return cache.get(snapshot_key(building_id, version))
+
+
+class BuildingSnapshotTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(
+            username="manager",
+            first_name="manager",
+            last_name="test",
+            role="manager"
+        )
+        self.guard = User.objects.create_user(
+            username="guard",
+            first_name="guard",
+            last_name="test",
+            role="guard"
+        )
+        self.building = Building.objects.create(
+            address="123 Test St",
+            manager=self.manager
+        )
+        self.other_building = Building.objects.create(address="456 Test St")
+        self.entrance = Entrance.objects.create(
+            number=1,
+            building=self.building,
+            guard=self.guard
+        )
+        self.apartment = Apartment.objects.create(entrance=self.entrance, number=101)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _building_data(self):
+        res = self.client.get(building_detail_url(self.building.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return res.data
+
+    def test_snapshot_matches_serializer(self):
+        building = Building.objects.get(id=self.building.id)
+
+        self.assertEqual(self._building_data(), BuildingListSerializer(building).data)
+
+    def test_repeated_list_is_served_from_snapshots(self):
+        self.client.get(BUILDING_API_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(BUILDING_API_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertEqual(len(queries), 1)
+
+    def test_only_affected_building_is_invalidated(self):
+        self.client.get(BUILDING_API_URL)
+        self.entrance.number = 2
+        self.entrance.save()
+
+        self.assertIsNone(cached_snapshot(self.building.id))
+        self.assertIsNotNone(cached_snapshot(self.other_building.id))
+        self.assertEqual(self._building_data()["entrances"][0]["number"], 2)
+
+    def test_apartment_changes_invalidate_snapshot(self):
+        self._building_data()
+        Apartment.objects.create(entrance=self.entrance, number=102)
+
+        apartments = self._building_data()["entrances"][0]["apartments"]
+        self.assertEqual([apartment["number"] for apartment in apartments], [101, 102])
+
+        self.apartment.delete()
+
+        apartments = self._building_data()["entrances"][0]["apartments"]
+        self.assertEqual([apartment["number"] for apartment in apartments], [102])
+
+    def test_moving_entrance_invalidates_both_buildings(self):
+        self.client.get(BUILDING_API_URL)
+        self.entrance.building = self.other_building
+        self.entrance.save()
+
+        self.assertIsNone(cached_snapshot(self.building.id))
+        self.assertIsNone(cached_snapshot(self.other_building.id))
+        self.assertEqual(self._building_data()["entrances"], [])
+
+    def test_assigned_user_changes_invalidate_snapshot(self):
+        self._building_data()
+        self.guard.first_name = "renamed"
+        self.guard.save()
+
+        data = self._building_data()
+        self.assertEqual(data["entrances"][0]["guard"], "renamed test")
+
+        self.manager.delete()
+        self.assertIsNone(self._building_data()["manager"])
+
+    def test_entrance_list_is_scoped_by_role(self):
+        Entrance.objects.create(number=2, building=self.building)
+        self.client.get(ENTRANCE_API_URL)
+
+        self.client.force_authenticate(self.guard)
+        res = self.client.get(ENTRANCE_API_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [entrance["id"] for entrance in res.data["results"]],
+            [self.entrance.id]
+        )
+
+    def test_building_list_is_scoped_by_role(self):
+        self.client.get(BUILDING_API_URL)
+
+        self.client.force_authenticate(self.manager)
+        res = self.client.get(BUILDING_API_URL)
+        self.assertEqual(
+            [building["id"] for building in res.data["results"]],
+            [self.building.id]
+        )
+
+        res = self.client.get(building_detail_url(self.other_building.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_snapshot_built_before_invalidation_is_not_served(self):
+        stale = build_building_snapshots([self.building.id])
+
+        def build_then_change(building_ids):
+            # A write commits while this reader builds its snapshot.
+            invalidate_building_snapshots([self.building.id])
+            return stale
+
+        with mock.patch(
+            "building.snapshots.build_building_snapshots", build_then_change
+        ):
+            get_building_snapshots([self.building.id])
+
+        self.assertIsNone(cached_snapshot(self.building.id))
+
+    @override_settings(BUILDING_SNAPSHOT_TIMEOUT=60)
+    def test_snapshots_expire(self):
+        with mock.patch.object(cache, "set_many") as set_many:
+            get_building_snapshots([self.building.id])
+
+        self.assertEqual(set_many.call_args.kwargs["timeout"], 60)
+
+    def test_missing_buildings_are_left_out(self):
+        snapshots = get_building_snapshots([self.building.id, 999])
+
+        self.assertEqual(list(snapshots), [self.building.id])
+
+    def test_process_local_cache_with_many_workers_is_refused(self):
+        with override_settings(WEB_CONCURRENCY=4):
+            errors = run_checks()
+
+        self.assertIn("building.E001", [error.id for error in errors])
+
+        with override_settings(WEB_CONCURRENCY=1):
+            self.assertNotIn("building.E001", [error.id for error in run_checks()])
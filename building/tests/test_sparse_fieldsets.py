@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from building.models import Building, Entrance, Apartment
+
+User = get_user_model()
+BUILDING_API_URL = reverse("building:building-list")
+ENTRANCE_API_URL = reverse("building:entrance-list")
+
+
+def building_detail_url(building_id):
+    return reverse("building:building-detail", args=[building_id])
+
+
+class SparseFieldsetsTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.guard = User.objects.create_user(
+            username="guard",
+            first_name="guard",
+            last_name="test",
+            role="guard"
+        )
+        self.building = Building.objects.create(address="123 Test St")
+        self.entrance = Entrance.objects.create(
+            number=1,
+            building=self.building,
+            guard=self.guard
+        )
+        Apartment.objects.create(entrance=self.entrance, number=101)
+        self.client = APIClient()
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sql = " ".join(query["sql"] for query in queries)
+
+        return res.data, sql
+
+    def test_guard_gets_only_requested_entrance_fields(self):
+        self.client.force_authenticate(self.guard)
+        data, sql = self._get(f"{ENTRANCE_API_URL}?fields=number,building")
+
+        self.assertEqual(
+            data["results"],
+            [{"building": self.building.address, "number": 1}]
+        )
+        self.assertNotIn("building_apartment", sql)
+
+    def test_entrance_expand_apartments(self):
+        self.client.force_authenticate(self.guard)
+        data, sql = self._get(f"{ENTRANCE_API_URL}?fields=number&expand=apartments")
+
+        entrance = data["results"][0]
+        self.assertEqual(set(entrance), {"number", "apartments"})
+        self.assertEqual(entrance["apartments"][0]["number"], 101)
+        self.assertIn("building_apartment", sql)
+
+    def test_building_relations_are_opt_in(self):
+        self.client.force_authenticate(self.admin)
+        data, sql = self._get(f"{BUILDING_API_URL}?fields=id,address")
+
+        self.assertEqual(
+            data["results"],
+            [{"id": self.building.id, "address": self.building.address}]
+        )
+        self.assertNotIn("building_entrance", sql)
+
+        data, sql = self._get(f"{BUILDING_API_URL}?expand=entrances")
+
+        entrance = data["results"][0]["entrances"][0]
+        self.assertNotIn("apartments", entrance)
+        self.assertEqual(entrance["guard"], self.guard.full_name)
+        self.assertNotIn("building_apartment", sql)
+
+    def test_nested_expand(self):
+        self.client.force_authenticate(self.admin)
+        data, _ = self._get(
+            f"{building_detail_url(self.building.id)}?expand=entrances.apartments"
+        )
+        full, _ = self._get(building_detail_url(self.building.id))
+
+        self.assertEqual(data, full)
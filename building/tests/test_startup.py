@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+class BenchmarkStartupCommandTests(SimpleTestCase):
+
+    def test_reports_startup_per_target_and_profile(self):
+        out = StringIO()
+        call_command(
+            "benchmark_startup",
+            targets=["wsgi", "asgi"],
+            repeat=1,
+            stdout=out,
+        )
+        results = {
+            (result["target"], result["profile"]): result
+            for result in json.loads(out.getvalue())["results"]
+        }
+
+        self.assertEqual(len(results), 4)
+
+        for result in results.values():
+            # Unauthenticated requests are answered without touching the database.
+            self.assertEqual(result["statuses"], [401])
+            self.assertGreater(result["import_ms"]["median"], 0)
+            self.assertGreater(result["first_request_ms"]["median"], 0)
+            self.assertGreater(result["peak_rss_kb"]["median"], 0)
+
+        # Production leaves out the development-only apps and middleware.
+        self.assertLess(
+            results[("config.wsgi", "production")]["modules"]["median"],
+            results[("config.wsgi", "development")]["modules"]["median"],
+        )
+
+
+class ProductionSettingsTests(SimpleTestCase):
+
+    def _setup(self, **env):
+        env = {
+            **{
+                name: value
+                for name, value in os.environ.items()
+                if not name.startswith("CACHE_")
+            },
+            "DJANGO_SETTINGS_MODULE": "config.settings",
+            "SETTINGS_PROFILE": "production",
+            **env,
+        }
+
+        return subprocess.run(
+            [sys.executable, "-c", "import django; django.setup()"],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+
+    def test_production_requires_a_shared_cache(self):
+        for env in (
+            {},
+            {"CACHE_BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        ):
+            completed = self._setup(**env)
+
+            self.assertNotEqual(completed.returncode, 0)
+            self.assertIn("ImproperlyConfigured", completed.stderr)
+
+        completed = self._setup(
+            CACHE_BACKEND="django.core.cache.backends.redis.RedisCache",
+            CACHE_LOCATION="redis://localhost:6379",
+        )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
@@ -0,0 +1,99 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+from rest_framework.viewsets import GenericViewSet
+
+from building.fast_serializers import APARTMENT_COLUMNS, serialize_buildings
+from building.mixins import StreamingListMixin
+from building.models import Building, Entrance, Apartment
+from building.serializers import ApartmentSerializer
+from building.streaming import stream_json_array
+from building.views import BuildingViewSet, ApartmentViewSet
+
+User = get_user_model()
+BUILDING_API_URL = reverse("building:building-list")
+APARTMENT_API_URL = reverse("building:apartment-list")
+
+
+class StreamingListTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+
+        for i in range(5):
+            building = Building.objects.create(
+                address=f"{i} Test St — ünïcode",
+                manager=self.manager if i < 2 else None
+            )
+            entrance = Entrance.objects.create(number=1, building=building)
+
+            for number in range(3):
+                Apartment.objects.create(entrance=entrance, number=number)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _stream(self, url):
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+
+        return b"".join(res.streaming_content)
+
+    def test_buildings_stream_matches_renderer(self):
+        building_ids = list(Building.objects.order_by("id").values_list("id", flat=True))
+
+        with mock.patch.object(BuildingViewSet, "stream_chunk_size", 2):
+            content = self._stream(f"{BUILDING_API_URL}?stream=1")
+
+        self.assertEqual(
+            content,
+            JSONRenderer().render(serialize_buildings(building_ids))
+        )
+
+    def test_apartments_stream_matches_serializer(self):
+        with mock.patch.object(ApartmentViewSet, "stream_chunk_size", 4):
+            content = self._stream(f"{APARTMENT_API_URL}?stream=1")
+
+        expected = ApartmentSerializer(Apartment.objects.order_by("id"), many=True)
+        self.assertEqual(content, JSONRenderer().render(expected.data))
+
+    def test_stream_is_scoped_by_role(self):
+        self.client.force_authenticate(self.manager)
+        content = self._stream(f"{BUILDING_API_URL}?stream=1")
+
+        self.assertEqual(
+            [building["id"] for building in json.loads(content)],
+            list(self.manager.buildings.order_by("id").values_list("id", flat=True))
+        )
+
+    def test_stream_fetches_rows_in_chunks(self):
+        with mock.patch.object(ApartmentViewSet, "stream_chunk_size", 4):
+            res = self.client.get(f"{APARTMENT_API_URL}?stream=1")
+
+            with CaptureQueriesContext(connection) as queries:
+                chunks = list(res.streaming_content)
+
+        self.assertEqual(len(json.loads(b"".join(chunks))), 15)
+        self.assertEqual(len(queries), 4)
+
+    def test_empty_stream(self):
+        self.assertEqual("".join(stream_json_array([])), "[]")
+        self.assertEqual("".join(stream_json_array([[]])), "[]")
+        self.assertEqual("".join(stream_json_array([[1], [2]])), "[1,2]")
+
+    def test_viewset_without_stream_config_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            type("NoStreamViewSet", (StreamingListMixin, GenericViewSet), {
+                "stream_columns": APARTMENT_COLUMNS,
+            })
@@ -0,0 +1,137 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.views import APIView
+
+from building.models import Building
+from building.timing import RequestTimer, TimingHistograms, histograms
+
+User = get_user_model()
+BUILDING_API_URL = reverse("building:building-list")
+METRICS_URL = reverse("building:metrics")
+
+
+def parse_server_timing(header):
+    timings = {}
+
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        timings[name] = dict(param.split("=", 1) for param in params)
+
+    return timings
+
+
+class RequestTimingMiddlewareTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        histograms.clear()
+        self.addCleanup(histograms.clear)
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.manager = User.objects.create_user(username="manager", role="manager")
+        Building.objects.create(address="123 Test St", manager=self.manager)
+
+    def test_server_timing_reports_phases(self):
+        self.client.force_authenticate(self.manager)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(BUILDING_API_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        timings = parse_server_timing(res["Server-Timing"])
+
+        self.assertEqual(
+            set(timings),
+            {"auth", "perm", "db", "serialize", "view", "render", "total"}
+        )
+        self.assertEqual(timings["db"]["desc"], f'"{len(queries)} queries"')
+
+        phases = sum(
+            float(timing["dur"]) for name, timing in timings.items() if name != "total"
+        )
+        self.assertLessEqual(phases, float(timings["total"]["dur"]) + 0.1)
+
+    def test_requests_are_recorded_per_route_and_role(self):
+        self.client.force_authenticate(self.manager)
+        self.client.get(BUILDING_API_URL)
+        self.client.get(BUILDING_API_URL)
+
+        metrics = histograms.render()
+
+        self.assertIn(
+            'api_request_duration_seconds_count{route="building:building-list",'
+            'method="GET",role="manager"} 2',
+            metrics
+        )
+        self.assertIn('role="manager",phase="db"}', metrics)
+
+    def test_serializer_data_is_timed(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(reverse("building:building-summary"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("serialize", parse_server_timing(res["Server-Timing"]))
+
+    def test_views_without_the_mixin_are_not_timed(self):
+        self.assertFalse(hasattr(APIView, "_request_timing_installed"))
+
+        res = self.client.get(reverse("schema"))
+
+        self.assertNotIn("Server-Timing", res)
+
+    def test_non_api_requests_are_not_timed(self):
+        res = self.client.get("/admin/login/")
+
+        self.assertNotIn("Server-Timing", res)
+        self.assertNotIn("admin:login", histograms.render())
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.client.force_authenticate(self.manager)
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            'api_request_duration_seconds_count{route="building:metrics",'
+            'method="GET",role="manager"} 1',
+            res.content.decode()
+        )
+
+
+class RequestTimerTests(SimpleTestCase):
+
+    def test_nested_phases_are_excluded(self):
+        timer = RequestTimer()
+
+        with timer.phase("view"):
+            with timer.phase("db"):
+                pass
+
+        self.assertGreaterEqual(timer.phases["view"], 0)
+        self.assertGreaterEqual(timer.phases["db"], 0)
+        self.assertLess(timer.phases["view"] + timer.phases["db"], timer.elapsed())
+
+    def test_histogram_buckets_are_cumulative(self):
+        timings = TimingHistograms(buckets=(0.1, 1.0))
+        timings.observe("route", "GET", "admin", 0.05, {}, 1)
+        timings.observe("route", "GET", "admin", 0.5, {}, 2)
+        timings.observe("route", "GET", "admin", 5, {}, 3)
+
+        metrics = timings.render()
+
+        labels = 'route="route",method="GET",role="admin"'
+        self.assertIn(f'api_request_duration_seconds_bucket{{{labels},le="0.1"}} 1', metrics)
+        self.assertIn(f'api_request_duration_seconds_bucket{{{labels},le="1.0"}} 2', metrics)
+        self.assertIn(f'api_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3', metrics)
+        self.assertIn(f"api_request_queries_total{{{labels}}} 6", metrics)
@@ -0,0 +1,257 @@
+"""
+Request timing for DRF views.
+
+RequestTimingMiddleware starts a RequestTimer for every request.
+Views with TimedViewMixin and serializers with TimedSerializerMixin
+attribute its time to phases:
+
+- auth: authenticating the request
+- perm: permission checks
+- db: SQL queries, with their count
+- serialize: turning objects into the response data
+- view: the rest of the handler, e.g. building querysets
+- render: rendering the response body
+
+Phases exclude the phases nested in them, so a query run by a permission
+check counts as db, not perm. Responses of DRF views get a Server-Timing
+header with those phases and the total, and are added to in-process
+histograms per route, method and role, exposed by the metrics endpoint.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
+
+PHASES = ("auth", "perm", "db", "serialize", "view", "render")
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+active_timer = ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases = defaultdict(float)
+        self.queries = 0
+        self.is_api = False
+        self._nested = []
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        self._nested.append(0.0)
+
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name] += elapsed - self._nested.pop()
+
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        self.queries += 1
+
+        with self.phase("db"):
+            return execute(sql, params, many, context)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: float) -> str:
+        entries = []
+
+        for name in PHASES:
+            if name in self.phases:
+                entry = f"{name};dur={self.phases[name] * 1000:.2f}"
+
+                if name == "db":
+                    entry += f';desc="{self.queries} queries"'
+
+                entries.append(entry)
+
+        entries.append(f"total;dur={total * 1000:.2f}")
+
+        return ", ".join(entries)
+
+
+@contextmanager
+def timed_phase(name: str):
+    timer = active_timer.get()
+
+    if timer is None:
+        yield
+    else:
+        with timer.phase(name):
+            yield
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+
+
+class TimingHistograms:
+    """
+    Thread-safe histograms of request durations, with the time of every
+    phase and the number of queries summed per route, method and role.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, route, method, role, total, phases, queries) -> None:
+        index = bisect_left(self.buckets, total)
+
+        with self._lock:
+            series = self._series.get((route, method, role))
+
+            if series is None:
+                series = self._series[(route, method, role)] = {
+                    "buckets": [0] * (len(self.buckets) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                    "phases": defaultdict(float),
+                    "queries": 0,
+                }
+
+            series["buckets"][index] += 1
+            series["sum"] += total
+            series["count"] += 1
+            series["queries"] += queries
+
+            for name, seconds in phases.items():
+                series["phases"][name] += seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> str:
+        """
+        The histograms in the Prometheus text exposition format.
+        """
+        with self._lock:
+            series = {
+                key: {**value, "buckets": list(value["buckets"]),
+                      "phases": dict(value["phases"])}
+                for key, value in sorted(self._series.items())
+            }
+
+        lines = [
+            "# HELP api_request_duration_seconds Duration of DRF requests.",
+            "# TYPE api_request_duration_seconds histogram",
+        ]
+
+        for (route, method, role), value in series.items():
+            labels = _labels(route=route, method=method, role=role)
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + ("+Inf",), value["buckets"]):
+                cumulative += count
+                lines.append(
+                    f'api_request_duration_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{cumulative}"
+                )
+
+            lines += [
+                f"api_request_duration_seconds_sum{{{labels}}} {value['sum']}",
+                f"api_request_duration_seconds_count{{{labels}}} {value['count']}",
+            ]
+
+        lines += [
+            "# HELP api_request_phase_seconds_total Time spent per request phase.",
+            "# TYPE api_request_phase_seconds_total counter",
+        ]
+
+        for (route, method, role), value in series.items():
+            for name in PHASES:
+                if name in value["phases"]:
+                    labels = _labels(route=route, method=method, role=role, phase=name)
+                    lines.append(
+                        f"api_request_phase_seconds_total{{{labels}}} "
+                        f"{value['phases'][name]}"
+                    )
+
+        lines += [
+            "# HELP api_request_queries_total SQL queries run by DRF requests.",
+            "# TYPE api_request_queries_total counter",
+        ]
+
+        for (route, method, role), value in series.items():
+            labels = _labels(route=route, method=method, role=role)
+            lines.append(f"api_request_queries_total{{{labels}}} {value['queries']}")
+
+        return "\n".join(lines) + "\n"
+
+
+histograms = TimingHistograms()
+
+
+class TimedViewMixin:
+    """
+    APIView mixin timing the request: authentication, permission checks
+    and rendering as their phases, everything else as the view.
+    The response is rendered here, while the view is still timed.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        timer = active_timer.get()
+
+        if timer is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        timer.is_api = True
+
+        with timer.phase("view"):
+            return super().dispatch(request, *args, **kwargs)
+
+    def perform_authentication(self, request):
+        with timed_phase("auth"):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with timed_phase("perm"):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with timed_phase("perm"):
+            super().check_object_permissions(request, obj)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if isinstance(response, Response) and active_timer.get() is not None:
+            with timed_phase("render"):
+                response.render()
+
+        return response
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin timing ``.data`` as the serialize phase. Set
+    ``Meta.list_serializer_class`` to ``TimedListSerializer`` (or a
+    subclass) to time ``many=True`` too.
+    """
+
+    @property
+    def data(self):
+        with timed_phase("serialize"):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, ListSerializer):
+    pass
@@ -1,7 +1,17 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from building.views import BuildingViewSet, EntranceViewSet, ApartmentViewSet
+from building.async_views import (
+    AsyncBuildingView,
+    AsyncEntranceView,
+    AsyncApartmentView,
+)
+from building.views import (
+    BuildingViewSet,
+    EntranceViewSet,
+    ApartmentViewSet,
+    MetricsView,
+)
 
 router = routers.DefaultRouter()
 router.register("buildings", BuildingViewSet, basename="building")
@@ -9,7 +19,38 @@ router.register("entrances", EntranceViewSet, basename="entrance")
 router.register("apartments", ApartmentViewSet, basename="apartment")
 
 urlpatterns = [
-    path("", include(router.urls))
+    path("", include(router.urls)),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path(
+        "async/buildings/",
+        AsyncBuildingView.as_view(),
+        name="async-building-list"
+    ),
+    path(
+        "async/buildings/<int:pk>/",
+        AsyncBuildingView.as_view(),
+        name="async-building-detail"
+    ),
+    path(
+        "async/entrances/",
+        AsyncEntranceView.as_view(),
+        name="async-entrance-list"
+    ),
+    path(
+        "async/entrances/<int:pk>/",
+        AsyncEntranceView.as_view(),
+        name="async-entrance-detail"
+    ),
+    path(
+        "async/apartments/",
+        AsyncApartmentView.as_view(),
+        name="async-apartment-list"
+    ),
+    path(
+        "async/apartments/<int:pk>/",
+        AsyncApartmentView.as_view(),
+        name="async-apartment-detail"
+    ),
 ]
 
 app_name = "building"
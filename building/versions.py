@@ -0,0 +1,135 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+SCOPE_VERSION_PREFIX = "scope-version"
+ALL_SCOPE = "all"
+
+
+def user_scope(user) -> str:
+    """
+    Admins see everything and share one scope,
+    managers and guards each have their own.
+    """
+    if user.role == "admin":
+        return ALL_SCOPE
+
+    return f"user:{user.pk}"
+
+
+def _version_key(scope: str) -> str:
+    return f"{SCOPE_VERSION_PREFIX}:{scope}"
+
+
+def _fresh_version() -> int:
+    # Start from the clock, so a counter evicted from the cache
+    # never comes back with a value that was already handed out.
+    return time.time_ns()
+
+
+def get_scope_version(scope: str) -> int:
+    key = _version_key(scope)
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, _fresh_version(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_scope_versions(scopes) -> dict:
+    """
+    ``get_scope_version()`` of many scopes in as few cache round trips.
+    """
+    keys = {_version_key(scope): scope for scope in scopes}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+
+    if missing:
+        for key in missing:
+            cache.add(key, _fresh_version(), timeout=None)
+
+        versions.update(cache.get_many(missing))
+
+    return {keys[key]: version for key, version in versions.items()}
+
+
+async def aget_scope_versions(scopes) -> dict:
+    keys = {_version_key(scope): scope for scope in scopes}
+    versions = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in versions]
+
+    if missing:
+        for key in missing:
+            await cache.aadd(key, _fresh_version(), timeout=None)
+
+        versions.update(await cache.aget_many(missing))
+
+    return {keys[key]: version for key, version in versions.items()}
+
+
+async def aget_scope_version(scope: str) -> int:
+    key = _version_key(scope)
+    version = await cache.aget(key)
+
+    if version is None:
+        await cache.aadd(key, _fresh_version(), timeout=None)
+        version = await cache.aget(key)
+
+    return version
+
+
+def scope_etag(user, version: int, media_type: str, full_path: str) -> str:
+    """
+    Strong ETag of a response rendered for ``user`` at a scope version.
+    """
+    raw = ":".join((
+        user_scope(user), str(version), user.role, media_type, full_path,
+    ))
+
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def _bump(keys) -> None:
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_version(), timeout=None)
+
+
+def bump_scope_versions(user_ids) -> None:
+    """
+    Bump the admin scope and the scopes of the given users.
+
+    Like snapshot invalidation, the bump is repeated on commit so a read
+    racing with the write cannot keep an ETag for uncommitted data.
+    """
+    keys = [_version_key(ALL_SCOPE)] + [
+        _version_key(f"user:{user_id}")
+        for user_id in set(user_ids)
+        if user_id is not None
+    ]
+
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def reset_scope_versions(scopes) -> None:
+    """
+    Drop the versions of the given scopes, now and again on commit.
+
+    The next reader starts the scope from the clock, above any version
+    handed out before, so whatever was cached under an older version
+    (even by a reader of not yet committed data) is never read again.
+    """
+    keys = [_version_key(scope) for scope in scopes]
+
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -1,7 +1,32 @@
 from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets
-
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from building.access import scope_to_role
+from building.db_router import primary_reads
+from building.fast_serializers import (
+    APARTMENT_COLUMNS,
+    serialize_apartment_rows,
+    serialize_building_rows,
+)
+from building.history import building_scope, entrance_scope
+from building.mixins import (
+    BulkCreateMixin,
+    ConditionalGetMixin,
+    HistoryMixin,
+    ReassignMixin,
+    SparseFieldsetsViewMixin,
+    StreamingListMixin,
+)
 from building.models import Building, Entrance, Apartment
+from building.pagination import IdCursorPagination
 from building.permissions import IsAdminRole, IsAdminOrManagerRole, AllowAnyRole
 from building.serializers import (
     BuildingSerializer,
@@ -9,12 +34,28 @@ from building.serializers import (
     ApartmentSerializer,
     EntranceListSerializer,
     BuildingListSerializer,
+    BuildingSummarySerializer,
+    EntranceBulkSerializer,
+    ApartmentBulkSerializer,
+    GuardReassignSerializer,
+    ManagerReassignSerializer,
 )
+from building.search import AddressSearchFilter
+from building.snapshots import get_building_snapshots, snapshot_entrances
+from building.timing import TimedViewMixin, histograms, timed_phase
 
 User = get_user_model()
 
 
-class BuildingViewSet(viewsets.ModelViewSet):
+class BuildingViewSet(
+    TimedViewMixin,
+    ConditionalGetMixin,
+    SparseFieldsetsViewMixin,
+    StreamingListMixin,
+    ReassignMixin,
+    HistoryMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet for managing buildings.
 
@@ -23,17 +64,36 @@ class BuildingViewSet(viewsets.ModelViewSet):
     - Admin: all CRUD
     - Manager: GET, POST. Only for related objects
     - Guard: any not allowed
+
+    GET accepts ``?fields=`` and ``?expand=entrances,entrances.apartments``
+    to return a sparse representation. List accepts ``?stream=1``
+    to stream the full tree of every building as one JSON array.
+    ``GET /buildings/summary/`` lists only the entrance and apartment counters.
+    Lists accept ``?search=`` to find buildings by address, best matches first.
+    ``GET /buildings/<id>/history/`` lists the changes of the building,
+    its entrances and apartments.
+    Admins move buildings to another manager with ``POST /buildings/reassign/``.
     """
     serializer_class = BuildingSerializer
+    pagination_class = IdCursorPagination
+    filter_backends = (AddressSearchFilter,)
+    stream_columns = ("id",)
+    stream_serializer = staticmethod(serialize_building_rows)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
             return BuildingListSerializer
 
+        if self.action == "summary":
+            return BuildingSummarySerializer
+
+        if self.action == "reassign":
+            return ManagerReassignSerializer
+
         return self.serializer_class
 
     def get_permissions(self):
-        if self.action in ("list", "retrieve",):
+        if self.action in ("list", "retrieve", "summary", "history"):
             permission_classes = (IsAdminOrManagerRole,)
         else:
             permission_classes = (IsAdminRole,)
@@ -47,15 +107,89 @@ class BuildingViewSet(viewsets.ModelViewSet):
         if user.role != "admin":
             queryset = queryset.filter(manager=user)
 
-        queryset = queryset.prefetch_related(
-            "entrances__guard",
-            "entrances__apartments"
-        ).select_related("manager")
+        if self.get_sparse_fieldsets() is not None:
+            queryset = queryset.select_related("manager")
+
+            if self.is_expanded("entrances"):
+                queryset = queryset.prefetch_related("entrances__guard")
+
+            if self.is_expanded("entrances.apartments"):
+                queryset = queryset.prefetch_related("entrances__apartments")
 
         return queryset
 
+    def get_history_scope(self, instance) -> dict:
+        return building_scope(instance)
+
+    def reads_primary(self) -> bool:
+        return (
+            self.action in ("list", "retrieve")
+            and not self.is_streaming()
+            and self.get_sparse_fieldsets() is None
+        )
+
+    def list(self, request, *args, **kwargs):
+        if self.is_streaming():
+            return self.stream_list()
+
+        if self.get_sparse_fieldsets() is not None:
+            return super().list(request, *args, **kwargs)
+
+        with primary_reads():
+            rows = self.filter_queryset(self.get_queryset().values("id"))
+            page = self.paginate_queryset(rows)
+            building_ids = [row["id"] for row in (rows if page is None else page)]
+
+        with timed_phase("serialize"):
+            snapshots = get_building_snapshots(building_ids)
+            data = [
+                snapshots[building_id]
+                for building_id in building_ids
+                if building_id in snapshots
+            ]
+
+        if page is None:
+            return Response(data)
+
+        return self.get_paginated_response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.get_sparse_fieldsets() is not None:
+            return super().retrieve(request, *args, **kwargs)
 
-class EntranceViewSet(viewsets.ModelViewSet):
+        with primary_reads():
+            building = self.get_object()
+
+        with timed_phase("serialize"):
+            data = get_building_snapshots([building.id]).get(building.id)
+
+        if data is None:
+            raise NotFound()
+
+        return Response(data)
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request, *args, **kwargs):
+        fields = BuildingSummarySerializer.Meta.fields
+        rows = self.filter_queryset(self.get_queryset().values(*fields))
+        page = self.paginate_queryset(rows)
+        serializer = self.get_serializer(rows if page is None else page, many=True)
+
+        if page is None:
+            return Response(serializer.data)
+
+        return self.get_paginated_response(serializer.data)
+
+
+class EntranceViewSet(
+    TimedViewMixin,
+    ConditionalGetMixin,
+    SparseFieldsetsViewMixin,
+    BulkCreateMixin,
+    ReassignMixin,
+    HistoryMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet for managing entrances.
 
@@ -64,19 +198,37 @@ class EntranceViewSet(viewsets.ModelViewSet):
     - Admin: all CRUD
     - Manager: GET, POST, PUT, PATCH. Only for related objects
     - Guard: GET. Only for related objects
+
+    Admins can create many entrances at once with ``POST /entrances/bulk/``.
+    Admins and managers get the changes of an entrance and its apartments
+    with ``GET /entrances/<id>/history/``, and move entrances to another
+    guard with ``POST /entrances/reassign/``.
+
+    GET accepts ``?fields=`` and ``?expand=apartments``
+    to return a sparse representation.
+    List accepts ``?search=`` to find entrances by building address.
     """
     serializer_class = EntranceSerializer
+    pagination_class = IdCursorPagination
+    filter_backends = (AddressSearchFilter,)
+    search_building_field = "building"
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
             return EntranceListSerializer
 
+        if self.action == "bulk_create":
+            return EntranceBulkSerializer
+
+        if self.action == "reassign":
+            return GuardReassignSerializer
+
         return self.serializer_class
 
     def get_permissions(self):
         if self.action in ("list", "retrieve"):
             permission_classes = (AllowAnyRole,)
-        elif self.action in ("create", "destroy"):
+        elif self.action in ("create", "bulk_create", "destroy"):
             permission_classes = (IsAdminRole,)
         else:
             permission_classes = (IsAdminOrManagerRole,)
@@ -84,23 +236,75 @@ class EntranceViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        user = self.request.user
-        queryset = Entrance.objects.all()
+        queryset = scope_to_role(Entrance.objects.all(), self.request.user)
 
-        if self.request.user.role == "manager":
-            queryset = Entrance.objects.filter(building__manager=user)
+        # Entrance.__str__ (used by auditlog on writes) reads the building.
+        queryset = queryset.select_related("building")
 
-        if self.request.user.role == "guard":
-            queryset = Entrance.objects.filter(guard=user)
+        if self.get_sparse_fieldsets() is not None:
+            queryset = queryset.select_related("guard")
 
-        queryset = queryset.prefetch_related(
-            "building", "apartments"
-        ).select_related("guard")
+            if self.is_expanded("apartments"):
+                queryset = queryset.prefetch_related("apartments")
 
         return queryset
 
+    def get_history_scope(self, instance) -> dict:
+        return entrance_scope(instance)
+
+    def reads_primary(self) -> bool:
+        return (
+            self.action in ("list", "retrieve")
+            and self.get_sparse_fieldsets() is None
+        )
+
+    @staticmethod
+    def _entrances_from_snapshots(rows) -> list:
+        with timed_phase("serialize"):
+            snapshots = get_building_snapshots({row["building_id"] for row in rows})
 
-class ApartmentViewSet(viewsets.ModelViewSet):
+            return snapshot_entrances(snapshots, [row["id"] for row in rows])
+
+    def list(self, request, *args, **kwargs):
+        if self.get_sparse_fieldsets() is not None:
+            return super().list(request, *args, **kwargs)
+
+        with primary_reads():
+            rows = self.filter_queryset(self.get_queryset().values("id", "building_id"))
+            page = self.paginate_queryset(rows)
+            rows = list(rows if page is None else page)
+
+        data = self._entrances_from_snapshots(rows)
+
+        if page is None:
+            return Response(data)
+
+        return self.get_paginated_response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.get_sparse_fieldsets() is not None:
+            return super().retrieve(request, *args, **kwargs)
+
+        with primary_reads():
+            entrance = self.get_object()
+
+        rows = [{"id": entrance.id, "building_id": entrance.building_id}]
+        data = self._entrances_from_snapshots(rows)
+
+        if not data:
+            raise NotFound()
+
+        return Response(data[0])
+
+
+class ApartmentViewSet(
+    TimedViewMixin,
+    ConditionalGetMixin,
+    StreamingListMixin,
+    BulkCreateMixin,
+    HistoryMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet for managing apartments.
 
@@ -109,29 +313,78 @@ class ApartmentViewSet(viewsets.ModelViewSet):
     - Admin: all CRUD
     - Manager: GET. Only for related objects
     - Guard: GET. Only for related objects
+
+    List accepts ``?stream=1`` to stream all apartments as one JSON array.
+    Admins can create many apartments at once with ``POST /apartments/bulk/``.
+    List accepts ``?search=`` to find apartments by building address.
+    Admins and managers get its changes with ``GET /apartments/<id>/history/``.
     """
     serializer_class = ApartmentSerializer
+    pagination_class = IdCursorPagination
+    filter_backends = (AddressSearchFilter,)
+    search_building_field = "entrance__building"
+    stream_columns = APARTMENT_COLUMNS
+    stream_serializer = staticmethod(serialize_apartment_rows)
+
+    def get_serializer_class(self):
+        if self.action == "bulk_create":
+            return ApartmentBulkSerializer
+
+        return self.serializer_class
 
     def get_permissions(self):
         permission_classes = (IsAdminRole,)
 
         if self.action in ("list", "retrieve"):
             permission_classes = (AllowAnyRole,)
+        elif self.action == "history":
+            permission_classes = (IsAdminOrManagerRole,)
 
         return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        user = self.request.user
-        queryset = Apartment.objects.all()
+        queryset = scope_to_role(Apartment.objects.all(), self.request.user, "entrance")
 
-        if self.request.user.role == "manager":
-            queryset = (
-                Apartment.objects.filter(entrance__building__manager=user)
-            )
+        return queryset.select_related("entrance__building")
 
-        if self.request.user.role == "guard":
-            queryset = Apartment.objects.filter(entrance__guard=user)
+    def list(self, request, *args, **kwargs):
+        if self.is_streaming():
+            return self.stream_list()
 
-        queryset = queryset.select_related("entrance__building")
+        rows = self.filter_queryset(self.get_queryset().values(*APARTMENT_COLUMNS))
+        page = self.paginate_queryset(rows)
 
-        return queryset
+        with timed_phase("serialize"):
+            data = serialize_apartment_rows(rows if page is None else page)
+
+        if page is None:
+            return Response(data)
+
+        return self.get_paginated_response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        rows = self.filter_queryset(self.get_queryset().values(*APARTMENT_COLUMNS))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(rows, **{self.lookup_field: kwargs[lookup_url_kwarg]})
+
+        with timed_phase("serialize"):
+            data = serialize_apartment_rows([row])[0]
+
+        return Response(data)
+
+
+class MetricsView(TimedViewMixin, APIView):
+    """
+    Request timing histograms of this worker process
+    in the Prometheus text format.
+
+    Allow only for admin roles
+    """
+    permission_classes = (IsAdminRole,)
+
+    @extend_schema(responses={(200, "text/plain"): OpenApiTypes.STR})
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            histograms.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
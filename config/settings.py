@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,10 +26,25 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
 
+# SETTINGS_PROFILE is "development" (the default) or "production".
+# Production leaves out development-only apps and middleware, never runs
+# with DEBUG and keeps database connections and compiled templates.
+
+SETTINGS_PROFILE = os.environ.get("SETTINGS_PROFILE", "development")
+
+if SETTINGS_PROFILE not in ("development", "production"):
+    raise ImproperlyConfigured(f"Unknown SETTINGS_PROFILE {SETTINGS_PROFILE!r}.")
+
+PRODUCTION = SETTINGS_PROFILE == "production"
+
 # SECURITY WARNING: don"t run with debug turned on in production!
-DEBUG = os.environ["DEBUG"]
+DEBUG = not PRODUCTION and os.environ["DEBUG"] not in ("", "0", "False", "false")
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get("ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
 
 INTERNAL_IPS = ["127.0.0.1",]
 
@@ -44,7 +60,6 @@ INSTALLED_APPS = [
 
     "rest_framework",
     "rest_framework.authtoken",
-    "debug_toolbar",
     "drf_spectacular",
     "auditlog",
 
@@ -52,31 +67,54 @@ INSTALLED_APPS = [
     "user",
 ]
 
+DEVELOPMENT_APPS = [
+    "debug_toolbar",
+]
+
+DEVELOPMENT_MIDDLEWARE = [
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+]
+
+if not PRODUCTION:
+    INSTALLED_APPS += DEVELOPMENT_APPS
+
 MIDDLEWARE = [
+    "building.middleware.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    *([] if PRODUCTION else DEVELOPMENT_MIDDLEWARE),
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "building.middleware.AuditLogBufferMiddleware",
+    "building.middleware.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
 
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, "templates")],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
-                "django.template.context_processors.debug",
+                *([] if PRODUCTION else ["django.template.context_processors.debug"]),
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            "loaders": (
+                [("django.template.loaders.cached.Loader", TEMPLATE_LOADERS)]
+                if PRODUCTION
+                else TEMPLATE_LOADERS
+            ),
         },
     },
 ]
@@ -86,15 +124,106 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Production keeps connections open between requests
+# (DATABASE_CONN_MAX_AGE seconds, 600 by default).
+
+DATABASE_CONN_MAX_AGE = int(
+    os.environ.get("DATABASE_CONN_MAX_AGE", 600 if PRODUCTION else 0)
+)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": DATABASE_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DATABASE_CONN_MAX_AGE > 0,
     }
 }
 
+# Read replicas, see building/db_router.py.
+# DATABASE_REPLICAS lists SQLite files that are copies of the primary.
+
+DATABASE_REPLICAS = [
+    name.strip()
+    for name in os.environ.get("DATABASE_REPLICAS", "").split(",")
+    if name.strip()
+]
+DATABASE_REPLICA_ALIASES = []
+
+for index, name in enumerate(DATABASE_REPLICAS):
+    DATABASES[f"replica_{index}"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / name,
+        "CONN_MAX_AGE": DATABASE_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DATABASE_CONN_MAX_AGE > 0,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICA_ALIASES.append(f"replica_{index}")
+
+DATABASE_ROUTERS = ["building.db_router.ReplicaRouter"]
+DATABASE_STICKY_PRIMARY_SECONDS = int(
+    os.environ.get("DATABASE_STICKY_PRIMARY_SECONDS", 5)
+)
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Building snapshots are invalidated through the cache, so every worker
+# must share it (e.g. Redis or Memcached). The system checks refuse the
+# per-process default when WEB_CONCURRENCY (the worker count read by
+# gunicorn and uvicorn) is above one, and production refuses it always.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+if PRODUCTION and (
+    CACHES["default"]["BACKEND"] in (
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    )
+    or not CACHES["default"]["LOCATION"]
+):
+    raise ImproperlyConfigured(
+        "The production profile needs a cache shared by all workers: "
+        "set CACHE_BACKEND and CACHE_LOCATION, e.g. to Redis."
+    )
+
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+# Building snapshots are versioned and expire after this many seconds,
+# see building/snapshots.py
+
+BUILDING_SNAPSHOT_TIMEOUT = int(os.environ.get("BUILDING_SNAPSHOT_TIMEOUT", 3600))
+
 AUTH_USER_MODEL = "user.User"
 
+# Password hashers
+# https://docs.djangoproject.com/en/5.0/topics/auth/passwords/
+# PASSWORD_HASHER=scrypt hashes new passwords with scrypt, which is
+# memory-hard and faster to verify than PBKDF2. Other hashes are
+# replaced on the next successful login.
+
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "pbkdf2")
+
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+if PASSWORD_HASHER == "scrypt":
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop())
+elif PASSWORD_HASHER != "pbkdf2":
+    raise ImproperlyConfigured(f"Unknown PASSWORD_HASHER {PASSWORD_HASHER!r}.")
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -142,11 +271,52 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "user.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Default page size of the paginated endpoints, see building/pagination.py
+
+API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", 50))
+
+# Audit log entries are buffered per request, see building/audit.py
+
+AUDITLOG_BACKGROUND_FLUSH = os.environ.get("AUDITLOG_BACKGROUND_FLUSH") == "1"
+AUDITLOG_FLUSH_QUEUE_SIZE = int(os.environ.get("AUDITLOG_FLUSH_QUEUE_SIZE", 1000))
+
+# Entries older than AUDITLOG_RETENTION_DAYS are moved to monthly gzip
+# partitions by manage.py archive_audit_log, see building/archive.py
+
+AUDITLOG_RETENTION_DAYS = int(os.environ.get("AUDITLOG_RETENTION_DAYS", 365))
+AUDITLOG_ARCHIVE_DIR = Path(
+    os.environ.get("AUDITLOG_ARCHIVE_DIR", BASE_DIR / "audit-archive")
+)
+
+# Resolved auth tokens are cached per worker process and revoked
+# through the shared cache, see user/authentication.py
+
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_CACHE_SIZE", 1024))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", 60))
+
+# Logins hash passwords in a bounded pool, see user/hashing.py
+
+LOGIN_HASHING_WORKERS = int(
+    os.environ.get("LOGIN_HASHING_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+)
+LOGIN_HASHING_QUEUE_SIZE = int(os.environ.get("LOGIN_HASHING_QUEUE_SIZE", 64))
+LOGIN_HASHING_TIMEOUT = float(os.environ.get("LOGIN_HASHING_TIMEOUT", 10))
+
+# DRF requests are timed by phase, see building/timing.py
+
+REQUEST_TIMING = os.environ.get("REQUEST_TIMING", "1") == "1"
+
+# The OpenAPI schema is compiled once per process, see building/openapi.py
+
+OPENAPI_SCHEMA_FILE = Path(
+    os.environ.get("OPENAPI_SCHEMA_FILE", BASE_DIR / "openapi-schema.json")
+)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "House Security System API",
     "DESCRIPTION": "API for managing House Security",
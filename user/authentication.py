@@ -0,0 +1,181 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from copy import copy
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from building.versions import (
+    aget_scope_version,
+    get_scope_version,
+    reset_scope_versions,
+)
+
+
+class TokenCache:
+    """
+    Thread-safe LRU of resolved tokens with a time-to-live.
+
+    The cache lives in the worker process. Entries are stored with the
+    version of their token in the shared cache (see ``token_scope()``)
+    and only used while it is current, so a token revoked in any worker
+    is rejected by all of them.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(
+    maxsize=getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "AUTH_TOKEN_CACHE_TTL", 60),
+)
+
+
+def token_scope(key: str) -> str:
+    digest = hashlib.sha1(key.encode()).hexdigest()
+
+    return f"token:{digest}"
+
+
+def invalidate_tokens(keys) -> None:
+    """
+    Make every worker resolve the given tokens again.
+    """
+    keys = list(keys)
+
+    for key in keys:
+        token_cache.delete(key)
+
+    reset_scope_versions(token_scope(key) for key in keys)
+
+
+def _request_credentials(credentials) -> tuple:
+    """
+    Copies of a cached user and token for one request, so attributes
+    set while handling it never reach the other requests of the token.
+    """
+    user, token = credentials
+    user, token = copy(user), copy(token)
+    token.user = user
+
+    return user, token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps resolved token -> user pairs
+    in ``token_cache``, so repeat callers skip the token+user query.
+    Every request gets its own copies of the cached user and token.
+
+    The version of the token in the shared cache is read before the
+    query and checked on every hit. Signals reset it when the token is
+    deleted or its user is saved or deleted, in whichever worker.
+
+    ``aauthenticate()`` does the same for async views,
+    resolving cache misses with the async ORM.
+    """
+
+    def authenticate_credentials(self, key):
+        version = get_scope_version(token_scope(key))
+        entry = token_cache.get(key)
+
+        if entry is not None and entry[0] == version:
+            return _request_credentials(entry[1])
+
+        credentials = super().authenticate_credentials(key)
+        token_cache.set(key, (version, credentials))
+
+        return _request_credentials(credentials)
+
+    async def aauthenticate(self, request):
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            msg = _("Invalid token header. No credentials provided.")
+            raise exceptions.AuthenticationFailed(msg)
+        elif len(auth) > 2:
+            msg = _("Invalid token header. Token string should not contain spaces.")
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            msg = _(
+                "Invalid token header. "
+                "Token string should not contain invalid characters."
+            )
+            raise exceptions.AuthenticationFailed(msg)
+
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        version = await aget_scope_version(token_scope(key))
+        entry = token_cache.get(key)
+
+        if entry is not None and entry[0] == version:
+            return _request_credentials(entry[1])
+
+        model = self.get_model()
+
+        try:
+            token = await model.objects.select_related("user").aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        credentials = (token.user, token)
+        token_cache.set(key, (version, credentials))
+
+        return _request_credentials(credentials)
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+
+from user.hashing import get_hashing_pool, verify_password
+
+User = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` hashing in the login hashing pool, see user.hashing.
+
+    A hash made by a hasher other than the first of PASSWORD_HASHERS,
+    or with an outdated work factor, is replaced on a successful login,
+    like ``User.check_password()`` does.
+
+    Used by the token login only (see ``PooledAuthTokenSerializer``):
+    it raises ``HashingPoolBusy``, which DRF answers with 503, and
+    would be a 500 anywhere else.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+
+        if username is None or password is None:
+            return None
+
+        pool = get_hashing_pool()
+
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Hash anyway, so unknown usernames take as long (#20760).
+            pool.run(make_password, password)
+            return None
+
+        is_correct, upgraded = pool.run(verify_password, password, user.password)
+
+        if upgraded is not None:
+            user.password = upgraded
+            user.save(update_fields=["password"])
+
+        if is_correct and self.user_can_authenticate(user):
+            return user
+
+        return None
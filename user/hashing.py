@@ -0,0 +1,132 @@
+"""
+Password hashing in a bounded worker pool.
+
+Verifying a password is hundreds of milliseconds of CPU with PBKDF2.
+When many users log in at once (a shift change), hashing on every
+request thread takes all cores from the read endpoints. Logins hash in
+``LOGIN_HASHING_WORKERS`` threads instead (hashlib releases the GIL, so
+they run in parallel with requests, but never more of them). At most
+``LOGIN_HASHING_QUEUE_SIZE`` more logins wait for a worker; further
+logins, and those waiting longer than ``LOGIN_HASHING_TIMEOUT`` seconds,
+are answered with 503 and ``Retry-After`` right away.
+
+``LOGIN_HASHING_WORKERS = 0`` hashes on the request thread.
+
+Batches of new passwords are hashed by ``hash_passwords()`` one after
+the other on the request thread: a pool of their own measured no
+faster and was not bounded by the login pool.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, status
+
+
+class HashingPoolBusy(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many logins at once, try again shortly.")
+    default_code = "login_busy"
+    wait = 1
+
+
+class HashingPool:
+    """
+    Thread pool running at most ``workers`` hashes at once,
+    with up to ``queue_size`` more waiting.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float) -> None:
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def run(self, func, *args):
+        if self.workers < 1:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolBusy()
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        # Also called when a waiting call is cancelled.
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise HashingPoolBusy()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="login-hashing",
+                )
+
+            return self._executor
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool() -> HashingPool:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = HashingPool(
+                workers=settings.LOGIN_HASHING_WORKERS,
+                queue_size=settings.LOGIN_HASHING_QUEUE_SIZE,
+                timeout=settings.LOGIN_HASHING_TIMEOUT,
+            )
+
+        return _pool
+
+
+def reset_hashing_pool() -> None:
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+
+        _pool = None
+
+
+def verify_password(password: str, encoded: str) -> tuple:
+    """
+    Return whether ``password`` matches ``encoded`` and, when the hash
+    uses an outdated hasher or work factor, the new hash to store.
+    """
+    is_correct, must_update = hashers.verify_password(password, encoded)
+
+    if is_correct and must_update:
+        return True, hashers.make_password(password)
+
+    return is_correct, None
+
+
+def hash_passwords(passwords) -> list:
+    """
+    Hash ``passwords``, in order.
+    """
+    return [hashers.make_password(password) for password in passwords]
@@ -0,0 +1,134 @@
+"""
+Batch user provisioning.
+
+Rows of ``POST /register/bulk/`` are validated field by field with
+``UserBulkSerializer``, then usernames and role groups are checked for
+the whole batch with one query each. Invalid rows are reported and
+skipped, the valid ones are created: passwords hashed (see
+``user.hashing.hash_passwords``), users, group memberships and their
+audit log entries inserted with one ``bulk_create`` each. Rows whose
+username is taken between the check and the insert are reported too.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import IntegrityError, transaction
+
+from building.audit import log_bulk_create
+from user.hashing import hash_passwords
+
+User = get_user_model()
+Membership = User.groups.through
+REVERSE_ONE_TO_ONE = [
+    field for field in User._meta.get_fields()
+    if field.one_to_one and field.auto_created and not field.concrete
+]
+
+USERNAME_TAKEN_ERROR = "A user with that username already exists."
+GROUP_MISSING_ERROR = "Group does not exist."
+
+
+def _group_name(item) -> str:
+    return item.get("role", User.UserRole.GUARD).capitalize()
+
+
+def validate_users(items: dict) -> dict:
+    """
+    Check usernames and role groups of validated rows by row index.
+    Return the errors of the rejected rows and resolve ``group``
+    in place on the others.
+    """
+    for item in items.values():
+        item["username"] = User.normalize_username(item["username"])
+
+    existing = set(
+        User.objects.filter(
+            username__in=[item["username"] for item in items.values()]
+        ).values_list("username", flat=True)
+    )
+    groups = Group.objects.in_bulk(
+        {_group_name(item) for item in items.values()},
+        field_name="name",
+    )
+    seen = set()
+    errors = {}
+
+    for index, item in items.items():
+        error = {}
+
+        if item["username"] in existing or item["username"] in seen:
+            error["username"] = [USERNAME_TAKEN_ERROR]
+
+        item["group"] = groups.get(_group_name(item))
+
+        if item["group"] is None:
+            error["role"] = [GROUP_MISSING_ERROR]
+
+        seen.add(item["username"])
+
+        if error:
+            errors[index] = error
+
+    return errors
+
+
+def _insert_users(items: dict, groups: dict) -> list:
+    with transaction.atomic():
+        users = User.objects.bulk_create([User(**item) for item in items.values()])
+
+        # New users have no token (or other reverse one-to-one) yet, the
+        # audit diff would otherwise look each of them up.
+        for user in users:
+            for relation in REVERSE_ONE_TO_ONE:
+                relation.set_cached_value(user, None)
+
+        Membership.objects.bulk_create([
+            Membership(user_id=user.id, group_id=groups[index].id)
+            for user, index in zip(users, items)
+        ])
+        log_bulk_create(users)
+
+    return users
+
+
+def create_users(items: dict) -> tuple:
+    """
+    Create users from rows accepted by ``validate_users()``, by row index.
+
+    A username taken by a concurrent request after the validation fails
+    the insert: the taken usernames are looked up again, their rows are
+    rejected and the others inserted. Return the created users and the
+    errors of the rejected rows.
+    """
+    items = dict(items)
+    passwords = hash_passwords([item.pop("password") for item in items.values()])
+    groups = {index: item.pop("group") for index, item in items.items()}
+
+    for item, password in zip(items.values(), passwords):
+        item["password"] = password
+
+        if item.get("email"):
+            item["email"] = User.objects.normalize_email(item["email"])
+
+    errors = {}
+
+    while items:
+        try:
+            return _insert_users(items, groups), errors
+        except IntegrityError:
+            taken = set(
+                User.objects.filter(
+                    username__in=[item["username"] for item in items.values()]
+                ).values_list("username", flat=True)
+            )
+            rejected = [
+                index for index, item in items.items() if item["username"] in taken
+            ]
+
+            if not rejected:
+                raise
+
+            for index in rejected:
+                errors[index] = {"username": [USERNAME_TAKEN_ERROR]}
+                del items[index]
+
+    return [], errors
@@ -2,17 +2,23 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.contrib.auth.password_validation import validate_password
 from django.db import transaction
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+
+from building.timing import TimedListSerializer, TimedSerializerMixin
+from user.backends import PooledModelBackend
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     first_name = serializers.CharField(max_length=63, required=True)
     last_name = serializers.CharField(max_length=63, required=True)
 
     class Meta:
         model = User
+        list_serializer_class = TimedListSerializer
         fields = (
             "id",
             "username",
@@ -50,3 +56,43 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class UserBulkSerializer(UserSerializer):
+    """
+    Item of ``POST /register/bulk/``. Usernames and roles are checked
+    for the whole batch at once, see user.provisioning.
+    """
+
+    class Meta(UserSerializer.Meta):
+        extra_kwargs = {
+            "password": {"write_only": True},
+            "username": {"validators": [User.username_validator]},
+        }
+
+
+class PooledAuthTokenSerializer(AuthTokenSerializer):
+    """
+    ``AuthTokenSerializer`` checking the password in the login hashing
+    pool (see user.hashing). Only the token login uses the pool, other
+    logins go through the regular AUTHENTICATION_BACKENDS.
+    """
+
+    def validate(self, attrs):
+        username = attrs.get("username")
+        password = attrs.get("password")
+
+        if not (username and password):
+            return super().validate(attrs)
+
+        user = PooledModelBackend().authenticate(
+            self.context.get("request"), username=username, password=password
+        )
+
+        if user is None:
+            msg = _("Unable to log in with provided credentials.")
+            raise serializers.ValidationError(msg, code="authorization")
+
+        attrs["user"] = user
+
+        return attrs
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import invalidate_tokens
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    # Deleted users take their tokens along, see invalidate_token().
+    invalidate_tokens(
+        Token.objects.filter(user_id=instance.pk).values_list("key", flat=True)
+    )
@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import CachedTokenAuthentication, TokenCache, token_cache
+
+User = get_user_model()
+
+
+def detail_url(user_id):
+    return reverse("user:staff-detail", args=[user_id])
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self) -> None:
+        token_cache.clear()
+
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.guard = User.objects.create_user(username="guard", role="guard")
+        self.token = Token.objects.create(user=self.guard)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.url = detail_url(self.guard.id)
+
+    def test_repeat_requests_skip_auth_query(self):
+        with CaptureQueriesContext(connection) as first:
+            res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as second:
+            res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(second), len(first) - 1)
+        self.assertFalse(
+            any("authtoken_token" in query["sql"] for query in second)
+        )
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(self.url)
+        self.token.delete()
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.url)
+
+        admin_client = APIClient()
+        admin_client.force_authenticate(self.admin)
+        admin_client.patch(self.url, {"first_name": "changed"})
+
+        self.assertEqual(len(token_cache), 0)
+
+        self.guard.is_active = False
+        self.guard.save()
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_in_another_worker_is_picked_up(self):
+        self.client.get(self.url)
+
+        # Another worker drops only its own entry, this one is kept.
+        with mock.patch.object(token_cache, "delete"):
+            User.objects.filter(pk=self.guard.pk).update(is_active=False)
+            self.guard.refresh_from_db()
+            self.guard.save()
+
+        self.assertEqual(len(token_cache), 1)
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        token_cache.clear()
+        self.guard.is_active = True
+        self.guard.save()
+        self.client.get(self.url)
+
+        with mock.patch.object(token_cache, "delete"):
+            self.token.delete()
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_role_change_is_picked_up(self):
+        self.client.get(self.url)
+        self.guard.role = "admin"
+        self.guard.save()
+
+        res = self.client.get(reverse("user:staff-list"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_requests_get_their_own_user(self):
+        authentication = CachedTokenAuthentication()
+        user, token = authentication.authenticate_credentials(self.token.key)
+        user.set_by_view = True
+        again, token_again = authentication.authenticate_credentials(self.token.key)
+
+        self.assertEqual(again, self.guard)
+        self.assertIsNot(again, user)
+        self.assertFalse(hasattr(again, "set_by_view"))
+        self.assertIs(token_again.user, again)
+
+
+class TokenCacheTests(TestCase):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_entries_expire(self):
+        cache = TokenCache(maxsize=2, ttl=60)
+
+        with mock.patch("user.authentication.time.monotonic", return_value=0):
+            cache.set("a", 1)
+
+        with mock.patch("user.authentication.time.monotonic", return_value=59):
+            self.assertEqual(cache.get("a"), 1)
+
+        with mock.patch("user.authentication.time.monotonic", return_value=60):
+            self.assertIsNone(cache.get("a"))
@@ -0,0 +1,144 @@
+from unittest import mock
+
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user import provisioning
+
+User = get_user_model()
+BULK_REGISTER_URL = reverse("user:register-bulk")
+
+
+def row(username: str, **fields) -> dict:
+    return {
+        "username": username,
+        "password": "1234%test",
+        "first_name": "First",
+        "last_name": "Last",
+        "role": "guard",
+        **fields,
+    }
+
+
+class BulkRegisterTests(TestCase):
+
+    def setUp(self):
+        call_command("create_groups")
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_creates_users_with_groups(self):
+        data = [row(f"guard_{i}") for i in range(20)]
+        data.append(row("manager_1", role="manager", email="M@EXAMPLE.COM"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(BULK_REGISTER_URL, data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["created"]), 21)
+        self.assertEqual(res.data["errors"], [])
+        self.assertLess(len(queries), 15)
+
+        manager = User.objects.get(username="manager_1")
+        self.assertEqual(list(manager.groups.values_list("name", flat=True)), ["Manager"])
+        self.assertEqual(manager.email, "M@example.com")
+        self.assertTrue(manager.check_password("1234%test"))
+        self.assertEqual(User.objects.filter(groups__name="Guard").count(), 20)
+        self.assertEqual(
+            LogEntry.objects.filter(
+                content_type__model="user",
+                action=LogEntry.Action.CREATE,
+            ).count(),
+            22
+        )
+
+    def test_reports_row_errors_without_aborting(self):
+        data = [
+            row("new_guard"),
+            row("admin"),
+            row("twin"),
+            row("twin"),
+            row("weak", password="123"),
+            row("nameless", first_name=""),
+            row("bad role", role="janitor"),
+        ]
+
+        res = self.client.post(BULK_REGISTER_URL, data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [user["username"] for user in res.data["created"]],
+            ["new_guard", "twin"]
+        )
+        self.assertEqual(
+            {error["row"]: set(error["errors"]) for error in res.data["errors"]},
+            {
+                1: {"username"},
+                3: {"username"},
+                4: {"password"},
+                5: {"first_name"},
+                6: {"username", "role"},
+            }
+        )
+        self.assertFalse(User.objects.filter(username="weak").exists())
+
+    def test_usernames_taken_during_the_request_are_row_errors(self):
+        hash_passwords = provisioning.hash_passwords
+
+        def hash_while_another_request_inserts(passwords):
+            User.objects.create_user(username="racer")
+
+            return hash_passwords(passwords)
+
+        with mock.patch.object(
+            provisioning, "hash_passwords", hash_while_another_request_inserts
+        ):
+            res = self.client.post(
+                BULK_REGISTER_URL, [row("racer"), row("calm")], format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [user["username"] for user in res.data["created"]], ["calm"]
+        )
+        self.assertEqual(
+            res.data["errors"],
+            [{"row": 0, "errors": {"username": [provisioning.USERNAME_TAKEN_ERROR]}}]
+        )
+        self.assertEqual(
+            User.objects.get(username="calm").groups.get().name, "Guard"
+        )
+
+    def test_missing_group_is_a_row_error(self):
+        Group.objects.filter(name="Manager").delete()
+
+        res = self.client.post(
+            BULK_REGISTER_URL,
+            [row("manager_1", role="manager")],
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["errors"][0]["errors"]["role"], ["Group does not exist."])
+        self.assertEqual(res.data["created"], [])
+
+    def test_rejects_invalid_payloads_and_non_admins(self):
+        for data in ([], {"username": "guard"}):
+            res = self.client.post(BULK_REGISTER_URL, data, format="json")
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        guard = User.objects.create_user(username="guard", role="guard")
+        self.client.force_authenticate(guard)
+
+        res = self.client.post(BULK_REGISTER_URL, [row("x")], format="json")
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,155 @@
+import threading
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.hashing import (
+    HashingPool,
+    HashingPoolBusy,
+    get_hashing_pool,
+    reset_hashing_pool,
+)
+
+User = get_user_model()
+LOGIN_URL = reverse("user:login")
+SCRYPT_FIRST = [
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+]
+
+
+def occupy(pool: HashingPool) -> threading.Event:
+    """
+    Keep one worker of ``pool`` busy until the returned event is set.
+    """
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    def occupant():
+        # The slot stays taken until hold() returns, even if
+        # waiting for it times out.
+        try:
+            pool.run(hold)
+        except HashingPoolBusy:
+            pass
+
+    threading.Thread(target=occupant).start()
+    started.wait(5)
+
+    return release
+
+
+class HashingPoolTests(SimpleTestCase):
+
+    def test_runs_in_worker_thread(self):
+        pool = HashingPool(workers=1, queue_size=0, timeout=5)
+        self.addCleanup(pool.shutdown)
+
+        name = pool.run(lambda: threading.current_thread().name)
+
+        self.assertTrue(name.startswith("login-hashing"))
+
+    def test_without_workers_runs_inline(self):
+        pool = HashingPool(workers=0, queue_size=0, timeout=5)
+
+        self.assertEqual(
+            pool.run(lambda: threading.current_thread().name),
+            threading.current_thread().name
+        )
+
+    def test_rejects_when_saturated(self):
+        pool = HashingPool(workers=1, queue_size=0, timeout=5)
+        self.addCleanup(pool.shutdown)
+        release = occupy(pool)
+
+        with self.assertRaises(HashingPoolBusy):
+            pool.run(str, 1)
+
+        release.set()
+        pool.shutdown()
+
+        self.assertEqual(pool.run(str, 1), "1")
+
+    def test_waiting_too_long_is_rejected(self):
+        pool = HashingPool(workers=1, queue_size=1, timeout=0.05)
+        self.addCleanup(pool.shutdown)
+        release = occupy(pool)
+
+        with self.assertRaises(HashingPoolBusy):
+            pool.run(str, 1)
+
+        release.set()
+
+
+class PooledLoginTests(TestCase):
+
+    def setUp(self):
+        reset_hashing_pool()
+        self.addCleanup(reset_hashing_pool)
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="guard", password="guard1234")
+
+    def test_login(self):
+        res = self.client.post(
+            LOGIN_URL, {"username": "guard", "password": "guard1234"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("token", res.data)
+
+        for username, password in (("guard", "wrong"), ("nobody", "guard1234")):
+            res = self.client.post(
+                LOGIN_URL, {"username": username, "password": password}
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(LOGIN_HASHING_WORKERS=1, LOGIN_HASHING_QUEUE_SIZE=0)
+    def test_saturated_pool_answers_503(self):
+        release = occupy(get_hashing_pool())
+        self.addCleanup(release.set)
+
+        res = self.client.post(
+            LOGIN_URL, {"username": "guard", "password": "guard1234"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
+
+    @override_settings(LOGIN_HASHING_WORKERS=1, LOGIN_HASHING_QUEUE_SIZE=0)
+    def test_other_logins_do_not_use_the_pool(self):
+        release = occupy(get_hashing_pool())
+        self.addCleanup(release.set)
+
+        self.assertEqual(
+            authenticate(username="guard", password="guard1234"), self.user
+        )
+        self.assertTrue(
+            self.client.login(username="guard", password="guard1234")
+        )
+
+    @override_settings(PASSWORD_HASHERS=SCRYPT_FIRST)
+    def test_login_upgrades_hash(self):
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password("guard1234", hasher="pbkdf2_sha256")
+        )
+
+        res = self.client.post(
+            LOGIN_URL, {"username": "guard", "password": "guard1234"}
+        )
+        self.user.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.user.password.startswith("scrypt$"))
+        self.assertTrue(self.user.check_password("guard1234"))
+
+        res = self.client.post(
+            LOGIN_URL, {"username": "guard", "password": "wrong"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
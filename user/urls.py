@@ -2,7 +2,13 @@ from django.urls import path, include
 from rest_framework import routers
 from rest_framework.authtoken import views
 
-from user.views import CreateUserView, ManageUserView, LoginUserView
+from user.views import (
+    CreateUserView,
+    BulkCreateUserView,
+    ManageUserView,
+    LoginUserView,
+    AsyncStaffView,
+)
 
 router = routers.DefaultRouter()
 router.register("staff", ManageUserView, basename="staff")
@@ -10,7 +16,17 @@ router.register("staff", ManageUserView, basename="staff")
 urlpatterns = [
     path("", include(router.urls)),
     path("register/", CreateUserView.as_view(), name="register"),
+    path(
+        "register/bulk/",
+        BulkCreateUserView.as_view(),
+        name="register-bulk"
+    ),
     path("login/", LoginUserView.as_view(), name="login"),
+    path(
+        "async/staff/<int:pk>/",
+        AsyncStaffView.as_view(),
+        name="async-staff-detail"
+    ),
 ]
 
 app_name = "user"
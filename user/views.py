@@ -1,15 +1,24 @@
 from django.contrib.auth import get_user_model
-from rest_framework import generics, mixins, viewsets
+from rest_framework import exceptions, generics, mixins, status, viewsets
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
+from building.async_views import AsyncReadView
+from building.mixins import BULK_CREATE_MAX_SIZE, HistoryMixin
 from building.permissions import IsAdminRole, AllowAnyRole
-from user.serializers import UserSerializer
+from building.timing import TimedViewMixin
+from user.provisioning import create_users, validate_users
+from user.serializers import (
+    PooledAuthTokenSerializer,
+    UserBulkSerializer,
+    UserSerializer,
+)
 
 User = get_user_model()
 
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(TimedViewMixin, generics.CreateAPIView):
     """
     View for creating a new user.
 
@@ -19,18 +28,81 @@ class CreateUserView(generics.CreateAPIView):
     permission_classes = (IsAdminRole,)
 
 
-class LoginUserView(ObtainAuthToken):
+class BulkCreateUserView(TimedViewMixin, generics.GenericAPIView):
+    """
+    View for creating many users at once.
+
+    Accepts a list of users. Creates the valid ones in one transaction
+    and responds with them and with the errors of the other rows by
+    index. Responds with 400 when no row is valid.
+
+    Allow only for admin roles
+    """
+    serializer_class = UserBulkSerializer
+    permission_classes = (IsAdminRole,)
+
+    def post(self, request, *args, **kwargs):
+        rows = request.data
+
+        if not isinstance(rows, list) or not rows:
+            raise exceptions.ValidationError(
+                {"non_field_errors": ["Expected a non-empty list of users."]}
+            )
+
+        if len(rows) > BULK_CREATE_MAX_SIZE:
+            raise exceptions.ValidationError({"non_field_errors": [
+                f"Ensure this list has at most {BULK_CREATE_MAX_SIZE} users."
+            ]})
+
+        items, errors = {}, {}
+
+        for index, row in enumerate(rows):
+            serializer = self.get_serializer(data=row)
+
+            if serializer.is_valid():
+                items[index] = dict(serializer.validated_data)
+            else:
+                errors[index] = serializer.errors
+
+        if items:
+            errors.update(validate_users(items))
+
+        accepted = {
+            index: item for index, item in items.items() if index not in errors
+        }
+        users, conflicts = create_users(accepted)
+        errors.update(conflicts)
+        data = {
+            "created": UserSerializer(users, many=True).data,
+            "errors": [
+                {"row": index, "errors": errors[index]} for index in sorted(errors)
+            ],
+        }
+
+        return Response(
+            data,
+            status=status.HTTP_201_CREATED if users else status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class LoginUserView(TimedViewMixin, ObtainAuthToken):
     """
     View for creating a new auth token.
+
+    Passwords are checked in the login hashing pool (see user.hashing),
+    answers 503 with Retry-After when it is saturated.
     """
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    serializer_class = PooledAuthTokenSerializer
 
 
 class ManageUserView(
+    TimedViewMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
+    HistoryMixin,
     viewsets.GenericViewSet,
 ):
     """
@@ -41,6 +113,8 @@ class ManageUserView(
     - Admin: all CRUD
     - Manager: GET. Only for related objects
     - Guard: GET. Only for related objects
+
+    ``GET /staff/<id>/history/`` lists the changes of a user, admin only.
     """
     serializer_class = UserSerializer
 
@@ -58,3 +132,26 @@ class ManageUserView(
             return User.objects.all()
 
         return User.objects.filter(pk=user.pk)
+
+
+class AsyncStaffView(AsyncReadView):
+    """
+    Async retrieve of a user, as ``GET /staff/<pk>/``.
+
+    Allow for any role. Managers and guards see only themselves
+    """
+    permission_classes = (AllowAnyRole,)
+    conditional = False
+
+    async def get_data(self, request, pk):
+        queryset = User.objects.all()
+
+        if request.user.role != "admin":
+            queryset = queryset.filter(pk=request.user.pk)
+
+        user = await queryset.filter(pk=pk).afirst()
+
+        if user is None:
+            raise exceptions.NotFound()
+
+        return UserSerializer(user).data